@@ -0,0 +1,78 @@
+"""
+Created on 18.10.2026
+Compares the encode and decode throughput of the JSON libraries available to
+the codec on large exercise lists.
+@author: lorinc
+
+Usage, in the project root folder:
+    python -m bench.codec [--items N] [--rounds N]
+
+"""
+
+import argparse
+import json
+import time
+from chessApi import codec, resources, serializers
+
+FEN = 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1'
+
+
+def _exercise_list(items):
+    """
+    Builds the envelope of an exercise list page with `items` exercises.
+    """
+    exercises = [{'exercise_id': i, 'title': 'Exercise %d' % i, 'author': 'user %d' % (i % 50)}
+                 for i in range(1, items + 1)]
+    with resources.app.test_request_context('/'):
+        envelope = resources.ChessApiObject(serializers.url('exercises'), resources.EXERCISE_PROFILE)
+        envelope.add_add_exercise_control()
+        envelope.add_users_all_control()
+        envelope['items'] = serializers.exercise_items(exercises)
+    return envelope
+
+
+def _throughput(function, argument, size, rounds):
+    """
+    Calls `function` `rounds` times.
+    :return: Megabytes per second.
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        function(argument)
+    return size * rounds / (time.perf_counter() - start) / 1e6
+
+
+def run(items, rounds):
+    """
+    Runs the benchmark.
+    :param items: The number of exercises of the list.
+    :param rounds: The number of times the list is encoded and decoded.
+    :return: dictionary of the encoders and decoders selected by the codec, the throughput of every installed one
+        in MB/s, and whether the encoders produce the same output as the standard json module.
+    """
+    envelope = _exercise_list(items)
+    document = json.dumps(envelope)
+    results = {
+        'items': items,
+        'bytes': len(document),
+        'selected': dict(zip(('encoder', 'decoder'), codec.names())),
+        'encoders': {},
+        'decoders': {}
+    }
+    for name, encode in codec._encoders.items():
+        results['encoders'][name] = {
+            'mb_per_s': _throughput(encode, envelope, len(document), rounds),
+            'same_output': encode(envelope) == document and codec._same_output(encode)
+        }
+    data = document.encode('utf-8')
+    for name, decode in codec._decoders.items():
+        results['decoders'][name] = {'mb_per_s': _throughput(decode, data, len(data), rounds)}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the JSON libraries of the codec.')
+    parser.add_argument('--items', type=int, default=5000, help='number of exercises of the list')
+    parser.add_argument('--rounds', type=int, default=20, help='number of times the list is encoded and decoded')
+    args = parser.parse_args()
+    print(json.dumps(run(args.items, args.rounds), indent=2, sort_keys=True))
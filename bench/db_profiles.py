@@ -0,0 +1,127 @@
+"""
+Created on 18.10.2026
+Compares the read and write throughput of the database performance profiles.
+@author: lorinc
+
+Usage, in the project root folder:
+    python -m bench.db_profiles [--operations N] [--readers N]
+
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from chessApi import database
+
+FEN = 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1'
+MOVES = 'e6,g4,Qh4#'
+
+
+def _prepare(profile, directory):
+    """
+    Creates a populated database for the profile.
+    :param profile: Name of the performance profile.
+    :param directory: The directory of the database file.
+    :return: The Engine of the database.
+    """
+    engine = database.Engine(os.path.join(directory, profile + '.db'), profile=profile)
+    engine.remove_database()
+    engine.create_tables()
+    engine.populate_tables()
+    return engine
+
+
+def _bench_writes(engine, operations):
+    """
+    Creates `operations` exercises, each one in its own transaction.
+    :return: Operations per second.
+    """
+    con = engine.connect()
+    start = time.perf_counter()
+    for i in range(operations):
+        con.create_exercise('Bench %d' % i, 'Benchmark', 'Mystery', FEN, MOVES)
+    elapsed = time.perf_counter() - start
+    con.close()
+    return operations / elapsed
+
+
+def _bench_reads(engine, operations):
+    """
+    Fetches `operations` random exercises.
+    :return: Operations per second.
+    """
+    con = engine.connect()
+    rnd = random.Random(0)
+    last_id = con.con.execute('SELECT MAX(exercise_id) FROM exercises').fetchone()[0]
+    start = time.perf_counter()
+    for _ in range(operations):
+        con.get_exercise(rnd.randint(1, last_id))
+    elapsed = time.perf_counter() - start
+    con.close()
+    return operations / elapsed
+
+
+def _bench_mixed(engine, operations, readers):
+    """
+    Runs `readers` reading threads while one thread writes `operations` exercises.
+    :return: tuple of the write and the total read operations per second.
+    """
+    stop = threading.Event()
+    reads = [0] * readers
+
+    def reader(index):
+        con = engine.checkout()
+        rnd = random.Random(index)
+        while not stop.is_set():
+            con.get_exercise(rnd.randint(1, 3))
+            reads[index] += 1
+        con.close()
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    con = engine.checkout()
+    start = time.perf_counter()
+    for i in range(operations):
+        con.create_exercise('Mixed %d' % i, 'Benchmark', 'Mystery', FEN, MOVES)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in threads:
+        thread.join()
+    con.close()
+    return operations / elapsed, sum(reads) / elapsed
+
+
+def run(operations, readers):
+    """
+    Runs the benchmark for every profile.
+    :return: dictionary of the results keyed by profile name.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in sorted(database.PROFILES):
+            engine = _prepare(profile, directory)
+            engine.pool_size = readers + 1
+            writes = _bench_writes(engine, operations)
+            reads = _bench_reads(engine, operations * 10)
+            mixed_writes, mixed_reads = _bench_mixed(engine, operations, readers)
+            engine.remove_database()
+            results[profile] = {
+                'writes_per_s': round(writes, 1),
+                'reads_per_s': round(reads, 1),
+                'mixed_writes_per_s': round(mixed_writes, 1),
+                'mixed_reads_per_s': round(mixed_reads, 1)
+            }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the database performance profiles.')
+    parser.add_argument('--operations', type=int, default=500, help='number of write operations per run')
+    parser.add_argument('--readers', type=int, default=4, help='number of reader threads in the mixed run')
+    args = parser.parse_args()
+    print(json.dumps(run(args.operations, args.readers), indent=2, sort_keys=True))
@@ -0,0 +1,346 @@
+"""
+Created on 18.10.2026
+End-to-end HTTP load test: starts the API in the pre-forking server against a
+database generated by chessApi.dataset and drives a weighted mix of list, get, solve and submit
+requests from concurrent clients. A solver session is played move by move, so
+its moves are spread over the worker processes. Reports the throughput and the
+latency percentiles of every endpoint.
+@author: lorinc
+
+Usage, in the project root folder:
+    python -m bench.load_test [--users N] [--exercises N] [--database PATH] [--duration S] [--clients N]
+                              [--workers N] [--threads N] [--mix NAME=WEIGHT,...] [--seed N] [--processes N]
+
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import signal
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import partial
+from urllib.parse import quote, urlsplit
+from chessApi import database
+from chessApi import dataset
+
+# the operations of the mix and their default weights
+DEFAULT_MIX = 'list_exercises=20,list_users=10,get_exercise=20,get_user=10,solve=20,solve_session=15,submit=5'
+# the number of users and exercises the clients pick their requests from
+SAMPLE_SIZE = 10000
+PAGE_SIZE = 50
+STARTUP_TIMEOUT = 30.0
+REQUEST_TIMEOUT = 30.0
+
+
+def _parse_mix(spec):
+    """
+    Parses the traffic mix.
+    :param spec: Comma-separated list of operation=weight pairs.
+    :return: dictionary of the weights keyed by operation name.
+    :raises ValueError: if an operation is unknown or a weight is invalid.
+    """
+    mix = {}
+    for pair in spec.split(','):
+        name, _, weight = pair.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError('Unknown operation: %s' % name)
+        mix[name] = float(weight)
+        if mix[name] < 0:
+            raise ValueError('Negative weight: %s' % pair)
+    if not any(mix.values()):
+        raise ValueError('The mix is empty')
+    return mix
+
+
+def _sample(path):
+    """
+    Picks the users and the exercises the clients request.
+    :return: tuple of the list of (user id, nickname, email) tuples and the list of (exercise id, list moves) tuples.
+    """
+    con = sqlite3.connect(path)
+    try:
+        users = con.execute('SELECT user_id, nickname, email FROM users ORDER BY random() LIMIT ?',
+                            (SAMPLE_SIZE,)).fetchall()
+        exercises = con.execute('SELECT exercise_id, list_moves FROM exercises ORDER BY random() LIMIT ?',
+                                (SAMPLE_SIZE,)).fetchall()
+    finally:
+        con.close()
+    if not users or not exercises:
+        raise ValueError('The database needs at least one user and one exercise')
+    return users, exercises
+
+
+def _load_application(db_path, threads):
+    """
+    Loads the application of the production server on the database of the benchmark.
+    """
+    import server
+    application = server.load_application()
+    import main
+    main.chessApi.config['Engine'] = database.Engine(db_path, pool_size=threads)
+    return application
+
+
+def _start_server(db_path, workers, threads):
+    """
+    Forks the master of a pre-forking server on a free port.
+    :return: tuple of the pid of the master and the port.
+    """
+    import server
+    from chessApi.prefork import PreforkServer
+    prefork = PreforkServer(partial(_load_application, db_path, threads), port=0, workers=workers, threads=threads,
+                            graceful_timeout=5, post_fork=partial(server.setup_worker, threads),
+                            worker_exit=server.shutdown_worker)
+    port = prefork.bind()[1]
+    pid = os.fork()
+    if pid == 0:
+        try:
+            # the request log of werkzeug would cost more than some requests
+            logging.getLogger('werkzeug').setLevel(logging.ERROR)
+            prefork.run()
+        finally:
+            os._exit(0)
+    prefork.socket.close()
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            if _request(port, 'GET', '/api/exercises/?limit=1')[0] == 200:
+                return pid, port
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            _stop_server(pid)
+            raise RuntimeError('The server did not start')
+        time.sleep(0.1)
+
+
+def _stop_server(pid):
+    os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+
+
+def _request(port, method, path, body=None):
+    """
+    Sends a request on a new connection and reads the whole response.
+    :return: tuple of the status code and the Location header of the response.
+    """
+    con = http.client.HTTPConnection('127.0.0.1', port, timeout=REQUEST_TIMEOUT)
+    try:
+        headers = {'Accept-Encoding': 'gzip'}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        con.request(method, path, body, headers)
+        resp = con.getresponse()
+        resp.read()
+        return resp.status, resp.getheader('Location')
+    finally:
+        con.close()
+
+
+# An operation is a generator of the requests of one user action. It yields
+# (method, path, body) tuples and receives the (status, location) tuple of the
+# response of each; a failed request ends the action.
+
+def _list_exercises(rnd, context):
+    # half of the clients look at the first page, the others browse
+    if rnd.random() < 0.5:
+        yield 'GET', '/api/exercises/?limit=%d' % PAGE_SIZE, None
+    else:
+        yield 'GET', '/api/exercises/?limit=%d&after=%d' % (PAGE_SIZE, rnd.choice(context['exercises'])[0]), None
+
+
+def _list_users(rnd, context):
+    if rnd.random() < 0.5:
+        yield 'GET', '/api/users/?limit=%d' % PAGE_SIZE, None
+    else:
+        yield 'GET', '/api/users/?limit=%d&after=%d' % (PAGE_SIZE, rnd.choice(context['users'])[0]), None
+
+
+def _get_exercise(rnd, context):
+    yield 'GET', '/api/exercises/%d/' % rnd.choice(context['exercises'])[0], None
+
+
+def _get_user(rnd, context):
+    yield 'GET', '/api/users/%s/' % quote(rnd.choice(context['users'])[1]), None
+
+
+def _solve(rnd, context):
+    # the solvers send the moves played so far, up to the whole solution
+    exercise_id, list_moves = rnd.choice(context['exercises'])
+    moves = list_moves.split(',')
+    solution = ','.join(moves[:rnd.randint(1, len(moves))])
+    yield 'GET', '/api/exercises/%d/solver/?solution=%s' % (exercise_id, quote(solution)), None
+
+
+def _solve_session(rnd, context):
+    # the solvers start a session, play some of their moves, the opponent replies in between, and leave
+    exercise_id, list_moves = rnd.choice(context['exercises'])
+    moves = list_moves.split(',')[::2]
+    status, location = yield 'POST', '/api/exercises/%d/solver/sessions/' % exercise_id, None
+    if status != 201:
+        return
+    url = urlsplit(location).path
+    for move in moves[:rnd.randint(1, len(moves))]:
+        status, _ = yield 'POST', url, json.dumps({'move': move})
+        if status != 200:
+            return
+    yield 'DELETE', url, None
+
+
+def _submit(rnd, context):
+    _, nickname, email = rnd.choice(context['users'])
+    _, initial_state, list_moves = rnd.choice(dataset.SEED_MATES)
+    body = json.dumps({
+        'headline': 'Load test %s %d' % (context['run'], next(context['submissions'])),
+        'about': 'Submitted by the load test.',
+        'author': nickname,
+        'author-email': email,
+        'initial-state': initial_state,
+        'list-moves': list_moves
+    })
+    yield 'POST', '/api/exercises/', body
+
+
+OPERATIONS = {
+    'list_exercises': _list_exercises,
+    'list_users': _list_users,
+    'get_exercise': _get_exercise,
+    'get_user': _get_user,
+    'solve': _solve,
+    'solve_session': _solve_session,
+    'submit': _submit
+}
+
+
+def _client(port, mix, context, index, seed, warmup_end, end, samples, errors):
+    """
+    Sends requests of the mix until `end`, records the latencies of the requests sent after `warmup_end`.
+    """
+    rnd = random.Random(seed * 1000003 + index)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while True:
+        name = rnd.choices(names, weights)[0]
+        requests = OPERATIONS[name](rnd, context)
+        response = None
+        while True:
+            try:
+                method, path, body = requests.send(response)
+            except StopIteration:
+                break
+            start = time.monotonic()
+            if start >= end:
+                return
+            try:
+                response = _request(port, method, path, body)
+            except OSError:
+                response = (None, None)
+            elapsed = time.monotonic() - start
+            if start < warmup_end:
+                continue
+            samples[name].append(elapsed)
+            if response[0] is None or response[0] >= 400:
+                errors[name] += 1
+
+
+def _percentile(ordered, p):
+    """
+    :return: The nearest-rank percentile `p` of the sorted list.
+    """
+    return ordered[max(0, int(math.ceil(p / 100.0 * len(ordered))) - 1)]
+
+
+def _summary(latencies, errors, duration):
+    """
+    :return: dictionary of the request count, the error count, the throughput and the latencies in milliseconds.
+    """
+    ordered = sorted(latencies)
+    summary = {'requests': len(ordered), 'errors': errors, 'throughput_per_s': round(len(ordered) / duration, 1)}
+    if ordered:
+        summary.update({
+            'mean_ms': round(1000 * sum(ordered) / len(ordered), 2),
+            'p50_ms': round(1000 * _percentile(ordered, 50), 2),
+            'p95_ms': round(1000 * _percentile(ordered, 95), 2),
+            'p99_ms': round(1000 * _percentile(ordered, 99), 2),
+            'max_ms': round(1000 * ordered[-1], 2)
+        })
+    return summary
+
+
+def run(users, exercises, duration, clients, workers, threads, mix=DEFAULT_MIX, seed=0, warmup=1.0, db_path=None,
+        processes=None):
+    """
+    Runs the load test.
+    :param users: The number of users of the generated database.
+    :param exercises: The number of exercises of the generated database.
+    :param duration: The measured duration in seconds.
+    :param clients: The number of concurrent clients.
+    :param workers: The number of worker processes of the server.
+    :param threads: The number of requests a worker serves at once.
+    :param mix: The traffic mix, comma-separated operation=weight pairs.
+    :param seed: The seed of the generated database and of the requests.
+    :param warmup: Seconds of requests sent before the measurement.
+    :param db_path: Path of an existing database to use instead of a generated one. The submitted exercises are
+        stored in it.
+    :param processes: The number of processes generating the database, the number of CPUs if None.
+    :return: dictionary of the configuration, the totals and the results of every operation.
+    """
+    mix = _parse_mix(mix)
+    generated = db_path is None
+    with tempfile.TemporaryDirectory() as directory:
+        if generated:
+            db_path = os.path.join(directory, 'load_test.db')
+            dataset.generate(db_path, users, exercises, seed, processes)
+        sampled_users, sampled_exercises = _sample(db_path)
+        context = {'users': sampled_users, 'exercises': sampled_exercises,
+                   'run': '%x-%d' % (int(time.time()), seed), 'submissions': itertools.count()}
+        pid, port = _start_server(db_path, workers, threads)
+        try:
+            samples = {name: [] for name in mix}
+            errors = {name: 0 for name in mix}
+            warmup_end = time.monotonic() + warmup
+            end = warmup_end + duration
+            client_threads = [threading.Thread(target=_client, args=(port, mix, context, i, seed, warmup_end, end,
+                                                                     samples, errors))
+                              for i in range(clients)]
+            for thread in client_threads:
+                thread.start()
+            for thread in client_threads:
+                thread.join()
+        finally:
+            _stop_server(pid)
+    return {
+        'config': {'database': None if generated else db_path, 'users': users if generated else None,
+                   'exercises': exercises if generated else None, 'duration_s': duration, 'clients': clients,
+                   'workers': workers, 'threads': threads, 'mix': mix, 'seed': seed},
+        'total': _summary(list(itertools.chain(*samples.values())), sum(errors.values()), duration),
+        'endpoints': {name: _summary(samples[name], errors[name], duration) for name in mix}
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test the API over HTTP.')
+    parser.add_argument('--users', type=int, default=1000, help='number of users of the generated database')
+    parser.add_argument('--exercises', type=int, default=10000, help='number of exercises of the generated database')
+    parser.add_argument('--database', help='existing database to load test instead of a generated one')
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=1.0, help='seconds of unmeasured requests first')
+    parser.add_argument('--clients', type=int, default=8, help='number of concurrent clients')
+    parser.add_argument('--workers', type=int, default=2, help='number of worker processes of the server')
+    parser.add_argument('--threads', type=int, default=4, help='number of requests a worker serves at once')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='traffic mix, comma-separated operation=weight pairs of '
+                                                           + ', '.join(sorted(OPERATIONS)))
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generated database and of the requests')
+    parser.add_argument('--processes', type=int, help='number of processes generating the database')
+    args = parser.parse_args()
+    print(json.dumps(run(args.users, args.exercises, args.duration, args.clients, args.workers, args.threads,
+                         args.mix, args.seed, args.warmup, args.database, args.processes), indent=2, sort_keys=True))
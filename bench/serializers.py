@@ -0,0 +1,82 @@
+"""
+Created on 18.10.2026
+Compares the per-item cost of serializing the exercise and user lists with
+ChessApiObject and url_for against the precompiled MASON templates.
+@author: lorinc
+
+Usage, in the project root folder:
+    python -m bench.serializers [--items N] [--rounds N]
+
+"""
+
+import argparse
+import json
+import time
+from chessApi import resources, serializers
+
+
+def _exercises_legacy(exercises):
+    """
+    Builds the exercise items the way the resources did before the templates.
+    """
+    items = []
+    for exercise in exercises:
+        item = resources.ChessApiObject(resources.api.url_for(resources.Exercise, exerciseid=exercise['exercise_id']),
+                                        resources.EXERCISE_PROFILE, False)
+        item['headline'] = exercise['title']
+        item['author'] = exercise['author']
+        items.append(item)
+    return items
+
+
+def _users_legacy(users):
+    """
+    Builds the user items the way the resources did before the templates.
+    """
+    return [resources.ChessApiObject(resources.api.url_for(resources.User, nickname=user['nickname']),
+                                     resources.USER_PROFILE, False, nickname=user['nickname'],
+                                     registrationdate=user['registrationdate']) for user in users]
+
+
+def _per_item(build, records, rounds):
+    """
+    Builds and encodes the items `rounds` times.
+    :return: Microseconds per item.
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        json.dumps(build(records))
+    return (time.perf_counter() - start) * 1e6 / (rounds * len(records))
+
+
+def run(items, rounds):
+    """
+    Runs the benchmark.
+    :param items: The number of items of a list.
+    :param rounds: The number of times each list is serialized.
+    :return: dictionary of the per-item microseconds of each path.
+    """
+    exercises = [{'exercise_id': i, 'title': 'Exercise %d' % i, 'author': 'user %d' % (i % 50)}
+                 for i in range(1, items + 1)]
+    users = [{'nickname': 'user %d' % i, 'registrationdate': 1362015937 + i} for i in range(items)]
+    results = {}
+    with resources.app.test_request_context('/'):
+        for name, legacy, compiled, records in (('exercises', _exercises_legacy, serializers.exercise_items, exercises),
+                                                ('users', _users_legacy, serializers.user_items, users)):
+            assert json.dumps(legacy(records)) == json.dumps(compiled(records))
+            legacy_cost = _per_item(legacy, records, rounds)
+            compiled_cost = _per_item(compiled, records, rounds)
+            results[name] = {
+                'legacy_us_per_item': legacy_cost,
+                'templates_us_per_item': compiled_cost,
+                'speedup': legacy_cost / compiled_cost
+            }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the serialization of the MASON lists.')
+    parser.add_argument('--items', type=int, default=500, help='number of items of a list')
+    parser.add_argument('--rounds', type=int, default=20, help='number of times each list is serialized')
+    args = parser.parse_args()
+    print(json.dumps(run(args.items, args.rounds), indent=2, sort_keys=True))
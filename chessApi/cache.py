@@ -0,0 +1,346 @@
+"""
+Created on 18.10.2026
+Provides a bounded in-process cache with least-recently-used eviction and optional expiry, and a cache of encoded
+responses invalidated by tags.
+@author: lorinc
+
+"""
+
+from collections import OrderedDict
+import sys
+import threading
+import time
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping of bounded size. When the cache is full, the least
+    recently used entry is evicted. Entries older than ``ttl`` seconds are
+    treated as missing.
+
+    The cache lives in the memory of a single process. When the application
+    runs in several processes, each has its own cache, so an entry invalidated
+    in one process may be served by another one until it expires.
+
+    If ``sizeof`` is given, the memory used by the entries is accounted, and
+    with ``maxbytes`` the cache is bounded by it as well.
+
+    A value read from its source while an invalidation happened may be stale.
+    Passing the :py:meth:`generation` taken before the read to :py:meth:`put`
+    keeps such a value out of the cache.
+
+    :param int maxsize: The maximum number of entries.
+    :param float ttl: The lifetime of an entry in seconds, None for no expiry.
+    :param clock: Callable returning the current time in seconds.
+    :param int maxbytes: The maximum memory used by the entries, None for no
+        bound. Requires ``sizeof``.
+    :param sizeof: Callable receiving the key and the value of an entry and
+        returning the bytes it uses.
+
+    """
+
+    def __init__(self, maxsize, ttl=None, clock=time.monotonic, maxbytes=None, sizeof=None):
+        super(LRUCache, self).__init__()
+        if maxsize < 1:
+            raise ValueError('The cache size must be at least 1')
+        if maxbytes is not None and sizeof is None:
+            raise ValueError('The memory bound requires sizeof')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (value, expiry time or None, size in bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # incremented by every invalidation
+        self._generation = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'discarded': 0
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Looks up an entry and marks it as the most recently used.
+
+        :param key: The key of the entry.
+        :param default: The value returned if there is no valid entry.
+        :return: The cached value or ``default``.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+                self._remove(key)
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def generation(self):
+        """
+        :return: the number of invalidations so far, to be passed to
+            :py:meth:`put`.
+
+        """
+        with self._lock:
+            return self._generation
+
+    def put(self, key, value, generation=None):
+        """
+        Stores an entry, evicting the least recently used one if the cache is
+        full.
+
+        :param key: The key of the entry.
+        :param value: The value to store.
+        :param int generation: If given, the entry is stored only if no
+            invalidation happened since this :py:meth:`generation`.
+
+        """
+        expiry = self._clock() + self.ttl if self.ttl is not None else None
+        size = self._sizeof(key, value) if self._sizeof is not None else 0
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self._stats['discarded'] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expiry, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or \
+                    (self.maxbytes is not None and self._bytes > self.maxbytes and len(self._entries) > 1):
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def _remove(self, key):
+        """
+        Removes an entry and releases its memory. The lock has to be held.
+
+        :param key: The key of the entry.
+        :return: The removed entry.
+
+        """
+        entry = self._entries.pop(key)
+        self._bytes -= entry[2]
+        return entry
+
+    def invalidate(self, key):
+        """
+        Removes an entry, if present.
+
+        :param key: The key of the entry.
+
+        """
+        with self._lock:
+            self._generation += 1
+            if key in self._entries:
+                self._remove(key)
+                self._stats['invalidations'] += 1
+
+    def invalidate_where(self, predicate):
+        """
+        Removes every entry for which ``predicate(key, value)`` is true. The
+        cost is linear in the size of the cache.
+
+        :param predicate: Callable receiving the key and the value of an entry.
+
+        """
+        with self._lock:
+            self._generation += 1
+            keys = [key for key, entry in self._entries.items() if predicate(key, entry[0])]
+            for key in keys:
+                self._remove(key)
+            self._stats['invalidations'] += len(keys)
+
+    def clear(self):
+        """
+        Removes every entry. The statistics are kept.
+
+        """
+        with self._lock:
+            self._generation += 1
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        :return: a dictionary with the keys ``size``, ``maxsize``, ``bytes``
+            (memory used by the entries, 0 if not accounted), ``maxbytes``,
+            ``hits``, ``misses``, ``evictions`` (entries dropped because the
+            cache was full), ``expirations``, ``invalidations``, ``discarded``
+            (values not stored because of a concurrent invalidation) and
+            ``hit_ratio``.
+
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        stats['maxsize'] = self.maxsize
+        stats['maxbytes'] = self.maxbytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+def _response_entry_size(key, entry):
+    """
+    Estimates the memory used by an entry of the :py:class:`ResponseCache`.
+
+    :param str key: The key of the entry.
+    :param tuple entry: The encoded body, the tags and the variants of the
+        response.
+    :return: The size in bytes.
+
+    """
+    body, tags, variants = entry
+    return sys.getsizeof(key) + sys.getsizeof(body) + sys.getsizeof(tags) + sum(sys.getsizeof(tag) for tag in tags) + \
+        sys.getsizeof(variants) + sum(sys.getsizeof(variant) for variant in variants.values())
+
+
+class ResponseCache(object):
+    """
+    Cache of encoded response bodies. Every body is stored with the tags of
+    the data it shows, and a modification of the data invalidates the bodies
+    having any of its tags, see :py:meth:`invalidate`.
+
+    A body built while an invalidation happened is served but not stored, as
+    it may show the data from before the modification.
+
+    Variants of a body, e.g. its compressed forms, are stored alongside it, see
+    :py:meth:`get_variant`, and dropped together with it.
+
+    :param int maxsize: The maximum number of cached bodies.
+    :param int maxbytes: The maximum memory used by the cached bodies.
+
+    """
+
+    def __init__(self, maxsize, maxbytes=None):
+        super(ResponseCache, self).__init__()
+        self._responses = LRUCache(maxsize, maxbytes=maxbytes, sizeof=_response_entry_size)
+        self._lock = threading.Lock()
+        # incremented by every invalidation
+        self._generation = 0
+        self._stats = {
+            'rebuilds': 0,
+            'rebuild_time': 0.0,
+            'discarded': 0,
+            'variants': 0
+        }
+
+    def get(self, key, build):
+        """
+        Looks up a body, building and storing it if it is missing.
+
+        :param str key: The key of the response, e.g. its path and query.
+        :param build: Callable returning a tuple of the encoded body and the
+            iterable of its tags.
+        :return: The encoded body.
+
+        """
+        return self._lookup(key, build)[0]
+
+    def get_variant(self, key, build, variant, encode):
+        """
+        Looks up a variant of a body, building and storing the body and the
+        variant if they are missing.
+
+        :param str key: The key of the response, e.g. its path and query.
+        :param build: Callable returning a tuple of the encoded body and the
+            iterable of its tags.
+        :param str variant: The name of the variant, e.g. ``'gzip'``.
+        :param encode: Callable returning the variant of a body, or None if
+            the body has no such variant.
+        :return: tuple of the body and its variant (None if it has none).
+
+        """
+        with self._lock:
+            generation = self._generation
+        entry = self._lookup(key, build)
+        body, tags, variants = entry
+        if variant in variants:
+            return body, variants[variant]
+        encoded = encode(body)
+        with self._lock:
+            self._stats['variants'] += 1
+            # not stored if the body has been invalidated meanwhile
+            if generation == self._generation and tags is not None:
+                self._responses.put(key, (body, tags, dict(variants, **{variant: encoded})))
+        return body, encoded
+
+    def _lookup(self, key, build):
+        """
+        :return: the entry of a body, built and stored if it is missing. The
+            tags of an entry which could not be stored are None.
+
+        """
+        entry = self._responses.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            generation = self._generation
+        start = time.perf_counter()
+        body, tags = build()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats['rebuilds'] += 1
+            self._stats['rebuild_time'] += elapsed
+            if generation != self._generation:
+                self._stats['discarded'] += 1
+                return body, None, {}
+            entry = (body, frozenset(tags), {})
+            # stored under the lock, so an invalidation cannot slip in between
+            self._responses.put(key, entry)
+        return entry
+
+    def invalidate(self, *tags):
+        """
+        Drops the bodies having any of the tags. The cost is linear in the
+        number of cached bodies.
+
+        :param tags: The tags of the modified data.
+
+        """
+        tags = frozenset(tags)
+        with self._lock:
+            self._generation += 1
+            self._responses.invalidate_where(lambda key, entry: not tags.isdisjoint(entry[1]))
+
+    def clear(self):
+        """
+        Drops every body.
+
+        """
+        with self._lock:
+            self._generation += 1
+            self._responses.clear()
+
+    def stats(self):
+        """
+        :return: the statistics of the underlying :py:class:`LRUCache`,
+            including the ``hit_ratio``, extended with the number of
+            ``rebuilds`` of bodies, the total ``rebuild_time`` and the
+            ``avg_rebuild_time`` in seconds, the number of rebuilt bodies
+            ``discarded`` because of a concurrent invalidation, and the number
+            of ``variants`` encoded.
+
+        """
+        stats = self._responses.stats()
+        with self._lock:
+            stats.update(self._stats)
+        stats['avg_rebuild_time'] = stats['rebuild_time'] / stats['rebuilds'] if stats['rebuilds'] else 0.0
+        return stats
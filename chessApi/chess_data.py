@@ -0,0 +1,285 @@
+"""
+Created on 18.10.2026
+Provides the chess-specific processing of the exercise data: validation and
+parsing of puzzle collections. Independent of the REST API.
+@author: lorinc
+
+"""
+
+import io
+import time
+import chess
+import chess.pgn
+import chess.polyglot
+
+SOLUTION = 'SOLUTION'
+PARTIAL = 'PARTIAL'
+WRONG = 'WRONG'
+# separates the alternative solutions in the list of moves of an exercise
+LINE_SEPARATOR = ';'
+
+
+def check_chess_data(initial_state, list_moves, checkmate_needed=True, cpu_budget=None):
+    """
+    Checks if a given initial board state and a list of SAN moves is valid with the rules of chess.
+    The list of moves may contain alternative solutions separated by `;`, each a full line from the initial state.
+    The lines have to agree on the reply of the opponent in every position, and every line has to end with
+    checkmate if it's needed.
+    :param initial_state: FEN string of the initial board state.
+    :param list_moves: Comma-separated list of SAN moves, alternative lines separated by semicolons.
+    :param checkmate_needed: Wheter it's required to have a checkmate at the end of the moves or not.
+    :param cpu_budget: The CPU time the check may use in seconds, None for no limit.
+    :return: `True` if the provided data is valid chess-wise, `None` if the check ran out of its CPU budget.
+    """
+    deadline = time.process_time() + cpu_budget if cpu_budget is not None else None
+    # the reply of the opponent in the positions reached by the lines
+    replies = {}
+    try:
+        for line in list_moves.split(LINE_SEPARATOR):
+            # check if initial state is valid
+            board = chess.Board(initial_state)
+            # test the list of moves
+            moves = line.split(',')
+            for ply, san_move in enumerate(moves):
+                if deadline is not None and time.process_time() > deadline:
+                    return None
+                move = board.parse_san(san_move)
+                if ply % 2 and replies.setdefault(position_hash(board), move) != move:
+                    return False
+                board.push(move)
+            # valid exercise ends with checkmate
+            if checkmate_needed and not board.is_checkmate():
+                return False
+    except (ValueError, AttributeError):
+        return False
+    return True
+
+
+def split_pgn(lines):
+    """
+    Splits a stream of PGN text into the texts of the single games, without parsing them.
+    :param lines: Iterable of the lines of the PGN text, e.g. an open file.
+    :return: generator of the PGN texts of the games.
+    """
+    game = []
+    in_movetext = False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('[') and in_movetext:
+            yield ''.join(game)
+            game = []
+            in_movetext = False
+        elif stripped and not stripped.startswith('[') and not stripped.startswith('%'):
+            in_movetext = True
+        game.append(line)
+    if in_movetext:
+        yield ''.join(game)
+
+
+def parse_pgn_puzzle(text):
+    """
+    Parses and validates a puzzle stored as a PGN game. The title of the exercise is read from the `Event`
+    header, the description from the optional `Description` header, the initial state from the `FEN` header
+    (standard starting position if missing) and the solution from the mainline.
+    :param text: The PGN text of a single game.
+    :return: tuple of title, description, initial state and list of moves, or None if the puzzle is not a valid
+        exercise as defined by :py:func:`check_chess_data`.
+    """
+    try:
+        game = chess.pgn.read_game(io.StringIO(text))
+    except ValueError:
+        return None
+    if game is None or game.errors:
+        return None
+    title = game.headers.get('Event')
+    if not title or title == '?':
+        return None
+    initial_state = game.board().fen()
+    list_moves = ','.join(node.san() for node in game.mainline())
+    if not check_chess_data(initial_state, list_moves):
+        return None
+    return title, game.headers.get('Description'), initial_state, list_moves
+
+
+def parse_epd_puzzle(line):
+    """
+    Parses and validates a puzzle stored as an EPD record. The title of the exercise is read from the `id`
+    operation, the description from the optional `c0` comment and the solution from the `pv` operation, or if
+    missing, from the first `bm` move.
+    :param line: A single EPD record.
+    :return: tuple of title, description, initial state and list of moves, or None if the puzzle is not a valid
+        exercise as defined by :py:func:`check_chess_data`.
+    """
+    board = chess.Board()
+    try:
+        operations = board.set_epd(line.strip())
+    except ValueError:
+        return None
+    title = operations.get('id')
+    moves = operations.get('pv') or operations.get('bm', [])[:1]
+    if not title or not moves:
+        return None
+    initial_state = board.fen()
+    sans = []
+    try:
+        for move in moves:
+            sans.append(board.san(move))
+            board.push(move)
+    except (ValueError, AssertionError):
+        return None
+    list_moves = ','.join(sans)
+    if not check_chess_data(initial_state, list_moves):
+        return None
+    return title, operations.get('c0'), initial_state, list_moves
+
+
+def normalize_san(san):
+    """
+    Normalizes the spelling of a SAN move so that moves can be compared as tokens: the check, checkmate and
+    annotation suffixes are dropped and castling written with zeros is spelled with letters.
+    :param san: A SAN move, e.g. `Qh4#`.
+    :return: The normalized SAN, e.g. `Qh4`.
+    """
+    return san.strip().rstrip('+#!?').replace('0-0', 'O-O')
+
+
+def position_hash(board):
+    """
+    Computes the Zobrist hash of a position as a signed 64-bit integer, so that it fits an SQLite INTEGER.
+    :param board: chess.Board object.
+    :return: The hash of the position.
+    """
+    value = chess.polyglot.zobrist_hash(board)
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def compare_solution(solution, proposed):
+    """
+    Compares a proposed solution string with the actual solution of an exercise, move by move. The moves are
+    compared as normalized SAN tokens, so `Qh4#` and `Qh4` are the same move but `Qh4` does not start `Qh4xe1`.
+    :param solution: The comma-separated SAN moves of the solution, alternative lines separated by semicolons.
+    :param proposed: The comma-separated SAN moves of the proposed solution.
+    :return: tuple of `SOLUTION` if the proposed solution is one of the lines of the actual solution, of `PARTIAL`
+        and the next move of the first line it is the beginning of, or of `WRONG` otherwise.
+    """
+    proposed_tokens = [normalize_san(move) for move in proposed.split(',')]
+    partial = None
+    for line in solution.split(LINE_SEPARATOR):
+        solution_moves = line.split(',')
+        solution_tokens = [normalize_san(move) for move in solution_moves]
+        if solution_tokens == proposed_tokens:
+            return SOLUTION,
+        if partial is None and solution_tokens[:len(proposed_tokens)] == proposed_tokens:
+            partial = PARTIAL, solution_moves[len(proposed_tokens)]
+    return partial or (WRONG,)
+
+
+def parse_move(board, token):
+    """
+    Parses a move given in SAN, or failing that in UCI.
+    :param board: chess.Board object of the position the move is played in.
+    :param token: The move.
+    :return: chess.Move object.
+    :raises ValueError: if the move is not legal on the board.
+    """
+    try:
+        return board.parse_san(token)
+    except ValueError:
+        return board.parse_uci(token.strip())
+
+
+def compile_solution(initial_state, list_moves):
+    """
+    Replays the lines of the solution of an exercise once and merges them into a move tree. The nodes of the tree
+    are the positions, identified by their hash, so transpositions are merged and the tree is a DAG.
+    :param initial_state: FEN string of the initial board state.
+    :param list_moves: Comma-separated list of SAN moves, alternative lines separated by semicolons.
+    :return: list of the edges of the tree, each a tuple of the hash of the position before the move, the SAN and
+        the UCI code of the move and the hash of the position after it. The edges are in the order of the lines, so
+        the first one starts from the initial position. None if the data is not valid chess-wise.
+    """
+    edges = []
+    seen = set()
+    try:
+        for line in list_moves.split(LINE_SEPARATOR):
+            board = chess.Board(initial_state)
+            for san in line.split(','):
+                from_hash = position_hash(board)
+                move = board.push_san(san)
+                if (from_hash, move.uci()) not in seen:
+                    seen.add((from_hash, move.uci()))
+                    edges.append((from_hash, san, move.uci(), position_hash(board)))
+    except (ValueError, AttributeError):
+        return None
+    return edges
+
+
+class CompiledSolution(object):
+    """
+    The move tree of the solution of an exercise compiled by :py:func:`compile_solution`. Proposed moves are
+    followed in the tree token by token, as normalized SAN or as UCI codes, without replaying them on a board, so
+    the cost of a comparison is linear in the number of proposed moves. The leaves of the tree are the checkmates.
+    :param edges: The list returned by :py:func:`compile_solution`.
+    """
+    def __init__(self, edges):
+        super(CompiledSolution, self).__init__()
+        self.edges = edges
+        self.root = edges[0][0]
+        # position hash -> list of the moves from the position, in the order of the lines
+        self._children = {}
+        for from_hash, san, uci, to_hash in edges:
+            self._children.setdefault(from_hash, []).append((normalize_san(san), uci, san, to_hash))
+
+    def __len__(self):
+        return len(self.edges)
+
+    def follow(self, node, token):
+        """
+        Follows a move in the tree.
+        :param node: The hash of the current position.
+        :param token: The move, in SAN or UCI.
+        :return: tuple of the SAN, the UCI code and the hash of the position after the move, or None if the move
+            leaves the solution.
+        """
+        token = normalize_san(token)
+        for san_token, uci, san, to_hash in self._children.get(node, ()):
+            if token == san_token or token == uci:
+                return san, uci, to_hash
+        return None
+
+    def reply(self, node):
+        """
+        :param node: The hash of the current position.
+        :return: tuple of the SAN, the UCI code and the hash of the position after the first move of the solution
+            from the position, or None if the position is a leaf.
+        """
+        children = self._children.get(node)
+        if not children:
+            return None
+        _, uci, san, to_hash = children[0]
+        return san, uci, to_hash
+
+    def is_final(self, node):
+        """
+        :param node: The hash of the position.
+        :return: `True` if the position is a leaf of the tree, the end of a line of the solution.
+        """
+        return node not in self._children
+
+    def compare(self, proposed):
+        """
+        Compares the proposed moves with the solution.
+        :param proposed: List of the proposed moves, in SAN or UCI.
+        :return: tuple of `SOLUTION` if the proposed moves are a line of the solution, or of `PARTIAL` and the
+            next move of the solution if they are the beginning of a line. None if they leave the solution; whether
+            they are `WRONG` or not legal at all can only be told on a board.
+        """
+        node = self.root
+        for token in proposed:
+            edge = self.follow(node, token)
+            if edge is None:
+                return None
+            node = edge[2]
+        if self.is_final(node):
+            return SOLUTION,
+        return PARTIAL, self.reply(node)[0]
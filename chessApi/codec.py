@@ -0,0 +1,153 @@
+"""
+Created on 18.10.2026
+Encodes and decodes the JSON bodies of the API. A faster library is used when
+one is installed and produces the same output as the standard json module,
+otherwise the standard json module is used.
+@author: lorinc
+
+"""
+
+import json
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STDLIB = 'json'
+UJSON = 'ujson'
+ORJSON = 'orjson'
+
+# documents the output of an encoder is compared on before using it
+PROBES = [
+    {},
+    [],
+    {'@namespaces': {'chessapi': {'name': '/api/link-relations/'}}, '@controls': {'self': {'href': '/api/users/'}}},
+    {'items': [{'headline': 'Mate in two', 'author': 'Mystery', 'registrationdate': 1362015937}]},
+    ['/a/b?c=d&e', '<>&\'"\\', '\t\n\r\x00\x1f\x7f', 'kérdés ♞    \U0001f600'],
+    [0, -1, 2 ** 53 + 1, 12345678901234567890, 0.1, -0.0, 1e16, 1.5e-7, 123456.789, True, False, None],
+    {'nested': [[[]], [{}], {'a': [1, {'b': None}]}]}
+]
+
+_encoders = {
+    STDLIB: json.dumps
+}
+_decoders = {
+    STDLIB: json.loads
+}
+if ujson is not None:
+    _encoders[UJSON] = lambda obj: ujson.dumps(obj, ensure_ascii=True, escape_forward_slashes=False,
+                                               separators=(', ', ': '))
+    _decoders[UJSON] = ujson.loads
+if orjson is not None:
+    _decoders[ORJSON] = orjson.loads
+
+
+def _same_output(encode):
+    """
+    :param encode: The encoder function.
+    :return: True if the encoder produces the output of the standard json
+        module for every probe document.
+
+    """
+    try:
+        return all(encode(probe) == json.dumps(probe) for probe in PROBES)
+    except (TypeError, ValueError, OverflowError):
+        return False
+
+
+def available_encoders():
+    """
+    :return: the names of the installed encoders producing the same output as
+        the standard json module, the preferred first.
+
+    """
+    return [name for name in (UJSON, STDLIB) if name in _encoders and _same_output(_encoders[name])]
+
+
+def available_decoders():
+    """
+    :return: the names of the installed decoders, the preferred first.
+
+    """
+    return [name for name in (ORJSON, UJSON, STDLIB) if name in _decoders]
+
+
+_encoder_name = available_encoders()[0]
+_decoder_name = available_decoders()[0]
+_encode = _encoders[_encoder_name]
+_decode = _decoders[_decoder_name]
+
+
+def use(encoder=None, decoder=None):
+    """
+    Selects the encoder and the decoder used by :py:func:`dumps` and
+    :py:func:`loads`.
+
+    :param str encoder: The name of the encoder, e.g. :py:data:`STDLIB`, or
+        None to keep the current one.
+    :param str decoder: The name of the decoder, or None to keep the current
+        one.
+    :raises ValueError: if the encoder is not installed or does not produce
+        the same output as the standard json module, or the decoder is not
+        installed.
+
+    """
+    global _encoder_name, _decoder_name, _encode, _decode
+    if encoder is not None:
+        if encoder not in available_encoders():
+            raise ValueError('The %s encoder is not available' % encoder)
+        _encoder_name, _encode = encoder, _encoders[encoder]
+    if decoder is not None:
+        if decoder not in _decoders:
+            raise ValueError('The %s decoder is not available' % decoder)
+        _decoder_name, _decode = decoder, _decoders[decoder]
+
+
+def names():
+    """
+    :return: tuple of the names of the current encoder and decoder.
+
+    """
+    return _encoder_name, _decoder_name
+
+
+def dumps(obj):
+    """
+    Encodes an object, with the same output as ``json.dumps(obj)``.
+
+    :param obj: The object to encode.
+    :return: The JSON string.
+    :raises TypeError: if the object is not serializable.
+
+    """
+    if _encode is not json.dumps:
+        try:
+            return _encode(obj)
+        except (TypeError, ValueError, OverflowError):
+            # e.g. lone surrogates, the standard json module decides
+            pass
+    return json.dumps(obj)
+
+
+def loads(data):
+    """
+    Decodes a JSON document, accepting what ``json.loads`` accepts.
+
+    :param data: The JSON document, as str or bytes.
+    :return: The decoded object.
+    :raises ValueError: if the document is not valid JSON.
+
+    """
+    if _decode is not json.loads:
+        try:
+            return _decode(data)
+        except ValueError:
+            # e.g. NaN or other encodings than UTF-8, the standard json module decides
+            pass
+    return json.loads(data)
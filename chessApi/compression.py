@@ -0,0 +1,230 @@
+"""
+Created on 18.10.2026
+Provides the gzip and deflate compression of the responses: the negotiation of
+the content coding, and a WSGI middleware compressing the responses of the
+wrapped application.
+@author: lorinc
+
+"""
+
+import gzip
+import sys
+import zlib
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_cache_control_header, quote_etag, unquote_etag
+from chessApi.cache import LRUCache
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+# the preferred first, when the client accepts both equally
+ENCODINGS = (GZIP, DEFLATE)
+DEFAULT_LEVEL = 6
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_MAX_SIZE = 8 * 1024 * 1024
+DEFAULT_CACHE_SIZE = 128
+DEFAULT_CACHE_BYTES = 8 * 1024 * 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def negotiate(accept_encoding):
+    """
+    Picks the content coding of a response.
+
+    :param str accept_encoding: The Accept-Encoding header of the request.
+    :return: :py:data:`GZIP`, :py:data:`DEFLATE`, or None if the response is
+        not to be compressed.
+
+    """
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_header(accept_encoding)
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding, level=DEFAULT_LEVEL):
+    """
+    :param bytes body: The body of a response.
+    :param str encoding: :py:data:`GZIP` or :py:data:`DEFLATE`.
+    :param int level: The compression level, from 1 (fastest) to 9 (smallest).
+    :return: The compressed body.
+
+    """
+    if encoding == GZIP:
+        return gzip.compress(body, level, mtime=0)
+    return zlib.compress(body, level)
+
+
+def compress_body(body, encoding, level=DEFAULT_LEVEL, min_size=DEFAULT_MIN_SIZE):
+    """
+    :param bytes body: The body of a response.
+    :param str encoding: :py:data:`GZIP` or :py:data:`DEFLATE`.
+    :param int level: The compression level.
+    :param int min_size: The size under which bodies are not compressed.
+    :return: The compressed body, or None if the body is too small or does not
+        shrink.
+
+    """
+    if len(body) < min_size:
+        return None
+    compressed = compress(body, encoding, level)
+    return compressed if len(compressed) < len(body) else None
+
+
+def is_compressible(mimetype):
+    """
+    :param str mimetype: The mimetype of a response, without parameters.
+    :return: True if responses of the type are worth compressing.
+
+    """
+    return mimetype.startswith(COMPRESSIBLE_TYPES) or mimetype.endswith('+json') or mimetype.endswith('+xml')
+
+
+def _weak_etag(etag):
+    """
+    :param str etag: The ETag header of a response.
+    :return: The weak form of the entity tag, as its bytes change with the
+        content coding.
+
+    """
+    tag, weak = unquote_etag(etag)
+    return etag if weak or tag is None else quote_etag(tag, weak=True)
+
+
+def _variant_size(key, body):
+    return sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) + sys.getsizeof(body)
+
+
+class CompressionMiddleware(object):
+    """
+    WSGI middleware compressing the successful responses of an application
+    with gzip or deflate, as negotiated with the Accept-Encoding header of the
+    request.
+
+    Only responses of a compressible type with a Content-Length between
+    ``min_size`` and ``max_size`` are compressed, streamed responses are
+    passed through. Responses already having a Content-Encoding, or marked
+    with ``Cache-Control: no-transform``, are left alone.
+
+    The compressed forms of responses with an ETag, e.g. the static files,
+    are kept in a bounded cache keyed by the URL and the ETag, so they are not
+    compressed again on every request.
+
+    :param app: The wrapped WSGI application.
+    :param int level: The compression level, from 1 (fastest) to 9 (smallest).
+    :param int min_size: The size under which responses are not compressed.
+    :param int max_size: The size over which responses are not compressed.
+    :param int cache_size: The number of compressed responses kept, 0 to keep
+        none.
+
+    """
+
+    def __init__(self, app, level=DEFAULT_LEVEL, min_size=DEFAULT_MIN_SIZE, max_size=DEFAULT_MAX_SIZE,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        super(CompressionMiddleware, self).__init__()
+        self.app = app
+        self.level = level
+        self.min_size = min_size
+        self.max_size = max_size
+        self._variants = LRUCache(cache_size, maxbytes=DEFAULT_CACHE_BYTES, sizeof=_variant_size) \
+            if cache_size else None
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None or environ['REQUEST_METHOD'] == 'HEAD':
+            return self.app(environ, start_response)
+
+        started = []
+        written = []
+
+        def capture(status, headers, exc_info=None):
+            started[:] = [status, headers, exc_info]
+            return written.append
+
+        app_iter = self.app(environ, capture)
+        chunks = None
+        if not started:
+            # the application starts the response on the first iteration
+            chunks = self._read(app_iter)
+        status, headers, exc_info = started
+        headers = Headers(headers)
+        if not self._compressible(status, headers):
+            start_response(status, headers.to_wsgi_list(), exc_info)
+            if chunks is None:
+                if not written:
+                    return app_iter
+                chunks = written + self._read(app_iter)
+            return chunks
+        if chunks is None:
+            chunks = written + self._read(app_iter)
+        body = b''.join(chunks)
+
+        compressed = self._compress(environ, headers, body, encoding)
+        if 'Vary' in headers:
+            headers['Vary'] += ', Accept-Encoding'
+        else:
+            headers['Vary'] = 'Accept-Encoding'
+        if compressed is not None:
+            body = compressed
+            headers['Content-Encoding'] = encoding
+            headers.remove('Accept-Ranges')
+            if 'ETag' in headers:
+                headers['ETag'] = _weak_etag(headers['ETag'])
+        headers['Content-Length'] = str(len(body))
+        start_response(status, headers.to_wsgi_list(), exc_info)
+        return [body]
+
+    @staticmethod
+    def _read(app_iter):
+        """
+        :return: the list of the chunks of the body, closing the iterable.
+
+        """
+        try:
+            return list(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+    def _compressible(self, status, headers):
+        """
+        :return: True if the response is to be compressed.
+
+        """
+        code = int(status.split(None, 1)[0])
+        if code < 200 or code >= 300 or code in (204, 206) or 'Content-Encoding' in headers:
+            return False
+        if 'no-transform' in parse_cache_control_header(headers.get('Cache-Control')):
+            return False
+        mimetype = headers.get('Content-Type', '').split(';', 1)[0].strip()
+        length = headers.get('Content-Length')
+        return is_compressible(mimetype) and length is not None and self.min_size <= int(length) <= self.max_size
+
+    def _compress(self, environ, headers, body, encoding):
+        """
+        :return: the compressed body, from the cache if the response has an
+            ETag, or None if it does not shrink.
+
+        """
+        etag = headers.get('ETag')
+        if self._variants is None or etag is None:
+            return compress_body(body, encoding, self.level, self.min_size)
+        key = (environ.get('HTTP_HOST', ''), environ.get('SCRIPT_NAME', ''), environ.get('PATH_INFO', ''),
+               environ.get('QUERY_STRING', ''), etag, encoding)
+        compressed = self._variants.get(key)
+        if compressed is None:
+            compressed = compress_body(body, encoding, self.level, self.min_size) or b''
+            self._variants.put(key, compressed)
+        return compressed or None
+
+    def stats(self):
+        """
+        :return: the statistics of the cache of the compressed responses, or
+            None if there is no cache.
+
+        """
+        return self._variants.stats() if self._variants is not None else None
@@ -6,13 +6,505 @@ Provides the database API to access the forum persistent data.
 """
 
 from datetime import datetime
+import functools
+import multiprocessing
 import sqlite3
 import os
+import threading
 import time
+from chessApi import chess_data
+from chessApi.cache import LRUCache, ResponseCache
 
 DEFAULT_DB_PATH = 'db/chessApi.db'
 DEFAULT_SCHEMA = "db/chessApi_schema_dump.sql"
 DEFAULT_DATA_DUMP = "db/chessApi_data_dump.sql"
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_TIMEOUT = 10.0
+DEFAULT_POOL_MAX_IDLE = 300.0
+DEFAULT_POOL_PING_INTERVAL = 30.0
+DEFAULT_IMPORT_BATCH_SIZE = 5000
+DEFAULT_FETCH_BATCH_SIZE = 500
+DEFAULT_EXERCISE_CACHE_SIZE = 1024
+DEFAULT_EXERCISE_CACHE_TTL = 60.0
+DEFAULT_RESPONSE_CACHE_SIZE = 256
+DEFAULT_RESPONSE_CACHE_BYTES = 16 * 1024 * 1024
+# the number of logged cache invalidations kept for the processes which have
+# not repeated them yet, a process lagging further behind drops its caches
+INVALIDATION_LOG_SIZE = 1000
+# Tags of the cached responses, invalidated by the write methods of Connection:
+# the membership of the lists of exercises and of users, and the single rows.
+EXERCISES_TAG = 'exercises'
+USERS_TAG = 'users'
+IMPORT_FORMATS = {
+    'pgn': (chess_data.split_pgn, chess_data.parse_pgn_puzzle),
+    'epd': (lambda lines: (line for line in lines if line.strip() and not line.startswith('#')),
+            chess_data.parse_epd_puzzle)
+}
+
+# Named performance profiles. The PRAGMA statements of a profile are applied
+# once, when a connection is opened.
+#   compat: the sqlite3 defaults (rollback journal, full synchronous writes)
+#   balanced: WAL journal, so readers do not block on the writer, with
+#       synchronous writes only on checkpoints
+#   fast: WAL journal without synchronous writes. Durability is traded for
+#       write throughput, a power loss may lose the last transactions.
+PROFILES = {
+    'compat': {
+        'busy_timeout': 5000,
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL'
+    },
+    'balanced': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 64 * 1024 * 1024,
+        'cache_size': -16000,
+        'temp_store': 'MEMORY'
+    },
+    'fast': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,
+        'temp_store': 'MEMORY'
+    }
+}
+DEFAULT_PROFILE = 'balanced'
+
+
+def _store_solution(con, exercise_id, initial_state, list_moves):
+    """
+    Compiles the solution of an exercise into a move tree with
+    :py:func:`chessApi.chess_data.compile_solution` and replaces its rows in
+    the ``solution_edges`` table. Nothing is stored for invalid chess data.
+
+    :param con: The sqlite3 connection.
+    :param int exercise_id: The id of the exercise.
+    :param str initial_state: The initial state of the exercise.
+    :param str list_moves: The solution of the exercise.
+    :return: the edges of the tree, or None if the data is not valid
+        chess-wise.
+
+    """
+    edges = chess_data.compile_solution(initial_state, list_moves)
+    con.execute('DELETE FROM solution_edges WHERE exercise_id = ?', (exercise_id,))
+    if edges is not None:
+        con.executemany('INSERT INTO solution_edges (exercise_id, from_hash, uci, san, to_hash, rank) \
+                         VALUES (?,?,?,?,?,?)',
+                        [(exercise_id, from_hash, uci, san, to_hash, rank)
+                         for rank, (from_hash, san, uci, to_hash) in enumerate(edges)])
+    return edges
+
+
+def _parse_import_puzzle(parse, item):
+    """
+    Parses a puzzle of an imported file and compiles its solution. Runs in the
+    import worker processes.
+
+    :param parse: The parse function of the format, see
+        :py:data:`IMPORT_FORMATS`.
+    :param item: The text of the puzzle.
+    :return: tuple of the title, description, initial state, list of moves
+        and edges of the move tree of the puzzle, or None if it is not valid.
+
+    """
+    puzzle = parse(item)
+    if puzzle is None:
+        return None
+    title, description, initial_state, list_moves = puzzle
+    return title, description, initial_state, list_moves, chess_data.compile_solution(initial_state, list_moves)
+
+
+def _compile_solution_trees(con):
+    """
+    Migration step compiling the solutions of the existing exercises into
+    move trees.
+
+    :param con: The sqlite3 connection.
+
+    """
+    rows = con.execute('SELECT exercise_id, initial_state, list_moves FROM exercises').fetchall()
+    for exercise_id, initial_state, list_moves in rows:
+        _store_solution(con, exercise_id, initial_state, list_moves)
+
+
+# Ordered schema migrations applied on top of the schema dump. The schema
+# version of a database file is tracked in its PRAGMA user_version, every
+# migration is applied in its own transaction. A migration is a tuple of the
+# version it upgrades to, a description and a tuple of steps. A step is either
+# an SQL statement or a callable receiving the sqlite3 connection.
+# Never modify an already released migration, append a new one instead.
+MIGRATIONS = [
+    (1, 'Index exercises by author', (
+        'CREATE INDEX IF NOT EXISTS exercises_user_id ON exercises(user_id)',
+    )),
+    (2, 'Index exercises by submission date', (
+        'CREATE INDEX IF NOT EXISTS exercises_sub_date ON exercises(sub_date)',
+    )),
+    (3, 'Solution move trees', (
+        'CREATE TABLE IF NOT EXISTS solution_edges(\
+            exercise_id INTEGER NOT NULL REFERENCES exercises(exercise_id) ON DELETE CASCADE,\
+            from_hash INTEGER NOT NULL,\
+            uci TEXT NOT NULL,\
+            san TEXT NOT NULL,\
+            to_hash INTEGER NOT NULL,\
+            rank INTEGER NOT NULL,\
+            PRIMARY KEY(exercise_id, from_hash, uci)) WITHOUT ROWID',
+        _compile_solution_trees
+    )),
+    # The version of a row is bumped by the triggers on every modification of
+    # its representation, including the renaming or the removal of the author
+    # of an exercise. The modification time is NULL until the first one.
+    (4, 'Row versions', (
+        'ALTER TABLE exercises ADD COLUMN version INTEGER NOT NULL DEFAULT 1',
+        'ALTER TABLE exercises ADD COLUMN modified INTEGER',
+        'ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 1',
+        'ALTER TABLE users ADD COLUMN modified INTEGER',
+        'CREATE TRIGGER IF NOT EXISTS exercises_version\
+            AFTER UPDATE OF user_id, title, description, initial_state, list_moves ON exercises\
+            BEGIN\
+                UPDATE exercises SET version = OLD.version + 1, modified = CAST(strftime(\'%s\', \'now\') AS INTEGER)\
+                WHERE exercise_id = NEW.exercise_id;\
+            END',
+        'CREATE TRIGGER IF NOT EXISTS users_version\
+            AFTER UPDATE OF nickname, email ON users\
+            BEGIN\
+                UPDATE users SET version = OLD.version + 1, modified = CAST(strftime(\'%s\', \'now\') AS INTEGER)\
+                WHERE user_id = NEW.user_id;\
+                UPDATE exercises SET version = version + 1, modified = CAST(strftime(\'%s\', \'now\') AS INTEGER)\
+                WHERE user_id = NEW.user_id AND NEW.nickname IS NOT OLD.nickname;\
+            END'
+    )),
+    # The solver sessions are shared by the worker processes of the server.
+    # A session stores the moves played so far, the version of the exercise
+    # they were played against, and the FEN and the move tree node of the
+    # current position to resume from; the ply serves as the version of the
+    # session itself.
+    (5, 'Solver sessions', (
+        'CREATE TABLE IF NOT EXISTS solver_sessions(\
+            session_id TEXT PRIMARY KEY,\
+            exercise_id INTEGER NOT NULL REFERENCES exercises(exercise_id) ON DELETE CASCADE,\
+            version INTEGER NOT NULL,\
+            list_moves TEXT NOT NULL DEFAULT \'\',\
+            ply INTEGER NOT NULL DEFAULT 0,\
+            fen TEXT NOT NULL,\
+            node INTEGER NOT NULL,\
+            touched REAL NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS solver_sessions_touched ON solver_sessions(touched)'
+    )),
+    # The cache invalidations of the write methods are logged, so the worker
+    # processes of the server repeat the invalidations of each other.
+    (6, 'Cache invalidation log', (
+        'CREATE TABLE IF NOT EXISTS invalidations(\
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,\
+            kind TEXT NOT NULL,\
+            value TEXT NOT NULL)',
+    ))
+]
+
+
+def exercise_tag(exercise_id):
+    """
+    :param exercise_id: The id of an exercise.
+    :return: the tag of the cached responses showing the exercise.
+
+    """
+    return 'exercise:%d' % int(exercise_id)
+
+
+def user_tag(nickname):
+    """
+    :param nickname: The nickname of a user.
+    :return: the tag of the cached responses showing the user, including the
+        lists of exercises showing their author.
+
+    """
+    return 'user:%s' % nickname
+
+
+def _log_invalidation(con, kind, value=''):
+    """
+    Logs a cache invalidation in the current transaction of the modification,
+    so the other processes repeat it once it is committed, see
+    :py:meth:`Engine.sync_caches`. The oldest invalidations are removed,
+    :py:data:`INVALIDATION_LOG_SIZE` are kept.
+
+    :param con: The sqlite3 connection.
+    :param str kind: ``'exercise'``, ``'author'``, ``'tag'`` or ``'all'``
+        when every cached row and response is stale.
+    :param value: The id of the exercise, the nickname of the author or
+        the tag of the responses.
+
+    """
+    cur = con.execute('INSERT INTO invalidations (kind, value) VALUES (?,?)', (kind, str(value)))
+    con.execute('DELETE FROM invalidations WHERE seq <= ?', (cur.lastrowid - INVALIDATION_LOG_SIZE,))
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """
+    Raised when no pooled connection became available within the checkout
+    timeout.
+
+    """
+    pass
+
+
+class ConflictError(sqlite3.IntegrityError):
+    """
+    Raised when a modification would duplicate a value which has to be
+    unique, such as the title of an exercise or the nickname of a user.
+
+    """
+    pass
+
+
+def _raise_conflict(error):
+    """
+    Raises :py:class:`ConflictError` if `error` is the violation of a UNIQUE
+    constraint.
+
+    :param sqlite3.IntegrityError error: The error raised by sqlite3.
+    :raises ConflictError: if a UNIQUE constraint failed.
+
+    """
+    if 'UNIQUE' in str(error):
+        raise ConflictError(str(error)) from error
+
+
+class ConnectionPool(object):
+    """
+    A bounded pool of :py:class:`Connection` instances sharing the same
+    database file.
+
+    Connections are handed out in LIFO order, so that under light load the
+    same few connections are reused and the rest can age out. The pool can be
+    used from several threads at the same time, the underlying sqlite3
+    connections are therefore opened with ``check_same_thread=False``. A
+    connection must only be used by one thread while it is checked out.
+
+    Instances should be obtained through :py:meth:`Engine.pool`.
+
+    :param db_path: Location of the database file.
+    :param int size: The maximum number of connections open at the same time.
+    :param float timeout: Seconds to wait for a free connection before
+        :py:class:`PoolTimeoutError` is raised.
+    :param float max_idle: Idle connections older than this (seconds) are
+        closed.
+    :param float ping_interval: A connection which was idle for longer than
+        this (seconds) is health checked before being handed out. Zero checks
+        on every checkout.
+    :param str profile: The name of the performance profile of the
+        connections, one of :py:data:`PROFILES`.
+    :param exercise_cache: The exercise cache shared by the connections, or
+        None.
+    :type exercise_cache: LRUCache
+    :param response_cache: The response cache invalidated by the
+        connections, or None.
+    :type response_cache: ResponseCache
+
+    """
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_POOL_TIMEOUT,
+                 max_idle=DEFAULT_POOL_MAX_IDLE, ping_interval=DEFAULT_POOL_PING_INTERVAL,
+                 profile=DEFAULT_PROFILE, exercise_cache=None, response_cache=None):
+        super(ConnectionPool, self).__init__()
+        if size < 1:
+            raise ValueError('The pool size must be at least 1')
+        self.db_path = db_path
+        self.profile = profile
+        self.exercise_cache = exercise_cache
+        self.response_cache = response_cache
+        self.size = size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.ping_interval = ping_interval
+        self._cond = threading.Condition()
+        # list of (Connection, time of return) tuples, the most recent last
+        self._idle = []
+        self._in_use = 0
+        self._disposed = False
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'evicted': 0,
+            'failed_pings': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+            'busy_time': 0.0
+        }
+        self._created_at = time.monotonic()
+        self._busy_since = None
+
+    def _open(self):
+        """
+        Opens a new pooled connection.
+
+        """
+        con = Connection(self.db_path, pool=self, profile=self.profile, exercise_cache=self.exercise_cache,
+                         response_cache=self.response_cache)
+        self._stats['created'] += 1
+        return con
+
+    def _evict_idle(self, now):
+        """
+        Closes the idle connections which have not been used for
+        :py:attr:`max_idle` seconds. Must be called holding the lock.
+
+        """
+        while self._idle and now - self._idle[0][1] > self.max_idle:
+            con, _ = self._idle.pop(0)
+            con._disconnect()
+            self._stats['evicted'] += 1
+
+    def _mark_busy(self, now):
+        """
+        Bookkeeping of the time during which every connection of the pool is
+        checked out. Must be called holding the lock.
+
+        """
+        if self._in_use >= self.size and self._busy_since is None:
+            self._busy_since = now
+        elif self._in_use < self.size and self._busy_since is not None:
+            self._stats['busy_time'] += now - self._busy_since
+            self._busy_since = None
+
+    def acquire(self, timeout=None):
+        """
+        Checks out a connection from the pool, opening a new one if the pool
+        is not full yet.
+
+        :param timeout: Seconds to wait for a free connection. If None,
+            :py:attr:`timeout` is used.
+        :return: A Connection instance. Calling its :py:meth:`Connection.close`
+            method gives it back to the pool.
+        :rtype: Connection
+        :raises PoolTimeoutError: if no connection became available in time.
+
+        """
+        if timeout is None:
+            timeout = self.timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        con = None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._evict_idle(now)
+                if self._idle:
+                    con, returned = self._idle.pop()
+                    break
+                if self._in_use < self.size:
+                    break
+                if now >= deadline:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError('No database connection available in %.1f s' % timeout)
+                self._cond.wait(deadline - now)
+            self._in_use += 1
+            self._mark_busy(now)
+            wait = now - start
+            self._stats['checkouts'] += 1
+            self._stats['total_wait'] += wait
+            self._stats['max_wait'] = max(self._stats['max_wait'], wait)
+
+        try:
+            if con is not None and now - returned > self.ping_interval and not con.ping():
+                self._stats['failed_pings'] += 1
+                con._disconnect()
+                con = None
+            if con is None:
+                con = self._open()
+        except Exception:
+            self._discard()
+            raise
+        con._isclosed = False
+        return con
+
+    def _discard(self):
+        """
+        Frees the slot of a checked out connection which will not be returned.
+
+        """
+        with self._cond:
+            self._in_use -= 1
+            self._mark_busy(time.monotonic())
+            self._cond.notify()
+
+    def release(self, con):
+        """
+        Gives back a checked out connection to the pool. It is preferred to
+        call :py:meth:`Connection.close` instead.
+
+        :param con: The Connection instance to return.
+
+        """
+        with self._cond:
+            self._in_use -= 1
+            now = time.monotonic()
+            self._mark_busy(now)
+            if self._disposed:
+                con._disconnect()
+            else:
+                self._idle.append((con, now))
+                self._evict_idle(now)
+            self._cond.notify()
+
+    def dispose(self):
+        """
+        Closes every idle connection. Connections still checked out are closed
+        when they are returned. The pool must not be used afterwards.
+
+        """
+        with self._cond:
+            self._disposed = True
+            while self._idle:
+                con, _ = self._idle.pop()
+                con._disconnect()
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        Returns the usage statistics of the pool.
+
+        :return: a dictionary with the following keys:
+
+            * ``size``: maximum number of connections
+            * ``in_use``: number of checked out connections
+            * ``idle``: number of open connections waiting in the pool
+            * ``checkouts``: number of successful checkouts
+            * ``timeouts``: number of checkouts which timed out
+            * ``created``: number of connections opened so far
+            * ``evicted``: number of idle connections closed
+            * ``failed_pings``: number of connections found broken on checkout
+            * ``avg_wait``: average wait time of a checkout (seconds)
+            * ``max_wait``: longest wait time of a checkout (seconds)
+            * ``utilisation``: ratio of checked out connections to size
+            * ``saturation``: ratio of the pool lifetime spent with every
+              connection checked out
+
+        """
+        with self._cond:
+            now = time.monotonic()
+            busy_time = self._stats['busy_time']
+            if self._busy_since is not None:
+                busy_time += now - self._busy_since
+            checkouts = self._stats['checkouts']
+            return {
+                'size': self.size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': checkouts,
+                'timeouts': self._stats['timeouts'],
+                'created': self._stats['created'],
+                'evicted': self._stats['evicted'],
+                'failed_pings': self._stats['failed_pings'],
+                'avg_wait': self._stats['total_wait'] / checkouts if checkouts else 0.0,
+                'max_wait': self._stats['max_wait'],
+                'utilisation': self._in_use / self.size,
+                'saturation': busy_time / max(now - self._created_at, 1e-9)
+            }
 
 
 class Engine(object):
@@ -29,36 +521,234 @@ class Engine(object):
     >>> engine = Engine()
     >>> con = engine.connect()
 
+    Long running applications should borrow connections from the pool
+    instead, using :py:meth:`checkout`. Closing a borrowed connection returns
+    it to the pool.
+
     :param db_path: The path of the database file (always with respect to the
         calling script. If not specified, the Engine will use the file located
         at *db/chessApi.db*
+    :param pool_size: The maximum number of pooled connections.
+    :param pool_timeout: Seconds to wait for a pooled connection.
+    :param pool_max_idle: Seconds after an unused pooled connection is closed.
+    :param pool_ping_interval: Idle seconds after a pooled connection is
+        health checked on checkout.
+    :param profile: The name of the performance profile applied to every
+        connection, one of :py:data:`PROFILES`. *balanced* by default.
+    :param exercise_cache_size: The number of exercises kept in the
+        read-through cache shared by the connections of the engine. Zero
+        disables the cache.
+    :param exercise_cache_ttl: Seconds after a cached exercise is read again
+        from the database. None for no expiry.
+    :param response_cache_size: The number of encoded responses kept in the
+        cache invalidated by the write methods of the connections of the
+        engine. Zero disables the cache.
 
     """
 
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, pool_size=DEFAULT_POOL_SIZE, pool_timeout=DEFAULT_POOL_TIMEOUT,
+                 pool_max_idle=DEFAULT_POOL_MAX_IDLE, pool_ping_interval=DEFAULT_POOL_PING_INTERVAL,
+                 profile=DEFAULT_PROFILE, exercise_cache_size=DEFAULT_EXERCISE_CACHE_SIZE,
+                 exercise_cache_ttl=DEFAULT_EXERCISE_CACHE_TTL, response_cache_size=DEFAULT_RESPONSE_CACHE_SIZE):
         super(Engine, self).__init__()
         if db_path is not None:
             self.db_path = db_path
         else:
             self.db_path = DEFAULT_DB_PATH
+        if profile not in PROFILES:
+            raise ValueError('Unknown performance profile: %s' % profile)
+        self.profile = profile
+        self.exercise_cache = LRUCache(exercise_cache_size, exercise_cache_ttl) if exercise_cache_size else None
+        self.response_cache = ResponseCache(response_cache_size, DEFAULT_RESPONSE_CACHE_BYTES) \
+            if response_cache_size else None
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.pool_max_idle = pool_max_idle
+        self.pool_ping_interval = pool_ping_interval
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._migrated = False
+        # the last logged invalidation repeated by the caches of the engine
+        self._invalidation_seq = None
+        self._sync_lock = threading.Lock()
+
+    def _ensure_migrated(self):
+        """
+        Applies the pending migrations before the first connection of the
+        engine is opened, as the read queries need the current schema. A file
+        without the tables of the schema dump is left alone, the migrations
+        are applied when the tables are created.
+
+        """
+        if self._migrated:
+            return
+        con = sqlite3.connect(self.db_path)
+        try:
+            created = con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'exercises'").fetchone()
+        finally:
+            con.close()
+        if created:
+            self.migrate()
 
     def connect(self):
         """
-        Creates a connection to the database.
+        Creates a connection to the database. The pending migrations are
+        applied first.
+
+        :return: A Connection instance
+        :rtype: Connection
+
+        """
+        self._ensure_migrated()
+        return Connection(self.db_path, profile=self.profile, exercise_cache=self.exercise_cache,
+                          response_cache=self.response_cache)
+
+    @property
+    def pool(self):
+        """
+        The connection pool of the engine. It is created on first access,
+        after the pending migrations are applied.
+
+        :rtype: ConnectionPool
+
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._ensure_migrated()
+                self._pool = ConnectionPool(self.db_path, self.pool_size, self.pool_timeout,
+                                            self.pool_max_idle, self.pool_ping_interval, self.profile,
+                                            self.exercise_cache, self.response_cache)
+            return self._pool
+
+    def checkout(self, timeout=None):
+        """
+        Borrows a connection from the pool. The connection **MUST** be closed
+        when it is not used anymore, which gives it back to the pool.
 
+        :param timeout: Seconds to wait for a free connection. If None, the
+            ``pool_timeout`` of the engine is used.
         :return: A Connection instance
         :rtype: Connection
+        :raises PoolTimeoutError: if no connection became available in time.
+
+        """
+        return self.pool.acquire(timeout)
+
+    def pool_stats(self):
+        """
+        :return: the usage statistics of the connection pool, as described in
+            :py:meth:`ConnectionPool.stats`
+
+        """
+        return self.pool.stats()
+
+    def dispose_pool(self):
+        """
+        Closes the pooled connections. A new pool is created on the next
+        checkout.
+
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.dispose()
+
+    def reset_after_fork(self):
+        """
+        Forgets the pooled connections inherited from the parent process,
+        without closing them, as they belong to the parent. To be called in a
+        child process right after fork; a new pool is created on the next
+        checkout.
+
+        """
+        self._pool_lock = threading.Lock()
+        self._pool = None
+        self._sync_lock = threading.Lock()
+        self._invalidation_seq = None
+
+    def sync_caches(self, con):
+        """
+        Repeats the cache invalidations logged by the other processes since
+        the last call, so the cached rows and responses of this process do
+        not outlive a modification made by another one. To be called at the
+        start of every request. The caches are dropped on the first call,
+        after :py:meth:`clear` and :py:meth:`populate_tables`, and when the
+        invalidations to repeat are not logged anymore.
+
+        :param con: A :py:class:`Connection` to the database.
+
+        """
+        if self.exercise_cache is None and self.response_cache is None:
+            return
+        with self._sync_lock:
+            if self._invalidation_seq is None:
+                self._invalidation_seq = con.get_last_invalidation()
+                self._clear_caches()
+                return
+            invalidations = con.get_invalidations(self._invalidation_seq)
+            if not invalidations:
+                return
+            if invalidations[0][0] != self._invalidation_seq + 1:
+                self._clear_caches()
+            else:
+                tags = []
+                for _, kind, value in invalidations:
+                    if kind == 'all':
+                        self._clear_caches()
+                    elif kind == 'exercise' and self.exercise_cache is not None:
+                        self.exercise_cache.invalidate(int(value))
+                    elif kind == 'author' and self.exercise_cache is not None:
+                        self.exercise_cache.invalidate_where(lambda key, exercise, nickname=value:
+                                                             exercise['author'] == nickname)
+                    elif kind == 'tag':
+                        tags.append(value)
+                if tags and self.response_cache is not None:
+                    self.response_cache.invalidate(*tags)
+            self._invalidation_seq = invalidations[-1][0]
+
+    def exercise_cache_stats(self):
+        """
+        :return: the hit, miss and eviction counters of the exercise cache, as
+            described in :py:meth:`LRUCache.stats`, or None if the cache is
+            disabled.
 
         """
-        return Connection(self.db_path)
+        return self.exercise_cache.stats() if self.exercise_cache is not None else None
+
+    def response_cache_stats(self):
+        """
+        :return: the hit ratio and the rebuild cost of the response cache, as
+            described in :py:meth:`chessApi.cache.ResponseCache.stats`, or
+            None if the cache is disabled.
+
+        """
+        return self.response_cache.stats() if self.response_cache is not None else None
+
+    def _clear_caches(self):
+        """
+        Drops the cached rows and responses, after the tables were modified
+        without the write methods of the connections.
+
+        """
+        if self.exercise_cache is not None:
+            self.exercise_cache.clear()
+        if self.response_cache is not None:
+            self.response_cache.clear()
 
     def remove_database(self):
         """
-        Removes the database file from the filesystem.
+        Removes the database file from the filesystem, together with its WAL
+        journal files. Pooled connections are closed and cached rows and
+        responses are dropped first.
 
         """
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
+        self.dispose_pool()
+        self._clear_caches()
+        self._migrated = False
+        self._invalidation_seq = None
+        for path in (self.db_path, self.db_path + '-wal', self.db_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
 
     def clear(self):
         """
@@ -67,13 +757,19 @@ class Engine(object):
 
         """
         keys_on = 'PRAGMA foreign_keys = ON'
+        self._ensure_migrated()
+        self._clear_caches()
         con = sqlite3.connect(self.db_path)
-        cur = con.cursor()
-        cur.execute(keys_on)
-        with con:
+        try:
             cur = con.cursor()
-            cur.execute("DELETE FROM exercises")
-            cur.execute("DELETE FROM users")
+            cur.execute(keys_on)
+            with con:
+                cur = con.cursor()
+                cur.execute("DELETE FROM exercises")
+                cur.execute("DELETE FROM users")
+                _log_invalidation(con, 'all')
+        finally:
+            con.close()
 
     def create_tables(self, schema=None):
         """
@@ -93,6 +789,59 @@ class Engine(object):
                 cur.executescript(sql)
         finally:
             con.close()
+        self.migrate()
+
+    def schema_version(self):
+        """
+        :return: the version of the schema of the database file, the version
+            of the last applied migration (0 if none was applied).
+
+        """
+        con = sqlite3.connect(self.db_path)
+        try:
+            return con.execute('PRAGMA user_version').fetchone()[0]
+        finally:
+            con.close()
+
+    def migrate(self, migrations=None):
+        """
+        Applies the pending schema migrations, in order. Each migration runs in
+        its own immediate transaction together with the update of the schema
+        version, so several processes can migrate the same file concurrently.
+
+        :param migrations: list of the migrations as described in
+            :py:data:`MIGRATIONS`. If None, :py:data:`MIGRATIONS` is used.
+        :return: the list of the applied migration versions.
+
+        """
+        if migrations is None:
+            migrations = MIGRATIONS
+        applied = []
+        con = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+        try:
+            con.execute('PRAGMA foreign_keys = ON')
+            for version, _, steps in sorted(migrations, key=lambda migration: migration[0]):
+                con.execute('BEGIN IMMEDIATE')
+                try:
+                    if con.execute('PRAGMA user_version').fetchone()[0] >= version:
+                        con.execute('ROLLBACK')
+                        continue
+                    for step in steps:
+                        if callable(step):
+                            step(con)
+                        else:
+                            con.execute(step)
+                    con.execute('PRAGMA user_version = %d' % version)
+                    con.execute('COMMIT')
+                except Exception:
+                    con.execute('ROLLBACK')
+                    raise
+                applied.append(version)
+        finally:
+            con.close()
+        if migrations is MIGRATIONS:
+            self._migrated = True
+        return applied
 
     def populate_tables(self, dump=None):
         """
@@ -103,15 +852,133 @@ class Engine(object):
 
         """
         keys_on = 'PRAGMA foreign_keys = ON'
+        self._ensure_migrated()
         con = sqlite3.connect(self.db_path)
         cur = con.cursor()
         cur.execute(keys_on)
         if dump is None:
             dump = DEFAULT_DATA_DUMP
-        with open(dump, encoding="utf-8") as f:
-            sql = f.read()
-            cur = con.cursor()
-            cur.executescript(sql)
+        try:
+            with open(dump, encoding="utf-8") as f:
+                sql = f.read()
+                cur = con.cursor()
+                # The dump and the invalidation of the caches of the other
+                # processes are committed together
+                cur.executescript('BEGIN;\n' + sql)
+                _log_invalidation(con, 'all')
+                con.commit()
+        finally:
+            con.close()
+        self._clear_caches()
+
+    def bulk_import(self, path, creator=None, fmt=None, processes=None, batch_size=DEFAULT_IMPORT_BATCH_SIZE):
+        """
+        Imports the exercises of a puzzle collection file. The file is streamed,
+        the puzzles are parsed and validated in a pool of worker processes with
+        the same rules as the API uses, their solutions are compiled there as
+        well, and the valid ones are inserted together with their move trees
+        in transactions of ``batch_size`` exercises. Puzzles whose title
+        already exists are skipped.
+
+        :param str path: Path of the PGN or EPD file.
+        :param str creator: Nickname of the user the exercises are attributed
+            to. If None, the exercises have no author.
+        :param str fmt: ``'pgn'`` or ``'epd'``. If None, the format is deduced
+            from the extension of the file.
+        :param int processes: The number of worker processes. If None, the
+            number of CPUs is used. If 0, the puzzles are processed in the
+            calling process.
+        :param int batch_size: The number of exercises inserted per transaction.
+        :return: dictionary with the following keys:
+
+            * ``accepted``: the number of imported exercises
+            * ``rejected``: the number of invalid puzzles, and of the ones
+              refused by the database for another reason than their title
+            * ``duplicates``: the number of puzzles skipped because of an
+              existing title
+            * ``elapsed``: the duration of the import in seconds
+            * ``per_second``: the number of processed puzzles per second
+
+        :raises ValueError: if the format is unknown or the creator does not
+            exist.
+
+        """
+        if fmt is None:
+            fmt = os.path.splitext(path)[1][1:].lower()
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError('Unknown puzzle format: %s' % fmt)
+        split, parse = IMPORT_FORMATS[fmt]
+        parse = functools.partial(_parse_import_puzzle, parse)
+        self._ensure_migrated()
+        # only the existing titles are skipped, the rows failing other constraints are rejected
+        stmnt = 'INSERT INTO exercises (user_id, title, description, sub_date, initial_state, list_moves) \
+                 VALUES(?,?,?,?,?,?) ON CONFLICT(title) DO NOTHING'
+        edges_stmnt = 'INSERT INTO solution_edges (exercise_id, from_hash, uci, san, to_hash, rank) \
+                       VALUES (?,?,?,?,?,?)'
+        start = time.perf_counter()
+        report = {'accepted': 0, 'rejected': 0, 'duplicates': 0}
+        con = Connection(self.db_path, profile=self.profile, response_cache=self.response_cache)
+        pool = None
+        try:
+            user_id = None
+            if creator is not None:
+                row = con.con.execute('SELECT user_id FROM users WHERE nickname = ?', (creator,)).fetchone()
+                if row is None:
+                    raise ValueError('Unknown creator: %s' % creator)
+                user_id = row['user_id']
+            timestamp = int(time.time())
+
+            def insert(batch):
+                inserted = 0
+                with con.con:
+                    cur = con.con.cursor()
+                    for row, edges in batch:
+                        try:
+                            cur.execute(stmnt, row)
+                        except sqlite3.IntegrityError:
+                            report['rejected'] += 1
+                            continue
+                        if cur.rowcount < 1:
+                            report['duplicates'] += 1
+                            continue
+                        inserted += 1
+                        # the solution is stored compiled, as by create_exercise
+                        con.con.executemany(edges_stmnt, [(cur.lastrowid, from_hash, uci, san, to_hash, rank)
+                                                          for rank, (from_hash, san, uci, to_hash)
+                                                          in enumerate(edges or ())])
+                    if inserted:
+                        _log_invalidation(con.con, 'tag', EXERCISES_TAG)
+                report['accepted'] += inserted
+
+            with open(path, encoding='utf-8') as f:
+                if processes == 0:
+                    puzzles = map(parse, split(f))
+                else:
+                    pool = multiprocessing.Pool(processes)
+                    puzzles = pool.imap(parse, split(f), chunksize=64)
+                batch = []
+                for puzzle in puzzles:
+                    if puzzle is None:
+                        report['rejected'] += 1
+                        continue
+                    title, description, initial_state, list_moves, edges = puzzle
+                    batch.append(((user_id, title, description, timestamp, initial_state, list_moves), edges))
+                    if len(batch) >= batch_size:
+                        insert(batch)
+                        batch = []
+                if batch:
+                    insert(batch)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            con._invalidate_responses(EXERCISES_TAG)
+            con.close()
+        elapsed = time.perf_counter() - start
+        processed = report['accepted'] + report['rejected'] + report['duplicates']
+        report['elapsed'] = elapsed
+        report['per_second'] = processed / elapsed if elapsed else 0.0
+        return report
 
 
 class Connection(object):
@@ -126,17 +993,54 @@ class Connection(object):
 
     Use the method :py:meth:`close` in order to close a connection.
     A :py:class:`Connection` **MUST** always be closed once when it is not going to be
-    utilized anymore in order to release internal locks.
+    utilized anymore in order to release internal locks. Closing a connection
+    borrowed with :py:meth:`Engine.checkout` returns it to the pool.
 
     :param db_path: Location of the database file.
     :type db_path: str
+    :param pool: The pool owning the connection, or None.
+    :type pool: ConnectionPool
+    :param profile: The name of the performance profile to apply, one of
+        :py:data:`PROFILES`.
+    :type profile: str
+    :param exercise_cache: Read-through cache of :py:meth:`get_exercise`,
+        shared with the other connections of the engine, or None.
+    :type exercise_cache: LRUCache
+    :param response_cache: Cache of the encoded responses showing the rows,
+        invalidated by the write methods, or None.
+    :type response_cache: ResponseCache
 
     """
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, pool=None, profile=DEFAULT_PROFILE, exercise_cache=None, response_cache=None):
         super(Connection, self).__init__()
-        self.con = sqlite3.connect(db_path)
+        self.con = sqlite3.connect(db_path, check_same_thread=pool is None)
+        self._pool = pool
+        self._exercise_cache = exercise_cache
+        self._response_cache = response_cache
         self._isclosed = False
+        # when False, the write methods leave committing to the caller
+        self.autocommit = True
+        # cache invalidations to repeat when the transaction ends
+        self._pending_invalidations = []
+        self._configure(PROFILES[profile])
+
+    def _configure(self, pragmas):
+        """
+        Sets up the freshly opened connection: activates the foreign keys,
+        applies the PRAGMA statements of the performance profile and makes
+        the queries return :py:class:`sqlite3.Row` instances.
+
+        :param dict pragmas: PRAGMA names and values of the profile.
+
+        """
+        cur = self.con.cursor()
+        cur.execute('PRAGMA foreign_keys = ON')
+        for name, value in pragmas.items():
+            cur.execute('PRAGMA %s = %s' % (name, value))
+            # journal_mode returns the resulting mode
+            cur.fetchall()
+        self.con.row_factory = sqlite3.Row
 
     def isclosed(self):
         """
@@ -147,13 +1051,91 @@ class Connection(object):
 
     def close(self):
         """
-        Closes the database connection, commiting all changes.
+        Closes the database connection, commiting all changes. Pooled
+        connections are returned to their pool instead.
 
         """
         if self.con and not self._isclosed:
+            self.commit()
+            self._isclosed = True
+            if self._pool is not None:
+                self._pool.release(self)
+            else:
+                self.con.close()
+
+    def begin(self):
+        """
+        Defers the commits of the write methods until :py:meth:`commit` or
+        :py:meth:`rollback` is called, so that several modifications happen
+        in one transaction.
+
+        """
+        self.autocommit = False
+
+    def commit(self):
+        """
+        Commits the current transaction and restores the autocommit behaviour
+        of the write methods.
+
+        """
+        self.con.commit()
+        self._end_transaction()
+
+    def rollback(self):
+        """
+        Rolls back the current transaction and restores the autocommit
+        behaviour of the write methods.
+
+        """
+        self.con.rollback()
+        self._end_transaction()
+
+    def _end_transaction(self):
+        """
+        Repeats the cache invalidations of the finished transaction. Other
+        connections might have cached the rows between the modification and
+        the commit, and the rows read by this connection are not valid after a
+        rollback.
+
+        """
+        self.autocommit = True
+        pending, self._pending_invalidations = self._pending_invalidations, []
+        for invalidate in pending:
+            invalidate()
+
+    def _commit(self):
+        """
+        Commits the modification of a write method, unless the commit is
+        deferred by :py:meth:`begin`.
+
+        """
+        if self.autocommit:
             self.con.commit()
+
+    def _disconnect(self):
+        """
+        Closes the underlying sqlite3 connection, regardless of the pool.
+
+        """
+        self._isclosed = True
+        try:
             self.con.close()
-            self._isclosed = True
+        except sqlite3.Error:
+            pass
+
+    def ping(self):
+        """
+        Health check of the connection.
+
+        :return: ``True`` if the database can be queried through the
+            connection.
+
+        """
+        try:
+            self.con.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
 
     def set_foreign_keys_support(self):
         """
@@ -183,9 +1165,14 @@ class Connection(object):
                                  the system (long integer)
             * ``nickname``: nickname of the user
             * ``email``: current email of the user.
+            * ``version``: the version of the user row, bumped on every
+                           modification
+            * ``modified``: UNIX timestamp of the last modification, the
+                            registration date if it was never modified
 
         """
-        return {'registrationdate': (row['reg_date']), 'nickname': row['nickname'], 'email': row['email']}
+        return {'registrationdate': (row['reg_date']), 'nickname': row['nickname'], 'email': row['email'],
+                'version': row['version'], 'modified': row['modified'] or row['reg_date']}
 
     def _create_user_list_object(self, row):
         """
@@ -201,100 +1188,193 @@ class Connection(object):
         """
         Takes a database exercise row, and converts it to a python dictionary.
 
-        :param row: The row obtained from the database.
+        :param row: The row obtained from the database, joined with the
+            ``nickname`` of the author.
         :type row: sqlite3.Row
 
         :return: dictionary with the following format:
             * ``exercise_id``: unique id number of the exercise
-            * ``user_id``: id of the user who submitted this exercise
+            * ``author``: nickname of the user who submitted this exercise
             * ``title``: title of the exercise
             * ``description``: description of the exercise
             * ``sub_date``: the UNIX timestamp of the exercise submission
             * ``initial_state``: the FEN code of the initial state of the exercise
             * ``list_moves``: string of the exercise solution
+            * ``version``: the version of the exercise row, bumped on every
+              modification of the exercise or of the nickname of its author
+            * ``modified``: the UNIX timestamp of the last modification, the
+              submission date if it was never modified
         """
         return {
             'exercise_id': row['exercise_id'],
-            'author': self._fetch_nickname(row['user_id']),
+            'author': row['nickname'],
             'title': row['title'],
             'description': row['description'],
             'sub_date': row['sub_date'],
             'initial_state': row['initial_state'],
-            'list_moves': row['list_moves']
+            'list_moves': row['list_moves'],
+            'version': row['version'],
+            'modified': row['modified'] or int(row['sub_date'] or 0)
         }
 
     def _create_exercise_list_object(self, row):
         """
-        :param row: The row obtained from the database.
+        :param row: The row obtained from the database, joined with the
+            ``nickname`` of the author.
         :type row: sqlite3.Row
         :return: a dictionary with the keys ``exercise_id``, ``title`` and
-            ``nickname``
+            ``author``
 
         """
-        return {'exercise_id': row['exercise_id'], 'title': row['title'], 'author': self._fetch_nickname(row['user_id'])}
+        return {'exercise_id': row['exercise_id'], 'title': row['title'], 'author': row['nickname']}
 
-    def _fetch_nickname(self, user_id):
+    @staticmethod
+    def _exercise_cache_key(exercise_id):
         """
-        Queries the database to find the nickname belonging to a particular user_id.
-        :param user_id: The user id.
-        :return: The nickname of the user with the id.
+        :return: the key of the exercise in the exercise cache, or None if the
+            id is not an integer.
+
         """
-        self.set_foreign_keys_support()
-        self.con.row_factory = sqlite3.Row
-        cur = self.con.cursor()
-        query = 'SELECT nickname FROM users WHERE user_id = ?'
-        pvalue = (user_id,)
-        cur.execute(query, pvalue)
-        row = cur.fetchone()
-        if not row:
+        try:
+            return int(exercise_id)
+        except (TypeError, ValueError):
             return None
-        return row['nickname']
+
+    def _log_invalidations(self, exercise_id=None, author=None, tags=()):
+        """
+        Logs the cache invalidations of a modification in its transaction, so
+        the other processes repeat them once it is committed. To be called
+        only when the modification changed rows.
+
+        :param exercise_id: The id of the modified exercise.
+        :param author: The nickname of the modified user.
+        :param tags: The tags of the modified rows.
+
+        """
+        key = self._exercise_cache_key(exercise_id)
+        if key is not None:
+            _log_invalidation(self.con, 'exercise', key)
+        if author is not None:
+            _log_invalidation(self.con, 'author', author)
+        for tag in tags:
+            _log_invalidation(self.con, 'tag', tag)
+
+    def get_last_invalidation(self):
+        """
+        :return: the sequence number of the last logged cache invalidation,
+            0 if none was logged.
+
+        """
+        row = self.con.execute('SELECT max(seq) FROM invalidations').fetchone()
+        return row[0] or 0
+
+    def get_invalidations(self, after):
+        """
+        Extracts the cache invalidations logged after a given one.
+
+        :param int after: The sequence number of the last known invalidation.
+        :return: list of tuples of the sequence number, the kind and the value
+            of the invalidations, in the order they were logged.
+
+        """
+        cur = self.con.execute('SELECT seq, kind, value FROM invalidations WHERE seq > ? ORDER BY seq', (after,))
+        return [tuple(row) for row in cur.fetchall()]
+
+    def _invalidate_exercise(self, exercise_id):
+        """
+        Drops an exercise from the exercise cache.
+
+        :param exercise_id: The id of the modified exercise.
+
+        """
+        key = self._exercise_cache_key(exercise_id)
+        if self._exercise_cache is not None:
+            self._exercise_cache.invalidate(key)
+            if not self.autocommit:
+                self._pending_invalidations.append(lambda: self._exercise_cache.invalidate(key))
+
+    def _invalidate_author(self, nickname):
+        """
+        Drops the exercises of an author from the exercise cache.
+
+        :param nickname: The nickname of the modified user.
+
+        """
+        if self._exercise_cache is not None:
+            def invalidate():
+                self._exercise_cache.invalidate_where(lambda key, exercise: exercise['author'] == nickname)
+            invalidate()
+            if not self.autocommit:
+                self._pending_invalidations.append(invalidate)
+
+    def _invalidate_responses(self, *tags):
+        """
+        Drops the cached responses having any of the tags.
+
+        :param tags: The tags of the modified rows, see :py:func:`exercise_tag`
+            and :py:func:`user_tag`.
+
+        """
+        if self._response_cache is not None:
+            self._response_cache.invalidate(*tags)
+            if not self.autocommit:
+                self._pending_invalidations.append(lambda: self._response_cache.invalidate(*tags))
 
     def get_exercise(self, exercise_id):
         """
-        Extracts exercise from database.
+        Extracts exercise from database. The exercise is served from the
+        exercise cache of the engine when possible.
 
         :param exercise_id: The identifier number of the exercise.
         :return: A dictionary with the exercise data,
             or None if no exercise with that id exists.
 
         """
-        # fetch row
-        self.set_foreign_keys_support()
-        query = 'SELECT * FROM exercises WHERE exercise_id = ?'
-        self.con.row_factory = sqlite3.Row
+        key = self._exercise_cache_key(exercise_id)
+        generation = None
+        if self._exercise_cache is not None and key is not None:
+            exercise = self._exercise_cache.get(key)
+            if exercise is not None:
+                return dict(exercise)
+            generation = self._exercise_cache.generation()
+
+        # fetch row together with the nickname of the author
+        query = 'SELECT exercises.*, users.nickname FROM exercises \
+                 LEFT JOIN users ON exercises.user_id = users.user_id \
+                 WHERE exercises.exercise_id = ?'
         cur = self.con.cursor()
         pvalue = (exercise_id,)
         cur.execute(query, pvalue)
         row = cur.fetchone()
+        if not row:
+            return None
 
         # row to dictionary
-        return None if not row else self._create_exercise_object(row)
+        exercise = self._create_exercise_object(row)
+        if self._exercise_cache is not None and key is not None:
+            # not stored if the exercise has been invalidated meanwhile
+            self._exercise_cache.put(key, dict(exercise), generation)
+        return exercise
 
     def get_exercises(self, nickname=None):
         """
         Returns a list of exercises belonging to a particular user or all exercises.
+        The nicknames of the authors are joined in the same query.
         :param nickname: returning the exercises belonging to that user. Or if None, returning all exercises.
         :return: A list of dictionaries with structure defined in :py:meth:`_create_exercise_list_object`,
             or None if the user does not exists or does not have any submitted exercises or no exercises exist on server
 
         """
-        self.set_foreign_keys_support()
-        self.con.row_factory = sqlite3.Row
         cur = self.con.cursor()
         if nickname:
-            query1 = 'SELECT user_id FROM users WHERE nickname = ?'
+            query = 'SELECT exercises.exercise_id, exercises.title, users.nickname FROM exercises \
+                     JOIN users ON exercises.user_id = users.user_id \
+                     WHERE users.nickname = ? ORDER BY exercises.exercise_id'
             pvalue = (nickname,)
-            cur.execute(query1, pvalue)
-            row = cur.fetchone()
-            if not row:
-                return None
-            user_id = row['user_id']
-            query2 = 'SELECT * FROM exercises WHERE user_id = ?'
-            pvalue = (user_id,)
-            cur.execute(query2, pvalue)
+            cur.execute(query, pvalue)
         else:
-            query = 'SELECT * FROM exercises'
+            query = 'SELECT exercises.exercise_id, exercises.title, users.nickname FROM exercises \
+                     LEFT JOIN users ON exercises.user_id = users.user_id ORDER BY exercises.exercise_id'
             cur.execute(query)
         rows = cur.fetchall()
         if not rows:
@@ -304,6 +1384,169 @@ class Connection(object):
             exercises.append(self._create_exercise_list_object(row))
         return exercises
 
+    def iter_exercises(self, batch_size=DEFAULT_FETCH_BATCH_SIZE):
+        """
+        Iterates over every exercise, in id order. The rows are fetched in
+        batches, so the memory used does not depend on the number of exercises.
+        The connection must not be closed before the iteration is finished.
+
+        :param int batch_size: The number of rows fetched at once.
+        :return: generator of dictionaries with the format provided in the
+            method :py:meth:`_create_exercise_object`
+
+        """
+        query = 'SELECT exercises.*, users.nickname FROM exercises \
+                 LEFT JOIN users ON exercises.user_id = users.user_id ORDER BY exercises.exercise_id'
+        cur = self.con.cursor()
+        cur.execute(query)
+        try:
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield self._create_exercise_object(row)
+        finally:
+            cur.close()
+
+    def _seek_page(self, query, pvalue, key, limit, after, before):
+        """
+        Runs a keyset paginated query. The query must end with a ``WHERE``
+        condition to which the seek condition on ``key`` can be appended.
+
+        :param str query: The SQL query without ordering and limit.
+        :param list pvalue: The parameters of the query.
+        :param str key: The column used as cursor (an indexed, unique column).
+        :param int limit: The maximum number of rows to return.
+        :param after: Return the rows whose key is greater than this, or None.
+        :param before: Return the rows whose key is smaller than this, or
+            None. Ignored if ``after`` is given.
+        :return: tuple of the list of rows in ascending key order, a boolean
+            telling if there are rows before the page and a boolean telling if
+            there are rows after the page.
+
+        """
+        cur = self.con.cursor()
+        if after is None and before is not None:
+            query += ' AND %s < ? ORDER BY %s DESC LIMIT ?' % (key, key)
+            cur.execute(query, list(pvalue) + [before, limit + 1])
+            rows = cur.fetchall()
+            has_prev = len(rows) > limit
+            rows = rows[:limit]
+            rows.reverse()
+            return rows, has_prev, True
+        if after is not None:
+            query += ' AND %s > ?' % key
+            pvalue = list(pvalue) + [after]
+        query += ' ORDER BY %s LIMIT ?' % key
+        cur.execute(query, list(pvalue) + [limit + 1])
+        rows = cur.fetchall()
+        return rows[:limit], after is not None, len(rows) > limit
+
+    def get_exercises_page(self, limit, after=None, before=None, nickname=None):
+        """
+        Returns a page of the exercises, ordered by their id. The page is
+        located by seeking on the primary key, so its cost does not depend on
+        the position of the page.
+
+        :param int limit: The maximum number of exercises on the page.
+        :param int after: Return the exercises with id greater than this, or
+            the first page if None.
+        :param int before: Return the exercises with id smaller than this.
+            Ignored if ``after`` is given.
+        :param nickname: returning the exercises belonging to that user. Or if
+            None, returning all exercises.
+        :return: tuple of a list of dictionaries with structure defined in
+            :py:meth:`_create_exercise_list_object`, the cursor of the previous
+            page (to be used as ``before``) and the cursor of the next page (to
+            be used as ``after``). The cursors are None if there is no such page.
+
+        """
+        if nickname:
+            query = 'SELECT exercises.exercise_id, exercises.title, users.nickname FROM exercises \
+                     JOIN users ON exercises.user_id = users.user_id \
+                     WHERE users.nickname = ?'
+            pvalue = [nickname]
+        else:
+            query = 'SELECT exercises.exercise_id, exercises.title, users.nickname FROM exercises \
+                     LEFT JOIN users ON exercises.user_id = users.user_id \
+                     WHERE 1'
+            pvalue = []
+        rows, has_prev, has_next = self._seek_page(query, pvalue, 'exercises.exercise_id', limit, after, before)
+        exercises = [self._create_exercise_list_object(row) for row in rows]
+        if not exercises:
+            return exercises, None, None
+        return (exercises,
+                exercises[0]['exercise_id'] if has_prev else None,
+                exercises[-1]['exercise_id'] if has_next else None)
+
+    def get_solution(self, exercise_id):
+        """
+        Reads the compiled move tree of the solution of an exercise, stored
+        when the exercise was created or modified. The moves are not replayed.
+
+        :param exercise_id: The id of the exercise.
+        :return: :py:class:`chessApi.chess_data.CompiledSolution` object, or
+            None if the solution has not been compiled.
+
+        """
+        query = 'SELECT from_hash, san, uci, to_hash FROM solution_edges WHERE exercise_id = ? ORDER BY rank'
+        rows = self.con.execute(query, (exercise_id,)).fetchall()
+        if not rows:
+            return None
+        return chess_data.CompiledSolution([tuple(row) for row in rows])
+
+    def get_solver_data(self, exercise_ids):
+        """
+        Reads what the solver needs of several exercises at once: the initial
+        state, the solution and the compiled solution. The exercises are read
+        in chunks of ``DEFAULT_FETCH_BATCH_SIZE`` ids by IN queries.
+
+        :param exercise_ids: The ids of the exercises.
+        :return: dictionary mapping the id of every existing exercise to a
+            tuple of its initial state, its solution and the edges of its
+            move tree (list of tuples as described in
+            :py:func:`chessApi.chess_data.compile_solution`, or None if the
+            solution has not been compiled).
+
+        """
+        exercise_ids = list(exercise_ids)
+        data = {}
+        for start in range(0, len(exercise_ids), DEFAULT_FETCH_BATCH_SIZE):
+            chunk = exercise_ids[start:start + DEFAULT_FETCH_BATCH_SIZE]
+            query = 'SELECT exercises.exercise_id, exercises.initial_state, exercises.list_moves, \
+                     solution_edges.from_hash, solution_edges.san, solution_edges.uci, solution_edges.to_hash \
+                     FROM exercises LEFT JOIN solution_edges ON exercises.exercise_id = solution_edges.exercise_id \
+                     WHERE exercises.exercise_id IN (%s) \
+                     ORDER BY exercises.exercise_id, solution_edges.rank' % ','.join('?' * len(chunk))
+            for row in self.con.execute(query, chunk):
+                exercise = data.setdefault(row['exercise_id'], (row['initial_state'], row['list_moves'], []))
+                if row['uci'] is not None:
+                    exercise[2].append((row['from_hash'], row['san'], row['uci'], row['to_hash']))
+        return {exercise_id: (initial_state, list_moves, edges or None)
+                for exercise_id, (initial_state, list_moves, edges) in data.items()}
+
+    def compile_solution(self, exercise_id):
+        """
+        Compiles and stores the solution of an exercise which has none yet,
+        e.g. one inserted by :py:meth:`Engine.bulk_import` or a data dump.
+
+        :param exercise_id: The id of the exercise.
+        :return: :py:class:`chessApi.chess_data.CompiledSolution` object, or
+            None if the exercise does not exist or its data is not valid
+            chess-wise.
+
+        """
+        row = self.con.execute('SELECT initial_state, list_moves FROM exercises WHERE exercise_id = ?',
+                               (exercise_id,)).fetchone()
+        if row is None:
+            return None
+        edges = _store_solution(self.con, exercise_id, row['initial_state'], row['list_moves'])
+        self._commit()
+        if edges is None:
+            return None
+        return chess_data.CompiledSolution(edges)
+
     def delete_exercise(self, exercise_id):
         """
         Deletes the exercise with the given id.
@@ -312,19 +1555,24 @@ class Connection(object):
         :return: True if the exercise has been deleted successfully, False otherwise.
 
         """
-        self.set_foreign_keys_support()
         query = 'DELETE FROM exercises WHERE exercise_id = ?'
-        self.con.row_factory = sqlite3.Row
         cur = self.con.cursor()
         pvalue = (exercise_id,)
         try:
             cur.execute(query, pvalue)
-            self.con.commit()
+            if cur.rowcount > 0:
+                self._log_invalidations(exercise_id, tags=(EXERCISES_TAG,))
+            self._commit()
         except sqlite3.Error as e:
             print("Error %s:" % (e.args[0]))
-        return bool(cur.rowcount)
+            return False
+        if cur.rowcount < 1:
+            return False
+        self._invalidate_exercise(exercise_id)
+        self._invalidate_responses(EXERCISES_TAG)
+        return True
 
-    def modify_exercise(self, exerciseid, title, description, initial_state, list_moves):
+    def modify_exercise(self, exerciseid, title, description, initial_state, list_moves, version=None):
         """
         Modify the title, the description the initial state of the message with given id.
         ``exerciseid``
@@ -333,54 +1581,77 @@ class Connection(object):
         :param str description: the exercise's new description
         :param str initial_state: The initial state of the pieces on the chess board (new).
         :param str list_moves: The right list of moves (new).
-        :return: the id of the edited exercise or None if the exercise was not found.
+        :param int version: If given, the exercise is modified only if it still has this version.
+        :return: the id of the edited exercise or None if the exercise was not found or has another version.
+        :raises ConflictError: if another exercise has the same title.
         """
         stmnt = 'UPDATE exercises SET title=:title , description=:description, initial_state=:initial_state,\
          list_moves=:list_moves  WHERE exercise_id=:exercise_id'
+        if version is not None:
+            stmnt += ' AND version=:version'
 
-        self.set_foreign_keys_support()
-        self.con.row_factory = sqlite3.Row
         cur = self.con.cursor()
 
         pvalue = {"exercise_id": exerciseid,
                   "title": title,
                   "description": description,
                   "initial_state": initial_state,
-                  "list_moves": list_moves}
+                  "list_moves": list_moves,
+                  "version": version}
 
         try:
             cur.execute(stmnt, pvalue)
-            self.con.commit()
+            if cur.rowcount > 0:
+                _store_solution(self.con, exerciseid, initial_state, list_moves)
+                self._log_invalidations(exerciseid, tags=(exercise_tag(exerciseid),))
+            self._commit()
+        except sqlite3.IntegrityError as e:
+            _raise_conflict(e)
+            print("Error %s:" % (e.args[0]))
         except sqlite3.Error as e:
             print("Error %s:" % (e.args[0]))
         else:
             if cur.rowcount < 1:
                 return None
+        self._invalidate_exercise(exerciseid)
+        self._invalidate_responses(exercise_tag(exerciseid))
         return exerciseid
 
-    def modify_user(self, old_nickname, new_nickname, new_email):
+    def modify_user(self, old_nickname, new_nickname, new_email, version=None):
         """
         Modify the nickname and email address of an user.
         :param old_nickname: The former nickname of the user.
         :param new_nickname: The newly set nickname of the user.
         :param new_email: The new email address of the user.
-        :return: True if the user has been successfully modified
+        :param int version: If given, the user is modified only if it still has this version.
+        :return: True if the user has been successfully modified, False if it has another version.
+        :raises ConflictError: if another user has the new nickname.
         """
         stmnt = 'UPDATE users SET nickname=:new_nickname, email=:new_email WHERE nickname=:old_nickname'
+        if version is not None:
+            stmnt += ' AND version=:version'
 
-        self.set_foreign_keys_support()
-        self.con.row_factory = sqlite3.Row
         cur = self.con.cursor()
 
         pvalue = {'new_nickname': new_nickname,
                   'new_email': new_email,
-                  'old_nickname': old_nickname}
+                  'old_nickname': old_nickname,
+                  'version': version}
 
         try:
             cur.execute(stmnt, pvalue)
-            self.con.commit()
+            if cur.rowcount > 0:
+                self._log_invalidations(author=old_nickname, tags=(user_tag(old_nickname),))
+            self._commit()
+        except sqlite3.IntegrityError as e:
+            _raise_conflict(e)
+            return False
         except sqlite3.Error as e:
             return False
+        if cur.rowcount < 1:
+            return version is None
+        self._invalidate_author(old_nickname)
+        self._invalidate_responses(user_tag(old_nickname))
         return True
 
     def create_exercise(self, title, description, creator, initial_state, list_moves):
@@ -391,6 +1662,7 @@ class Connection(object):
         :param str list_moves: The right moves which complete the exercise correctly.
         :param str creator: the username of the person that created the exercise.
         :return: the id of the created exercise or None if the message was not found.
+        :raises ConflictError: if an exercise with the same title exists already.
         """
         # SQL Statement for getting the user id
         query1 = 'SELECT user_id from users WHERE nickname = ?'
@@ -402,8 +1674,6 @@ class Connection(object):
         timestamp = time.mktime(datetime.now().timetuple())
 
         # fetch row
-        self.set_foreign_keys_support()
-        self.con.row_factory = sqlite3.Row
         cur = self.con.cursor()
         pvalue = (creator,)
         cur.execute(query1, pvalue)
@@ -414,12 +1684,50 @@ class Connection(object):
         # Generate the values for SQL statement
         pvalue = (user_id, title, description, timestamp, initial_state, list_moves)
         # Execute the statement
-        cur.execute(stmnt, pvalue)
-        self.con.commit()
+        try:
+            cur.execute(stmnt, pvalue)
+        except sqlite3.IntegrityError as e:
+            _raise_conflict(e)
+            raise
+        # Compile the solution for the solver
+        _store_solution(self.con, cur.lastrowid, initial_state, list_moves)
+        self._log_invalidations(tags=(EXERCISES_TAG,))
+        self._commit()
+        self._invalidate_responses(EXERCISES_TAG)
 
         # Return the id in
         return cur.lastrowid
 
+    def title_exists(self, title, exclude_id=None):
+        """
+        Checks if an exercise has the given title. The lookup uses the index
+        of the UNIQUE title column, so it does not scan the exercises.
+
+        :param str title: The title to look for.
+        :param exclude_id: The id of an exercise to ignore, e.g. the one
+            being modified.
+        :return: True if another exercise has the title.
+
+        """
+        query = 'SELECT 1 FROM exercises WHERE title = ?'
+        pvalue = [title]
+        if exclude_id is not None:
+            query += ' AND exercise_id != ?'
+            pvalue.append(exclude_id)
+        return self.con.execute(query + ' LIMIT 1', pvalue).fetchone() is not None
+
+    def nickname_exists(self, nickname):
+        """
+        Checks if a user has the given nickname. The lookup uses the index of
+        the UNIQUE nickname column, so it does not scan the users.
+
+        :param str nickname: The nickname to look for.
+        :return: True if a user has the nickname.
+
+        """
+        query = 'SELECT 1 FROM users WHERE nickname = ? LIMIT 1'
+        return self.con.execute(query, (nickname,)).fetchone() is not None
+
     def get_users(self):
         """
         Extracts all users in the database.
@@ -433,10 +1741,7 @@ class Connection(object):
         # Create the SQL Statements
         # SQL Statement for retrieving the users
         query = 'SELECT users.* FROM users'
-        # Activate foreign key support
-        self.set_foreign_keys_support()
         # Create the cursor
-        self.con.row_factory = sqlite3.Row
         cur = self.con.cursor()
         # Execute main SQL Statement
         cur.execute(query)
@@ -450,6 +1755,32 @@ class Connection(object):
             users.append(self._create_user_list_object(row))
         return users
 
+    def get_users_page(self, limit, after=None, before=None):
+        """
+        Returns a page of the users, ordered by their id. The page is located
+        by seeking on the primary key, so its cost does not depend on the
+        position of the page.
+
+        :param int limit: The maximum number of users on the page.
+        :param int after: Return the users with id greater than this, or the
+            first page if None.
+        :param int before: Return the users with id smaller than this.
+            Ignored if ``after`` is given.
+        :return: tuple of a list of dictionaries with structure defined in
+            :py:meth:`_create_user_list_object`, the cursor of the previous
+            page (to be used as ``before``) and the cursor of the next page (to
+            be used as ``after``). The cursors are None if there is no such page.
+
+        """
+        query = 'SELECT users.* FROM users WHERE 1'
+        rows, has_prev, has_next = self._seek_page(query, [], 'users.user_id', limit, after, before)
+        users = [self._create_user_list_object(row) for row in rows]
+        if not rows:
+            return users, None, None
+        return (users,
+                rows[0]['user_id'] if has_prev else None,
+                rows[-1]['user_id'] if has_next else None)
+
     def get_user(self, nickname):
         """
         Extracts all the information of a user.
@@ -459,33 +1790,18 @@ class Connection(object):
             :py:meth:`_create_user_object`
 
         """
-        # Create the SQL Statements
-        # SQL Statement for retrieving the user given a nickname
-        query1 = 'SELECT user_id from users WHERE nickname = ?'
-        # SQL Statement for retrieving the user information
-        query2 = 'SELECT users.* FROM users\
-                  WHERE users.user_id = ? '
-        # Variable to be used in the second query.
-        # Activate foreign key support
-        self.set_foreign_keys_support()
-        # Cursor and row initialization
-        self.con.row_factory = sqlite3.Row
+        # Create the SQL Statement
+        # SQL Statement for retrieving the user information given a nickname
+        query = 'SELECT users.* FROM users WHERE users.nickname = ?'
+        # Cursor initialization
         cur = self.con.cursor()
-        # Execute SQL Statement to retrieve the id given a nickname
+        # Execute the SQL Statement
         pvalue = (nickname,)
-        cur.execute(query1, pvalue)
-        # Extract the user id
+        cur.execute(query, pvalue)
+        # Process the response. Only one posible row is expected.
         row = cur.fetchone()
         if row is None:
             return None
-        user_id = row['user_id']
-        # Execute the SQL Statement to retrieve the user invformation.
-        # Create first the valuse
-        pvalue = (user_id,)
-        # execute the statement
-        cur.execute(query2, pvalue)
-        # Process the response. Only one posible row is expected.
-        row = cur.fetchone()
         return self._create_user_object(row)
 
     def delete_user(self, nickname):
@@ -501,18 +1817,20 @@ class Connection(object):
         # Create the SQL Statements
         # SQL Statement for deleting the user information
         query = 'DELETE FROM users WHERE nickname = ?'
-        # Activate foreign key support
-        self.set_foreign_keys_support()
-        # Cursor and row initialization
-        self.con.row_factory = sqlite3.Row
+        # Cursor initialization
         cur = self.con.cursor()
         # Execute the statement to delete
         pvalue = (nickname,)
         cur.execute(query, pvalue)
-        self.con.commit()
+        if cur.rowcount > 0:
+            self._log_invalidations(author=nickname, tags=(USERS_TAG, user_tag(nickname)))
+        self._commit()
         # Check that it has been deleted
         if cur.rowcount < 1:
             return False
+        # The exercises of the user lost their author
+        self._invalidate_author(nickname)
+        self._invalidate_responses(USERS_TAG, user_tag(nickname))
         return True
 
     def append_user(self, nickname, email):
@@ -525,37 +1843,271 @@ class Connection(object):
         :return: the nickname of the created user or None if the user could not been added to the database.
 
         """
-        # Create the SQL Statements
-        # SQL Statement for extracting the userid given a nickname
-        query1 = 'SELECT user_id FROM users WHERE nickname = ?'
-        # SQL Statement to create the row in  users table
-        query2 = 'INSERT INTO users(nickname,reg_date,email)\
+        # Create the SQL Statement to create the row in  users table. The
+        # UNIQUE constraint of the nickname rejects the existing users.
+        query = 'INSERT INTO users(nickname,reg_date,email)\
                   VALUES(?,?,?)'
-        # temporal variables for user table
         # timestamp will be used for reg_date.
         timestamp = int(time.time())
 
-        # Activate foreign key support
-        self.set_foreign_keys_support()
-        # Cursor and row initialization
-        self.con.row_factory = sqlite3.Row
+        # Cursor initialization
         cur = self.con.cursor()
-        # Execute the main SQL statement to extract the id associated to a nickname
-        pvalue = (nickname,)
-        cur.execute(query1, pvalue)
-        # No value expected (no other user with that nickname expected)
+        pvalue = (nickname, timestamp, email)
+        try:
+            cur.execute(query, pvalue)
+        except sqlite3.IntegrityError:
+            # There is another user with that nickname
+            return None
+        self._log_invalidations(tags=(USERS_TAG,))
+        self._commit()
+        self._invalidate_responses(USERS_TAG)
+        return nickname
+
+
+    def create_solver_session(self, session_id, exercise_id, version, position, limit, ttl):
+        """
+        Stores a new solver session without moves. The expired sessions are
+        removed, and the least recently used ones when there are more than
+        ``limit`` sessions.
+
+        :param str session_id: The identifier of the session.
+        :param int exercise_id: The id of the exercise solved in the session.
+        :param int version: The version of the exercise.
+        :param tuple position: The FEN and the move tree node of the initial
+            position.
+        :param int limit: The maximum number of stored sessions.
+        :param float ttl: Seconds after an unused session expires.
+
+        """
+        now = time.time()
+        cur = self.con.cursor()
+        cur.execute('DELETE FROM solver_sessions WHERE touched < ?', (now - ttl,))
+        cur.execute('INSERT INTO solver_sessions (session_id, exercise_id, version, fen, node, touched) \
+                     VALUES (?,?,?,?,?,?)', (session_id, exercise_id, version, position[0], position[1], now))
+        cur.execute('DELETE FROM solver_sessions WHERE session_id IN \
+                     (SELECT session_id FROM solver_sessions ORDER BY touched DESC LIMIT -1 OFFSET ?)', (limit,))
+        self._commit()
+
+    def get_solver_session(self, session_id, ttl):
+        """
+        Extracts a solver session.
+
+        :param str session_id: The identifier of the session.
+        :param float ttl: Seconds after an unused session expires.
+        :return: dictionary with the ``session_id``, ``exercise_id``,
+            ``version``, ``list_moves``, ``ply``, ``fen`` and ``node`` of the
+            session, or None if it does not exist or has expired.
+
+        """
+        query = 'SELECT session_id, exercise_id, version, list_moves, ply, fen, node FROM solver_sessions \
+                 WHERE session_id = ? AND touched >= ?'
+        cur = self.con.cursor()
+        cur.execute(query, (session_id, time.time() - ttl))
         row = cur.fetchone()
-        # If there is no user add rows in user
         if row is None:
-            # Add the row in users table
-            # Execute the statement
-            pvalue = (nickname, timestamp, email)
-            cur.execute(query2, pvalue)
-            # Extrat the rowid => user-id
+            return None
+        return {'session_id': row['session_id'], 'exercise_id': row['exercise_id'], 'version': row['version'],
+                'list_moves': row['list_moves'], 'ply': row['ply'], 'fen': row['fen'], 'node': row['node']}
 
-            self.con.commit()
+    def update_solver_session(self, session_id, ply, list_moves, new_ply, position):
+        """
+        Stores the moves and the position of a solver session and restarts
+        its expiry. The session is updated only if no other move has been
+        stored since it was read.
+
+        :param str session_id: The identifier of the session.
+        :param int ply: The ply of the session when it was read.
+        :param str list_moves: Comma-separated list of the SAN moves played.
+        :param int new_ply: The number of the moves played.
+        :param tuple position: The FEN and the move tree node of the current
+            position.
+        :return: True if the session has been updated, False if it does not
+            exist or has another ply.
 
-            return nickname
+        """
+        stmnt = 'UPDATE solver_sessions SET list_moves = ?, ply = ?, fen = ?, node = ?, touched = ? \
+                 WHERE session_id = ? AND ply = ?'
+        cur = self.con.cursor()
+        cur.execute(stmnt, (list_moves, new_ply, position[0], position[1], time.time(), session_id, ply))
+        self._commit()
+        return cur.rowcount > 0
 
+    def delete_solver_session(self, session_id):
+        """
+        Removes a solver session.
+
+        :param str session_id: The identifier of the session.
+        :return: True if the session has been deleted, False otherwise.
+
+        """
+        cur = self.con.cursor()
+        cur.execute('DELETE FROM solver_sessions WHERE session_id = ?', (session_id,))
+        self._commit()
+        return cur.rowcount > 0
+
+
+class UnitOfWork(object):
+    """
+    Scope of the database work of a single request. It wraps a
+    :py:class:`Connection` and
+
+    * keeps an identity map of the users and exercises read through it, so
+      looking up the same row again does not query the database,
+    * defers the commits of the write methods, so every modification of the
+      request is committed (or rolled back) at once by :py:meth:`close`.
+
+    Every other method of :py:class:`Connection` is available through the
+    unit of work as well.
+
+    The connection can be returned to its pool during the work with
+    :py:meth:`release`, e.g. while a long computation runs which does not
+    need the database.
+
+    :Example:
+
+    >>> uow = UnitOfWork(engine.checkout(), engine.checkout)
+    >>> uow.get_user('Mystery') is uow.get_user('Mystery')
+    True
+    >>> uow.close()
+
+    :param connection: The connection to work with. It is closed by
+        :py:meth:`close`.
+    :type connection: Connection
+    :param checkout: Callable returning a new connection, used to continue
+        the work after :py:meth:`release`.
+
+    """
+
+    def __init__(self, connection, checkout=None):
+        super(UnitOfWork, self).__init__()
+        self._connection = connection
+        self._checkout = checkout
+        self._users = {}
+        self._exercises = {}
+        connection.begin()
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    @property
+    def connection(self):
+        """
+        The connection of the unit of work. After :py:meth:`release` a new
+        one is checked out on first use.
+
+        :raises sqlite3.ProgrammingError: if the connection has been released
+            and there is no checkout callable.
+        :raises PoolTimeoutError: if no pooled connection became available.
+
+        """
+        return self.acquire()
+
+    def acquire(self):
+        """
+        Checks out a new connection if the previous one has been released.
+
+        :return: the connection of the unit of work.
+        :raises sqlite3.ProgrammingError: if the connection has been released
+            and there is no checkout callable.
+        :raises PoolTimeoutError: if no pooled connection became available.
+
+        """
+        if self._connection is None:
+            if self._checkout is None:
+                raise sqlite3.ProgrammingError('The connection of the unit of work has been released')
+            self._connection = self._checkout()
+            self._connection.begin()
+        return self._connection
+
+    def release(self):
+        """
+        Commits the modifications made so far and returns the connection to
+        its pool. The identity map is kept.
+
+        """
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            connection.commit()
+            connection.close()
+
+    def get_user(self, nickname):
+        """
+        Memoized :py:meth:`Connection.get_user`.
+
+        """
+        if nickname not in self._users:
+            self._users[nickname] = self.connection.get_user(nickname)
+        return self._users[nickname]
+
+    def get_exercise(self, exercise_id):
+        """
+        Memoized :py:meth:`Connection.get_exercise`.
+
+        """
+        key = str(exercise_id)
+        if key not in self._exercises:
+            self._exercises[key] = self.connection.get_exercise(exercise_id)
+        return self._exercises[key]
+
+    def modify_exercise(self, exerciseid, title, description, initial_state, list_moves, version=None):
+        """
+        :py:meth:`Connection.modify_exercise`, forgetting the modified exercise.
+
+        """
+        self._exercises.pop(str(exerciseid), None)
+        return self.connection.modify_exercise(exerciseid, title, description, initial_state, list_moves, version)
+
+    def delete_exercise(self, exercise_id):
+        """
+        :py:meth:`Connection.delete_exercise`, forgetting the deleted exercise.
+
+        """
+        self._exercises.pop(str(exercise_id), None)
+        return self.connection.delete_exercise(exercise_id)
+
+    def append_user(self, nickname, email):
+        """
+        :py:meth:`Connection.append_user`, forgetting the missing user.
+
+        """
+        self._users.pop(nickname, None)
+        return self.connection.append_user(nickname, email)
+
+    def modify_user(self, old_nickname, new_nickname, new_email, version=None):
+        """
+        :py:meth:`Connection.modify_user`, forgetting the modified user and
+        the exercises, whose author may have changed.
+
+        """
+        self._users.pop(old_nickname, None)
+        self._users.pop(new_nickname, None)
+        self._exercises.clear()
+        return self.connection.modify_user(old_nickname, new_nickname, new_email, version)
+
+    def delete_user(self, nickname):
+        """
+        :py:meth:`Connection.delete_user`, forgetting the deleted user and the
+        exercises, whose author may have changed.
+
+        """
+        self._users.pop(nickname, None)
+        self._exercises.clear()
+        return self.connection.delete_user(nickname)
+
+    def close(self, exc=None):
+        """
+        Ends the unit of work: commits the modifications, or rolls them back
+        if the work failed, then closes the connection.
+
+        :param exc: The exception which made the work fail, or None.
+
+        """
+        self._users.clear()
+        self._exercises.clear()
+        if self._connection is None:
+            return
+        if exc is None:
+            self._connection.commit()
         else:
-            return None
+            self._connection.rollback()
+        self._connection.close()
@@ -0,0 +1,247 @@
+"""
+Created on 18.10.2026
+Generates synthetic databases of any size for scale testing. The exercises are
+mutations of known mates: a later position of the solution, the position with
+the colours or the wings swapped, and pieces added or removed where the
+solution still mates. Every exercise is checked with the rules the API uses before it is
+stored. The generation is spread over worker processes and only depends on the
+seed, not on the number of processes.
+@author: lorinc
+
+Usage, in the project root folder:
+    python -m chessApi.dataset OUTPUT [--users N] [--exercises N] [--seed N] [--processes N]
+
+"""
+
+import argparse
+from functools import lru_cache
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import time
+import chess
+from chessApi import chess_data
+from chessApi import database
+
+DEFAULT_CHUNK_SIZE = 10000
+# the dates of the generated users and exercises are spread over the 5 years
+# after 01.01.2018, so they only depend on the seed
+EPOCH = 1514764800
+DATE_RANGE = 5 * 365 * 24 * 3600
+# the maximum number of pieces added to or removed from a mate, the number of
+# tries, and the share of the removals
+MAX_CHANGES = 4
+MAX_ATTEMPTS = 8
+REMOVAL_RATE = 0.3
+EXTRA_PIECE_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN)
+NICKNAMES = ('Mystery', 'AxelW', 'LinuxPenguin', 'Koodari', 'HockeyFan', 'Gambit', 'Rook', 'Zugzwang', 'Patzer',
+             'Fianchetto')
+# title, initial state and solution of the mates the exercises are generated from, the first three are the exercises
+# of db/chessApi_data_dump.sql
+SEED_MATES = [
+    ('Fool mate', 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1', 'e6,g4,Qh4#'),
+    ('Fool mate II', 'rnbqkbnr/pppppppp/8/8/8/6Qn/PPPPPPPP/RNBQKBNR w KQkq - 0 1', 'Qxh3,f6,Qh4,g5,Qh5#'),
+    ('Simple bishop', 'r1b2bkr/ppp3pp/2n5/3qp3/2B5/8/PPPP1PPP/RNBQK1NR w KQkq - 0 1', 'Bxd5+,Be6,Bxe6#'),
+    ('Scholar mate', 'r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4', 'Qxf7#'),
+    ('Back rank', '6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1', 'Rd8#'),
+    ('Smothered mate', 'r5rk/5ppp/8/6N1/8/8/5PPP/6K1 w - - 0 1', 'Nxf7#'),
+    ('Doubled rooks', '2r3k1/5ppp/8/8/8/8/4RPPP/4R1K1 w - - 0 1', 'Re8+,Rxe8,Rxe8#'),
+    ('King hunt', 'r1b1kb1r/pppp1ppp/5q2/4n3/3KP3/2N3PN/PPP4P/R1BQ1B1R b kq - 0 1', 'Bc5+,Kxc5,Qb6+,Kd5,Qd6#')
+]
+
+_USER_INSERT = 'INSERT INTO users (user_id, nickname, reg_date, email) VALUES (?,?,?,?)'
+_EXERCISE_INSERT = 'INSERT INTO exercises (exercise_id, user_id, title, description, sub_date, initial_state, \
+                    list_moves) VALUES (?,?,?,?,?,?,?)'
+_EDGE_INSERT = 'INSERT INTO solution_edges (exercise_id, from_hash, uci, san, to_hash, rank) VALUES (?,?,?,?,?,?)'
+
+
+def _replay(board, moves):
+    """
+    Plays the moves on a copy of the board.
+    :param board: The chess.Board of the initial position.
+    :param moves: List of chess.Move.
+    :return: The comma-separated SAN moves, or None if a move is illegal or the last one does not mate.
+    """
+    board = board.copy(stack=False)
+    sans = []
+    for move in moves:
+        if not board.is_legal(move):
+            return None
+        sans.append(board.san(move))
+        board.push(move)
+    return ','.join(sans) if board.is_checkmate() else None
+
+
+def _change_pieces(rnd, board, moves):
+    """
+    Adds or removes up to :py:data:`MAX_CHANGES` random pieces, except the kings, one at a time. A change is kept if
+    the position stays valid and the moves still lead to a mate.
+    :return: tuple of the new board and the SAN moves on it, the SAN moves are None if no change was kept.
+    """
+    list_moves = None
+    changes = rnd.randint(1, MAX_CHANGES)
+    for _ in range(MAX_ATTEMPTS):
+        if not changes:
+            break
+        mutated = board.copy(stack=False)
+        color = rnd.random() < 0.5
+        # a side has 16 pieces at most
+        if rnd.random() < REMOVAL_RATE or chess.popcount(mutated.occupied_co[color]) >= 16:
+            mutated.remove_piece_at(rnd.choice(list(chess.scan_forward(mutated.occupied & ~mutated.kings))))
+        else:
+            square = rnd.choice(list(chess.scan_forward(~mutated.occupied & chess.BB_ALL)))
+            piece_type = rnd.choice(EXTRA_PIECE_TYPES)
+            if piece_type == chess.PAWN and chess.square_rank(square) in (0, 7):
+                piece_type = chess.KNIGHT
+            mutated.set_piece_at(square, chess.Piece(piece_type, color))
+        if not mutated.is_valid():
+            continue
+        replayed = _replay(mutated, moves)
+        if replayed is not None:
+            board, list_moves = mutated, replayed
+            changes -= 1
+    return board, list_moves
+
+
+@lru_cache(maxsize=None)
+def _positions(initial_state, list_moves):
+    """
+    :return: tuple of the positions of a mate the side to mate is to move in, each a tuple of the chess.Board and
+        the list of the chess.Move leading to the mate from it.
+    """
+    board = chess.Board(initial_state)
+    moves = [board.push_san(san) for san in list_moves.split(',')]
+    positions = []
+    board = chess.Board(initial_state)
+    for ply, move in enumerate(moves):
+        if ply % 2 == 0:
+            positions.append((board.copy(stack=False), moves[ply:]))
+        board.push(move)
+    return tuple(positions)
+
+
+def mutate(rnd, initial_state, list_moves):
+    """
+    Derives a new exercise from a mate.
+    :param rnd: The random.Random generator.
+    :param initial_state: FEN string of the initial board state of the mate.
+    :param list_moves: Comma-separated list of the SAN moves of the mate, a single line.
+    :return: tuple of the FEN string of the initial state and the SAN moves of the new exercise.
+    """
+    # start from a later position of the solution, the same side is to mate
+    board, moves = rnd.choice(_positions(initial_state, list_moves))
+    if rnd.random() < 0.5:
+        board = board.mirror()
+        moves = [chess.Move(chess.square_mirror(move.from_square), chess.square_mirror(move.to_square),
+                            move.promotion) for move in moves]
+    if not board.castling_rights and rnd.random() < 0.5:
+        board = board.transform(chess.flip_horizontal)
+        moves = [chess.Move(move.from_square ^ 7, move.to_square ^ 7, move.promotion) for move in moves]
+    board, list_moves = _change_pieces(rnd, board, moves)
+    if list_moves is None:
+        # swapping the colours and the wings keeps a mate a mate
+        list_moves = _replay(board, moves)
+    return board.fen(), list_moves
+
+
+def _user_rows(seed, chunk, first_id, count):
+    """
+    :return: list of the rows of the users `first_id` to `first_id + count - 1`.
+    """
+    rnd = random.Random('%d:users:%d' % (seed, chunk))
+    rows = []
+    for user_id in range(first_id, first_id + count):
+        nickname = '%s%d' % (rnd.choice(NICKNAMES), user_id)
+        rows.append((user_id, nickname, EPOCH + rnd.randrange(DATE_RANGE), nickname.lower() + '@mymail.com'))
+    return rows
+
+
+def _exercise_chunk(task):
+    """
+    Generates the exercises `first_id` to `first_id + count - 1`. Runs in the worker processes.
+    :param task: tuple of the seed, the index of the chunk, the id of its first exercise, the number of its
+        exercises and the number of users.
+    :return: tuple of the list of the rows of the exercises and the list of the rows of their solution trees.
+    """
+    seed, chunk, first_id, count, users = task
+    rnd = random.Random('%d:exercises:%d' % (seed, chunk))
+    rows = []
+    edges = []
+    for exercise_id in range(first_id, first_id + count):
+        title, initial_state, list_moves = rnd.choice(SEED_MATES)
+        initial_state, list_moves = mutate(rnd, initial_state, list_moves)
+        if not chess_data.check_chess_data(initial_state, list_moves):
+            raise RuntimeError('Invalid exercise generated from %s: %s %s' % (title, initial_state, list_moves))
+        rows.append((exercise_id, rnd.randint(1, users), '%s #%d' % (title, exercise_id),
+                     'Generated from the %s exercise.' % title, EPOCH + rnd.randrange(DATE_RANGE),
+                     initial_state, list_moves))
+        edges.extend((exercise_id, from_hash, uci, san, to_hash, rank) for rank, (from_hash, san, uci, to_hash)
+                     in enumerate(chess_data.compile_solution(initial_state, list_moves)))
+    return rows, edges
+
+
+def generate(path, users, exercises, seed=0, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Creates a database of generated users and exercises, with the compiled solutions of the exercises. The rows are
+    generated in chunks in a pool of worker processes, and inserted in bulk, one transaction per chunk.
+    :param path: The path of the database file, which must not exist.
+    :param users: The number of users.
+    :param exercises: The number of exercises.
+    :param seed: The seed of the generation, the same seed gives the same database.
+    :param processes: The number of worker processes. If None, the number of CPUs is used. If 0, the exercises are
+        generated in the calling process.
+    :param chunk_size: The number of users or exercises of a chunk.
+    :return: dictionary with the numbers of `users` and `exercises`, the duration of the generation in seconds
+        (`elapsed`) and the number of exercises generated per second (`per_second`).
+    :raises ValueError: if the database exists, or there are exercises but no user.
+    """
+    if os.path.exists(path):
+        raise ValueError('The database already exists: %s' % path)
+    if exercises and not users:
+        raise ValueError('The exercises need at least one user')
+    start = time.perf_counter()
+    database.Engine(path).create_tables()
+    con = sqlite3.connect(path)
+    pool = None
+    try:
+        # the file is thrown away if the generation fails
+        con.execute('PRAGMA synchronous = OFF')
+        for chunk, first in enumerate(range(0, users, chunk_size)):
+            with con:
+                con.executemany(_USER_INSERT, _user_rows(seed, chunk, first + 1, min(chunk_size, users - first)))
+        tasks = [(seed, chunk, first + 1, min(chunk_size, exercises - first), users)
+                 for chunk, first in enumerate(range(0, exercises, chunk_size))]
+        if processes == 0:
+            chunks = map(_exercise_chunk, tasks)
+        else:
+            pool = multiprocessing.Pool(processes)
+            # the chunks are inserted in order, so the ids do not depend on the scheduling
+            chunks = pool.imap(_exercise_chunk, tasks)
+        for rows, edges in chunks:
+            with con:
+                con.executemany(_EXERCISE_INSERT, rows)
+                con.executemany(_EDGE_INSERT, edges)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        con.close()
+    elapsed = time.perf_counter() - start
+    return {'users': users, 'exercises': exercises, 'elapsed': elapsed,
+            'per_second': exercises / elapsed if elapsed else 0.0}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a database of synthetic users and exercises.')
+    parser.add_argument('output', help='path of the database file to create')
+    parser.add_argument('--users', type=int, default=100000, help='number of users')
+    parser.add_argument('--exercises', type=int, default=1000000, help='number of exercises')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generation')
+    parser.add_argument('--processes', type=int, help='number of worker processes, the number of CPUs by default')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='number of rows generated and inserted at once')
+    args = parser.parse_args()
+    print(json.dumps(generate(args.output, args.users, args.exercises, args.seed, args.processes, args.chunk_size),
+                     indent=2, sort_keys=True))
@@ -0,0 +1,62 @@
+"""
+Created on 18.10.2026
+Exports the exercise catalog as newline-delimited JSON (one exercise object per line).
+@author: lorinc
+
+Usage, in the project root folder:
+    python -m chessApi.export [--db db/chessApi.db] [--output exercises.ndjson]
+
+"""
+
+import argparse
+import sys
+from chessApi import codec
+from chessApi import database
+
+NDJSON = 'application/x-ndjson'
+
+
+def ndjson_lines(connection, batch_size=database.DEFAULT_FETCH_BATCH_SIZE):
+    """
+    Serializes the exercises of the database one by one.
+    :param connection: The database Connection to read from.
+    :param batch_size: The number of rows fetched from the database at once.
+    :return: generator of the lines, each one is the JSON object of an exercise, as defined in
+        :py:meth:`database.Connection._create_exercise_object`, followed by a newline.
+    """
+    for exercise in connection.iter_exercises(batch_size):
+        yield codec.dumps(exercise) + '\n'
+
+
+def export(engine, output, batch_size=database.DEFAULT_FETCH_BATCH_SIZE):
+    """
+    Writes every exercise of the database to a stream.
+    :param engine: The database Engine.
+    :param output: Writable text stream.
+    :param batch_size: The number of rows fetched from the database at once.
+    :return: The number of exported exercises.
+    """
+    con = engine.connect()
+    count = 0
+    try:
+        for line in ndjson_lines(con, batch_size):
+            output.write(line)
+            count += 1
+    finally:
+        con.close()
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the exercises as newline-delimited JSON.')
+    parser.add_argument('--db', default=database.DEFAULT_DB_PATH, help='path of the database file')
+    parser.add_argument('--output', help='path of the output file, standard output if not given')
+    parser.add_argument('--batch-size', type=int, default=database.DEFAULT_FETCH_BATCH_SIZE,
+                        help='number of rows fetched at once')
+    args = parser.parse_args()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            exported = export(database.Engine(args.db), f, args.batch_size)
+    else:
+        exported = export(database.Engine(args.db), sys.stdout, args.batch_size)
+    print('Exported %d exercises' % exported, file=sys.stderr)
@@ -0,0 +1,297 @@
+"""
+Created on 18.10.2026
+Provides a pre-forking WSGI server: a master process binds the listening
+socket and keeps a fixed number of worker processes accepting connections on
+it, each one optionally serving several requests at once in threads.
+
+The master handles the signals:
+
+* SIGTERM, SIGINT: graceful shutdown, the workers finish the requests in
+  progress and exit.
+* SIGHUP: graceful restart, new workers are started, loading the application
+  again, and the old workers are stopped gracefully.
+* SIGCHLD: a worker which exited is replaced.
+
+Unix only, as it relies on fork.
+@author: lorinc
+
+"""
+
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from werkzeug.serving import BaseWSGIServer, ThreadedWSGIServer
+
+DEFAULT_WORKERS = 2
+DEFAULT_THREADS = 1
+DEFAULT_BACKLOG = 128
+DEFAULT_GRACEFUL_TIMEOUT = 30.0
+# seconds between two checks of the master for signals and exited workers
+POLL_INTERVAL = 0.5
+# seconds between two respawns of the same worker slot, so a worker failing
+# on start does not make the master spin
+RESPAWN_DELAY = 1.0
+
+_logger = logging.getLogger(__name__)
+
+
+class _WorkerServer(ThreadedWSGIServer):
+    """
+    The server of a worker, on the listening socket inherited from the
+    master. At most ``threads`` requests are served at once, each in its own
+    thread if there are several; the requests in progress are waited for on
+    close.
+    """
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, host, port, app, fd, threads, master_pid):
+        super(_WorkerServer, self).__init__(host, port, app, fd=fd)
+        self._slots = threading.BoundedSemaphore(threads) if threads > 1 else None
+        self.master_pid = master_pid
+
+    def process_request(self, request, client_address):
+        if self._slots is None:
+            BaseWSGIServer.process_request(self, request, client_address)
+            return
+        # the worker stops accepting while it is busy, the others take the connections
+        self._slots.acquire()
+        try:
+            super(_WorkerServer, self).process_request(request, client_address)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super(_WorkerServer, self).process_request_thread(request, client_address)
+        finally:
+            self._slots.release()
+
+    def service_actions(self):
+        # orphaned workers stop by themselves
+        if os.getppid() != self.master_pid:
+            threading.Thread(target=self.shutdown).start()
+
+
+class PreforkServer(object):
+    """
+    Pre-forking WSGI server.
+
+    The application is loaded in every worker after the fork, by calling
+    ``load_app``, so a graceful restart serves the current code, and no
+    database connection or worker pool is shared between processes. With
+    ``preload``, the application is loaded once in the master instead, and
+    ``post_fork`` has to reset the inherited state in the workers.
+
+    :param load_app: Callable returning the WSGI application.
+    :param str host: The host to listen on.
+    :param int port: The port to listen on.
+    :param int workers: The number of worker processes.
+    :param int threads: The number of requests a worker serves at once. With
+        more than one, every request is served in its own thread.
+    :param float graceful_timeout: Seconds the workers have to finish the
+        requests in progress when stopped, before they are killed.
+    :param bool preload: Whether to load the application in the master.
+    :param post_fork: Callable receiving the application, called in every
+        worker after loading it.
+    :param worker_exit: Callable receiving the application, called in every
+        worker when it stops, once the requests in progress are served. The
+        workers exit without running the ``atexit`` handlers, so the
+        processes started by the application have to be stopped there.
+    :param int backlog: The size of the queue of pending connections.
+
+    """
+
+    def __init__(self, load_app, host='127.0.0.1', port=5000, workers=DEFAULT_WORKERS, threads=DEFAULT_THREADS,
+                 graceful_timeout=DEFAULT_GRACEFUL_TIMEOUT, preload=False, post_fork=None, worker_exit=None,
+                 backlog=DEFAULT_BACKLOG):
+        super(PreforkServer, self).__init__()
+        if workers < 1:
+            raise ValueError('At least one worker is needed')
+        self.load_app = load_app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.graceful_timeout = graceful_timeout
+        self.preload = preload
+        self.post_fork = post_fork
+        self.worker_exit = worker_exit
+        self.backlog = backlog
+        self.socket = None
+        self.app = None
+        # pid -> time the worker was started
+        self._workers = {}
+        # pid -> time the stopped worker is killed if it is still running
+        self._stopping = {}
+        self._last_spawn = 0.0
+        self._signals = []
+
+    def bind(self):
+        """
+        Binds the listening socket, if it is not bound yet.
+
+        :return: tuple of the host and the port the server listens on.
+
+        """
+        if self.socket is None:
+            self.socket = socket.create_server((self.host, self.port), backlog=self.backlog)
+            self.socket.set_inheritable(True)
+        return self.socket.getsockname()[:2]
+
+    def run(self):
+        """
+        Runs the master process until it is shut down. Returns in the master
+        only.
+
+        """
+        host, port = self.bind()
+        if self.preload:
+            self.app = self.load_app()
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(signum, self._on_signal)
+        _logger.info('Listening on %s:%d with %d workers', host, port, self.workers)
+        try:
+            self._spawn_missing()
+            while True:
+                signals, self._signals[:] = self._signals[:], []
+                if signal.SIGTERM in signals or signal.SIGINT in signals:
+                    break
+                if signal.SIGHUP in signals:
+                    self._restart()
+                self._reap()
+                self._kill_overdue()
+                self._spawn_missing(throttle=True)
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self._stop(list(self._workers))
+            while self._stopping:
+                self._reap()
+                self._kill_overdue()
+                time.sleep(0.05)
+            self.socket.close()
+            _logger.info('Shut down')
+
+    def _on_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def _spawn_missing(self, throttle=False):
+        """
+        Starts workers until there are ``workers`` of them.
+
+        :param bool throttle: Whether to start at most one worker every
+            :py:data:`RESPAWN_DELAY` seconds, so workers failing on start do
+            not make the master spin.
+
+        """
+        while len(self._workers) < self.workers:
+            now = time.monotonic()
+            if throttle:
+                if now - self._last_spawn < RESPAWN_DELAY:
+                    return
+                _logger.warning('Replacing an exited worker')
+            pid = os.fork()
+            if pid == 0:
+                self._run_worker()
+            self._workers[pid] = now
+            self._last_spawn = now
+            if throttle:
+                return
+
+    def _run_worker(self):
+        """
+        Serves requests in a forked worker, until it is stopped. Never returns.
+
+        """
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            # the master stops the workers on Ctrl+C, and restarts them on SIGHUP
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            app = self.app if self.preload else self.load_app()
+            if self.post_fork is not None:
+                self.post_fork(app)
+            server = _WorkerServer(self.host, self.port, app, self.socket.fileno(), self.threads, os.getppid())
+            self.socket.close()
+
+            def stop(signum, frame):
+                # shutdown waits for serve_forever to return, so it must run in another thread
+                threading.Thread(target=server.shutdown).start()
+
+            signal.signal(signal.SIGTERM, stop)
+            server.serve_forever()
+            server.server_close()
+            if self.worker_exit is not None:
+                self.worker_exit(app)
+        except BaseException:
+            _logger.exception('Worker %d failed', os.getpid())
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    def _reap(self):
+        """
+        Forgets the workers which exited.
+
+        """
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self._workers.pop(pid, None) is not None:
+                _logger.warning('Worker %d exited with status %d', pid, status)
+            self._stopping.pop(pid, None)
+
+    def _restart(self):
+        """
+        Replaces every worker: the new workers are started, then the old ones
+        stopped gracefully.
+
+        """
+        _logger.info('Restarting the workers')
+        old = list(self._workers)
+        self._workers.clear()
+        if self.preload:
+            self.app = self.load_app()
+        self._spawn_missing()
+        self._stop(old)
+
+    def _stop(self, pids):
+        """
+        Asks workers to finish the requests in progress and exit.
+
+        """
+        deadline = time.monotonic() + self.graceful_timeout
+        for pid in pids:
+            self._workers.pop(pid, None)
+            self._stopping[pid] = deadline
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _kill_overdue(self):
+        """
+        Kills the stopped workers which did not exit in time.
+
+        """
+        now = time.monotonic()
+        for pid, deadline in list(self._stopping.items()):
+            if now >= deadline:
+                _logger.warning('Killing worker %d', pid)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    self._stopping.pop(pid, None)
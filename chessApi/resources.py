@@ -4,12 +4,20 @@ Defines the REST resources used by the API.
 @author: lorinc
 
 """
-import json
-import chess
-import chess.pgn
-from flask import Flask, request, Response, g, _request_ctx_stack, redirect
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+import hashlib
+from urllib.parse import urlencode
+from flask import Flask, request, Response, g, _request_ctx_stack, redirect, stream_with_context
 from flask_restful import Resource, Api
+from chessApi import codec
+from chessApi import compression
 from chessApi import database
+from chessApi import chess_data
+from chessApi import export
+from chessApi import serializers
+from chessApi import solver
+from chessApi import validation
 
 APIARY_PROJECT = 'https://communitychess.docs.apiary.io'
 APIARY_PROFILES = APIARY_PROJECT + '/#reference/profiles/'
@@ -17,17 +25,28 @@ APIARY_RELATIONS = APIARY_PROJECT + '/#reference/link-relations/'
 CONTENT_TYPE = 'Content-Type'
 MASON = 'application/vnd.mason+json'
 JSON = 'application/json'
-EXERCISE_PROFILE = '/profiles/exercise-profile/'
+EXERCISE_PROFILE = serializers.EXERCISE_PROFILE
 ERROR_PROFILE = '/profiles/error-profile/'
-LINK_RELATIONS = '/api/link-relations/'
-USER_PROFILE = '/profiles/user-profile/'
+LINK_RELATIONS = serializers.LINK_RELATIONS
+USER_PROFILE = serializers.USER_PROFILE
 SOLVER_SOLUTION = 'SOLUTION'
 SOLVER_PARTIAL = 'PARTIAL'
 SOLVER_WRONG = 'WRONG'
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 10000
 
 app = Flask(__name__)
 app.debug = True
-app.config.update({'Engine': database.Engine()})
+app.config.update({
+    'Engine': database.Engine(),
+    'SolverSessions': solver.SessionStore(),
+    'BoardCache': solver.BoardCache(),
+    'Grader': solver.Grader(),
+    'Validator': validation.Validator(),
+    'CompressionLevel': compression.DEFAULT_LEVEL,
+    'CompressionMinSize': compression.DEFAULT_MIN_SIZE
+})
 api = Api(app)
 
 
@@ -48,11 +67,7 @@ class ChessApiObject(dict):
         """
         super(ChessApiObject, self).__init__(**kwargs)
         if add_namespace:
-            self['@namespaces'] = {
-                'chessapi': {
-                    'name': LINK_RELATIONS
-                }
-            }
+            self['@namespaces'] = serializers.NAMESPACES
         self['@controls'] = {}
         self.add_control('self', self_href)
         self.add_control('profile', profile)
@@ -70,145 +85,75 @@ class ChessApiObject(dict):
         if method:
             self['@controls'][name]['method'] = method
 
+    def add_next_control(self, href):
+        """
+        Shorthand for adding the control of the next page of a paginated collection.
+        :param href: Url of the next page.
+        """
+        self.add_control('next', href)
+
+    def add_prev_control(self, href):
+        """
+        Shorthand for adding the control of the previous page of a paginated collection.
+        :param href: Url of the previous page.
+        """
+        self.add_control('prev', href)
+
+    def add_page_controls(self, resource, limit, prev_cursor, next_cursor, **values):
+        """
+        Adds the `prev` and `next` controls of a keyset paginated collection, if there are such pages.
+        :param resource: The resource class of the collection.
+        :param limit: The page size.
+        :param prev_cursor: The cursor of the previous page, or None.
+        :param next_cursor: The cursor of the next page, or None.
+        :param values: Additional url parameters of the resource.
+        """
+        if prev_cursor is not None:
+            self.add_prev_control(serializers.url(resource.endpoint, limit=limit, before=prev_cursor, **values))
+        if next_cursor is not None:
+            self.add_next_control(serializers.url(resource.endpoint, limit=limit, after=next_cursor, **values))
+
     def add_add_exercise_control(self):
         """
         Shorthand for adding the chessapi:add-exercise control to the object.
         """
-        self['@controls']['chessapi:add-exercise'] = {
-            'title': 'Submit a new exercise',
-            'href': api.url_for(Exercises),
-            'encoding': 'json',
-            'method': 'POST',
-            'schema': {
-                'type': 'object',
-                'properties': {
-                    'headline': {
-                        'title': 'Headline',
-                        'description': 'Exercise title',
-                        'type': 'string'
-                    },
-                    'about': {
-                        'title': 'About',
-                        'description': 'Exercise description',
-                        'type': 'string'
-                    },
-                    'initial-state': {
-                        'title': 'Initial state',
-                        'description': 'FEN code of the initial board state',
-                        'type': 'string'
-                    },
-                    'list-moves': {
-                        'title': 'List of moves',
-                        'description': 'comma-separated SAN entries movelist of the exercise solution',
-                        'type': 'string'
-                    },
-                    'author': {
-                        'title': 'Author',
-                        'description': 'Submitter of the exercise',
-                        'type': 'string'
-                    },
-                    'author-email': {
-                        'title': 'Author Email',
-                        'description': 'The author\'s email address. Used for authentication.',
-                        'type': 'string'
-                    }
-                },
-                'required': ['headline', 'intial-state', 'list-moves', 'author', 'author-email']
-            }
-        }
+        self['@controls']['chessapi:add-exercise'] = serializers.add_exercise_control()
 
     def add_edit_exercise_control(self, exerciseid):
         """
         Shorthand for adding the edit control to the object.
         """
-        self['@controls']['edit'] = {
-            'title': 'Edit this exercise',
-            'href': api.url_for(Exercise, exerciseid=exerciseid),
-            'encoding': 'json',
-            'method': 'PUT',
-            'schema': {
-                'type': 'object',
-                'properties': {
-                    'headline': {
-                        'title': 'Headline',
-                        'description': 'Exercise title',
-                        'type': 'string'
-                    },
-                    'about': {
-                        'title': 'About',
-                        'description': 'Exercise description',
-                        'type': 'string'
-                    },
-                    'initial-state': {
-                        'title': 'Initial state',
-                        'description': 'FEN code of the initial board state',
-                        'type': 'string'
-                    },
-                    'list-moves': {
-                        'title': 'List of moves',
-                        'description': 'comma-separated SAN entries movelist of the exercise solution',
-                        'type': 'string'
-                    },
-                    'author-email': {
-                        'title': 'Author Email',
-                        'description': 'The author\'s email address. Used for authentication.',
-                        'type': 'string'
-                    }
-                },
-                'required': ['headline', 'intial-state', 'list-moves', 'author-email']
-            }
-        }
+        self['@controls']['edit'] = serializers.edit_exercise_control(exerciseid)
 
     def add_solver_control(self, exerciseid):
         """
         Shorthand for adding the chessapi:exercise-solver control to the object.
         """
-        self['@controls']['chessapi:exercise-solver'] = {
-            'title': 'Exercise Solver',
-            'href': api.url_for(Solver, exerciseid=exerciseid)[0:-1] + '{?solution}',
-            'method': 'GET',
-            'isHrefTemplate': True,
-            'schema': {
-                'required': ['solution'],
-                'type': 'object',
-                'properties': {
-                    'solution': {
-                        'type': 'string',
-                        'description': 'PGN code of the proposed solution of the exercise.'
-                    }
-                }
-            }
-        }
+        self['@controls']['chessapi:exercise-solver'] = serializers.solver_control(exerciseid)
+
+    def add_solver_session_control(self, exerciseid):
+        """
+        Shorthand for adding the chessapi:solver-session control to the object.
+        """
+        self['@controls']['chessapi:solver-session'] = serializers.solver_session_control(exerciseid)
+
+    def add_solver_move_control(self, exerciseid, sessionid):
+        """
+        Shorthand for adding the chessapi:solver-move control to the object.
+        """
+        self['@controls']['chessapi:solver-move'] = serializers.solver_move_control(exerciseid, sessionid)
 
     def add_users_all_control(self):
         """
         Shorthand for adding the chessapi:users-all control to the object.
         """
-        self.add_control('chessapi:users-all', api.url_for(Users), 'GET')
+        self['@controls']['chessapi:users-all'] = serializers.users_all_control()
 
     def add_add_users_control(self):
-        self['@controls']['chessapi:add-user'] = {
-            'title': 'Add a new user',
-            'href': api.url_for(Users),
-            'encoding': 'json',
-            'method': 'POST',
-            'schema': {
-                'type': 'object',
-                'properties': {
-                    'nickname': {
-                        'title': 'Nickname',
-                        'description': ' Unique id string of the user',
-                        'type': 'string'
-                    },
-                    'email': {
-                        'title': 'Email address',
-                        'description': 'email address of the user.',
-                        'type': 'string'
-                    }
-                },
-                'required': ['nickname', 'email']
-            }
-        }
+        """
+        Shorthand for adding the chessapi:add-user control to the object.
+        """
+        self['@controls']['chessapi:add-user'] = serializers.add_user_control()
 
 
 def _check_existing_nickname(nickname):
@@ -233,50 +178,194 @@ def _check_author_email(nickname, submitted_mail):
 
 def _check_chess_data(initial_state, list_moves, checkmate_needed=True):
     """
-    Checks if a given initial board state and a list of SAN moves is valid with the rules of chess.
+    Checks if a given initial board state and a list of SAN moves is valid with the rules of chess. Every
+    alternative line of the list has to end with checkmate if it's needed.
     :param initial_state: FEN string of the initial board state.
-    :param list_moves: Comma-separated list of SAN moves.
+    :param list_moves: Comma-separated list of SAN moves, alternative lines separated by semicolons.
     :param checkmate_needed: Wheter it's required to have a checkmate at the end of the moves or not.
     :return: `True` if the provided data is valid chess-wise.
     """
+    return chess_data.check_chess_data(initial_state, list_moves, checkmate_needed)
+
+
+def _validate_chess_data(initial_state, list_moves):
+    """
+    Validates the chess data of a submission in the worker pool of the validator. The database connection of the
+    request is returned to the pool meanwhile.
+    :param initial_state: FEN string of the initial board state.
+    :param list_moves: Comma-separated list of SAN moves.
+    :return: None if the data is valid, otherwise the flask.Response of the error.
+    """
+    g.con.release()
     try:
-        # check if initial state is valid
-        board = chess.Board(initial_state)
-        # test the list of moves
-        moves = list_moves.split(',')
-        for san_move in moves:
-            board.push_san(san_move)
-    except (ValueError, AttributeError):
-        return False
-    # valid exercise ends with checkmate
-    return not checkmate_needed or board.is_checkmate()
+        if not app.config['Validator'].check(initial_state, list_moves):
+            return INVALID_CHESS_DATA_RESP
+    except (validation.ValidationBusyError, BrokenProcessPool):
+        # a dead worker breaks the pool, a new one is created for the next submission
+        return VALIDATION_BUSY_RESP
+    except validation.ValidationTimeoutError:
+        return CHESS_DATA_TOO_COSTLY_RESP
+    # continue the work of the request on a connection
+    try:
+        g.con.acquire()
+    except database.PoolTimeoutError:
+        return DB_BUSY_RESP
+    return None
 
 
-def _check_free_exercise_title(title):
+def _check_free_exercise_title(title, exerciseid=None):
     """
     Checks if the given exercise headline exists already in the database.
+    We let keeping the headline of the modified exercise.
     :param title: The headline string to be checked.
+    :param exerciseid: The id of the exercise being modified, or None for a new exercise.
     :return: `True` if the given headline does not exist in the database.
     """
-    exercises_db = g.con.get_exercises()
-    return not any(map(lambda ex: ex['title'] == title, exercises_db))
+    return not g.con.title_exists(title, exerciseid)
+
+
+def _parse_page_query():
+    """
+    Reads the keyset pagination parameters `limit`, `after` and `before` from the query string of the request.
+    :return: tuple of the page size and the `after` and `before` cursors (None if not provided),
+        or None if the query is invalid.
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        after = request.args.get('after')
+        after = int(after) if after is not None else None
+        before = request.args.get('before')
+        before = int(before) if before is not None else None
+    except ValueError:
+        return None
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        return None
+    return limit, after, before
 
 
 def _compare_exercise_solution(solution, proposed):
     """
-    Compares a proposed solution string with the actual solution of the exercise.
+    Compares a proposed solution string with the actual solution of the exercise, move by move.
     :param solution: The 'real' solution of the exercise.
     :param proposed: The proposed solution.
     :return: `SOLVER_SOLUTION` if the proposed solution is the actual solution.
         `SOLVER_PARTIAL` if the proposed solution is the beginning of the actual solution.
         `SOLVER_WRONG` otherwise.
     """
-    if solution == proposed:
-        return SOLVER_SOLUTION,
-    if solution.find(proposed) == 0:
-        opponent_move = solution[len(proposed) + 1: solution.find(',', len(proposed) + 1)]
-        return SOLVER_PARTIAL, opponent_move
-    return SOLVER_WRONG,
+    return chess_data.compare_solution(solution, proposed)
+
+
+def _request_json():
+    """
+    Decodes the body of the request with the codec, whatever its Content-Type is.
+    :return: The decoded body.
+    :raises BadRequest: if the body is not valid JSON.
+    """
+    try:
+        return codec.loads(request.get_data(cache=True))
+    except ValueError as e:
+        return request.on_json_loading_failed(e)
+
+
+def _entity_tag(row):
+    """
+    The entity tag of the representation of a database row. It changes with the version of the row; the modification
+    time tells apart the rows reusing the id of a deleted one.
+    :param row: The exercise or the user fetched from the database.
+    :return: The entity tag, without quotes.
+    """
+    return '%d-%d' % (row['version'], row['modified'])
+
+
+def _solver_entity_tag(row, proposed_solution):
+    """
+    The entity tag of the answer of the Solver resource, which depends on the proposed solution as well.
+    :param row: The exercise fetched from the database.
+    :param proposed_solution: The proposed solution of the query string.
+    :return: The entity tag, without quotes.
+    """
+    return '%s-%s' % (_entity_tag(row), hashlib.sha1(proposed_solution.encode('utf-8')).hexdigest()[:16])
+
+
+def _with_validators(response, row, etag=None):
+    """
+    Sets the ETag and the Last-Modified header of a response.
+    :param response: The flask.Response.
+    :param row: The exercise or the user fetched from the database, which the response represents.
+    :param etag: The entity tag of the response, if it is not the one of the row.
+    :return: The response.
+    """
+    response.set_etag(etag or _entity_tag(row))
+    response.last_modified = row['modified']
+    return response
+
+
+def _not_modified(row, etag=None):
+    """
+    Evaluates the If-None-Match or, if it is missing, the If-Modified-Since header of a GET request, before the
+    representation is built.
+    :param row: The exercise or the user fetched from the database, which the requested resource represents.
+    :param etag: The entity tag of the representation, if it is not the one of the row.
+    :return: flask.Response with 304 status code if the client has the current representation already, otherwise None.
+    """
+    etag = etag or _entity_tag(row)
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since is not None:
+        fresh = request.if_modified_since >= datetime.utcfromtimestamp(row['modified'])
+    else:
+        fresh = False
+    if not fresh:
+        return None
+    return _with_validators(Response(status=304), row, etag)
+
+
+def _expected_version(row):
+    """
+    Evaluates the If-Match header of a modifying request.
+    :param row: The exercise or the user fetched from the database, which the modified resource represents.
+    :return: tuple of the version the modification has to be applied to (None if the request is unconditional)
+        and `True` if the precondition holds.
+    """
+    if not request.if_match:
+        return None, True
+    # the entity tag names the version of the row, it is weakened when the response is compressed
+    return row['version'], request.if_match.contains_weak(_entity_tag(row))
+
+
+def _cached_response(build, mimetype, *args):
+    """
+    Serves a GET response from the response cache of the engine, keyed by the path and the sorted query of the
+    request. The cached bodies are invalidated by the write methods of the database connections. The body is compressed
+    with the content coding negotiated with the Accept-Encoding header of the request, and the compressed forms are
+    cached alongside the body, so a hot response is compressed once.
+    :param build: Function building the body from `args`, returning the encoded body and the tags of the rows it shows
+        (see :py:func:`database.exercise_tag` and :py:func:`database.user_tag`).
+    :param mimetype: The mimetype of the response.
+    :param args: The arguments of `build`.
+    :return: flask.Response with 200 status code.
+    """
+    cache = app.config['Engine'].response_cache
+    encoding = compression.negotiate(request.headers.get('Accept-Encoding'))
+
+    def compress(body):
+        return compression.compress_body(body, encoding, app.config['CompressionLevel'],
+                                         app.config['CompressionMinSize'])
+
+    if cache is None:
+        body = build(*args)[0]
+        compressed = compress(body) if encoding else None
+    else:
+        key = request.path + '?' + urlencode(sorted(request.args.items(multi=True)))
+        if encoding:
+            body, compressed = cache.get_variant(key, lambda: build(*args), encoding, compress)
+        else:
+            body, compressed = cache.get(key, lambda: build(*args)), None
+    response = Response(compressed or body, 200, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    if compressed:
+        response.content_encoding = encoding
+    return response
 
 
 def _create_exercise_items_list(exercises_db):
@@ -286,15 +375,9 @@ def _create_exercise_items_list(exercises_db):
     :param exercises_db: The list of exercises fetched from the database.
     :return: The list of exercises as hypermedia objects (MASON).
     """
-    items = []
     if not exercises_db:
-        return items
-    for exercise_db in exercises_db:
-        ex = ChessApiObject(api.url_for(Exercise, exerciseid=exercise_db['exercise_id']), EXERCISE_PROFILE, False)
-        ex['headline'] = exercise_db['title']
-        ex['author'] = exercise_db['author']
-        items.append(ex)
-    return items
+        return []
+    return serializers.exercise_items(exercises_db)
 
 
 def create_error_response(status_code, title, message=None):
@@ -319,7 +402,7 @@ def create_error_response(status_code, title, message=None):
             '@messages': [message]
         }
     }
-    return Response(json.dumps(envelope), status_code, mimetype=MASON + ';' + ERROR_PROFILE)
+    return Response(codec.dumps(envelope), status_code, mimetype=MASON + ';' + ERROR_PROFILE)
 
 
 def _check_free_user_nickname(user_db, nickname):
@@ -332,8 +415,7 @@ def _check_free_user_nickname(user_db, nickname):
     """
     if user_db['nickname'] == nickname:
         return True
-    users_db = g.con.get_users()
-    return not any(map(lambda user: user['nickname'] == nickname, users_db))
+    return not g.con.nickname_exists(nickname)
 
 
 NOT_JSON_RESP = create_error_response(415, 'Wrong request format', JSON + ' is required')
@@ -350,7 +432,32 @@ INVALID_CHESS_DATA_RESP = create_error_response(400,
 BAD_SOLUTION_QUERY = create_error_response(400, 'Bad query',
                                            'Provide a valid comma separated SAN movelist as a query. '
                                            'Consider the initial state of the board.')
+BAD_SOLVER_MOVE = create_error_response(400, 'Bad move',
+                                        'Provide a SAN move which is legal on the current board of the session.')
+CONCURRENT_SOLVER_MOVE = create_error_response(409, 'Concurrent move',
+                                               'Another move has been played in the session meanwhile. '
+                                               'Fetch the session and retry the move.')
+BAD_BATCH_RESP = create_error_response(400, 'Bad batch',
+                                       'Provide the items as a list of at most ' + str(MAX_BATCH_SIZE) +
+                                       ' objects with exercise-id and solution fields.')
+PROPOSAL_TOO_LONG_RESP = create_error_response(400, 'Bad query',
+                                               'The proposed solution is too long. At most ' +
+                                               str(validation.DEFAULT_MAX_MOVES) + ' moves are accepted.')
+BAD_PAGE_QUERY = create_error_response(400, 'Bad query',
+                                       'The page size (limit) should be between 1 and ' + str(MAX_PAGE_SIZE) +
+                                       '. The after and before cursors should be integers.')
+PRECONDITION_FAILED_RESP = create_error_response(412, 'Precondition failed',
+                                                 'The resource has been modified since the provided ETag. '
+                                                 'Fetch it again and retry the modification.')
 DB_PROBLEM_RESP = create_error_response(500, 'Problem with the database', 'Cannot access database')
+DB_BUSY_RESP = create_error_response(503, 'Database busy', 'No database connection is available. Try again later.')
+VALIDATION_BUSY_RESP = create_error_response(503, 'Validation busy',
+                                             'Too many submissions are being validated. Try again later.')
+GRADING_BUSY_RESP = create_error_response(503, 'Grading busy', 'The batch could not be graded. Try again later.')
+CHESS_DATA_TOO_COSTLY_RESP = create_error_response(400, 'Chess data too costly',
+                                                   'The list of moves is too long or took too long to validate. '
+                                                   'At most ' + str(validation.DEFAULT_MAX_MOVES) +
+                                                   ' moves are accepted.')
 
 
 def missing_exercise_response(exerciseid):
@@ -361,6 +468,11 @@ def missing_user_response(nickname):
     return create_error_response(404, 'User does not exist', 'There is no user with nickname ' + nickname)
 
 
+def missing_solver_session_response(sessionid):
+    return create_error_response(404, 'Solver session does not exist',
+                                 'There is no live solver session with id ' + sessionid)
+
+
 def existing_nickname_response(nickname):
     return create_error_response(409, 'Nickname already exists',
                                  'There is already a user with same nickname: ' + nickname)
@@ -384,26 +496,40 @@ def unknown_error(error):
                                  "The system has failed. Please, contact the administrator")
 
 
+@app.before_first_request
+def migrate_db():
+    """
+    Brings the schema of the database up to date before the first request is processed.
+    """
+    app.config["Engine"].migrate()
+
+
 @app.before_request
 def connect_db():
     """
-    Creates a database connection before the request is proccessed.
+    Starts the unit of work of the request on a database connection borrowed from the pool of the engine.
 
-    The connection is stored in the application context variable flask.g .
-    Hence it is accessible from the request object.
+    The unit of work is stored in the application context variable flask.g . Hence it is accessible from the request
+    object. It memoizes the users and exercises read during the request and commits every modification at once.
+    The caches of the engine repeat the invalidations of the other worker processes first.
     """
-    g.con = app.config["Engine"].connect()
+    try:
+        engine = app.config["Engine"]
+        g.con = database.UnitOfWork(engine.checkout(), engine.checkout)
+    except database.PoolTimeoutError:
+        return DB_BUSY_RESP
+    engine.sync_caches(g.con)
 
 
 @app.teardown_request
 def close_connection(exc):
     """
-    Closes the database connection
+    Commits the unit of work, or rolls it back if the request failed, and returns the connection to the pool.
     Check if the connection is created. It migth be exception appear before
     the connection is created.
     """
     if hasattr(g, "con"):
-        g.con.close()
+        g.con.close(exc)
 
 
 class Users(Resource):
@@ -414,32 +540,42 @@ class Users(Resource):
         """
         Implmentation of the response to a GET request to the Users resource.
         Returns empty list when there's no users in the database.
+        The list is paginated with the `limit`, `after` and `before` query parameters.
+        The encoded pages are cached until a modification in the database invalidates them, and compressed if the
+        client accepts gzip or deflate.
         HTTP status codes:
             200 - the list of exercises retrieved correctly
+            400 - invalid pagination query
             500 - database error
         :return: flask.Response of the status code and response body.
         """
-        # get the list of users from the database
-        users_db = g.con.get_users()
+        page_query = _parse_page_query()
+        if not page_query:
+            return BAD_PAGE_QUERY
+
+        return _cached_response(self._build_page, MASON + ';' + USER_PROFILE, *page_query)
+
+    @staticmethod
+    def _build_page(limit, after, before):
+        """
+        Builds the body of a page of the users list.
+        :param limit: The page size.
+        :param after: The cursor of the previous page, or None.
+        :param before: The cursor of the next page, or None.
+        :return: tuple of the encoded body and its cache tags.
+        """
+        # get the page of users from the database
+        users_db, prev_cursor, next_cursor = g.con.get_users_page(limit, after, before)
 
         # create envelope and add controls to it
-        envelope = ChessApiObject(api.url_for(Users), USER_PROFILE)
+        envelope = ChessApiObject(serializers.url(Users.endpoint), USER_PROFILE)
         envelope.add_users_all_control()
         envelope.add_add_users_control()
+        envelope.add_page_controls(Users, limit, prev_cursor, next_cursor)
+        envelope['items'] = serializers.user_items(users_db)
 
-        items = envelope["items"] = []
-
-        for user in users_db:
-            item = ChessApiObject(
-                api.url_for(User, nickname=user["nickname"]),
-                USER_PROFILE,
-                False,
-                nickname=user["nickname"],
-                registrationdate=user["registrationdate"]
-            )
-            items.append(item)
-
-        return Response(json.dumps(envelope), 200, mimetype=MASON+";" + USER_PROFILE)
+        tags = [database.USERS_TAG] + [database.user_tag(user['nickname']) for user in users_db]
+        return codec.dumps(envelope).encode('utf-8'), tags
 
     def post(self):
         """
@@ -454,7 +590,7 @@ class Users(Resource):
         """
         if JSON != request.headers.get(CONTENT_TYPE):
             return NOT_JSON_RESP
-        request_body = request.get_json(force=True)
+        request_body = _request_json()
 
         # pick up nickname to check for conflicts
         try:
@@ -464,12 +600,12 @@ class Users(Resource):
             return create_error_response(400, 'Missing fields', 'Be sure to include nickname and email')
 
         # Conflict if user already exist
-        if g.con.get_user(nickname):
+        if g.con.nickname_exists(nickname):
             return existing_nickname_response(nickname)
 
-        nickname = g.con.append_user(nickname, email)
-        if not nickname:
-            return DB_PROBLEM_RESP
+        # The nickname might have been taken since the check
+        if not g.con.append_user(nickname, email):
+            return existing_nickname_response(nickname)
 
         # CREATE RESPONSE AND RENDER
         return Response(status=201, headers={"Location": api.url_for(User, nickname=nickname)})
@@ -482,8 +618,11 @@ class User(Resource):
     def get(self, nickname):
         """
         Implementation of the response to a GET request to the User resource.
+        The response carries the ETag and the Last-Modified header of the user, a conditional request for the current
+        version is answered without a body.
         HTTP status codes:
             200 - the user data is retrieved correctly
+            304 - the user has not been modified since the version of the client
             404 - the user with the given nickname does not exist
             500 - database error
         :param nickname: the nickname of the user
@@ -492,6 +631,9 @@ class User(Resource):
         user_db = g.con.get_user(nickname)
         if not user_db:
             return missing_user_response(nickname)
+        not_modified = _not_modified(user_db)
+        if not_modified is not None:
+            return not_modified
 
         regdate = user_db['registrationdate']
         nickname = user_db['nickname']
@@ -504,17 +646,19 @@ class User(Resource):
         envelope.add_control("chessapi:user-submission", href=api.url_for(Submissions, nickname=nickname))
         envelope.add_control("chessapi:all-exercises", href=api.url_for(Exercises))
         envelope.add_control("chessapi:delete", api.url_for(User, nickname=nickname), "DELETE")
-        return Response(json.dumps(envelope), 200, mimetype=MASON + ';' + USER_PROFILE)
+        return _with_validators(Response(codec.dumps(envelope), 200, mimetype=MASON + ';' + USER_PROFILE), user_db)
 
     def put(self, nickname):
         """
         Implementation of modifying an user via a PUT request.
+        With an If-Match header, the user is modified only if it still has the version of the given ETag.
         HTTP status codes:
             204 - the user has been correctly modified
             400 - some required fields are missing from the request body
             401 - the provided email address of the user does not match the one in the database
             404 - the user with the given nickname does not exist
             409 - the new nickname is already taken
+            412 - the user has been modified since the version of the If-Match header
             415 - the Content-Type of the request is not JSON
             500 - database error
         :param nickname: the nickname of the user
@@ -523,7 +667,7 @@ class User(Resource):
         # Check if the requested data is valid JSON
         if JSON != request.headers.get(CONTENT_TYPE):
             return NOT_JSON_RESP
-        request_body = request.get_json(force=True)
+        request_body = _request_json()
 
         # extract fields
         try:
@@ -540,6 +684,11 @@ class User(Resource):
         if not user_db:
             return missing_user_response(nickname)
 
+        # check if the client modifies the current version
+        version, precondition = _expected_version(user_db)
+        if not precondition:
+            return PRECONDITION_FAILED_RESP
+
         # check if the email addresses match
         if not _check_author_email(nickname, former_email):
             return WRONG_AUTH_RESP
@@ -548,8 +697,11 @@ class User(Resource):
         if not _check_free_user_nickname(user_db, new_nickname):
             return EXISTING_NICKNAME_RESP
 
-        if not g.con.modify_user(nickname, new_nickname, new_email):
-            return DB_PROBLEM_RESP
+        try:
+            if not g.con.modify_user(nickname, new_nickname, new_email, version):
+                return DB_PROBLEM_RESP if version is None else PRECONDITION_FAILED_RESP
+        except database.ConflictError:
+            return EXISTING_NICKNAME_RESP
         return Response(status=204)
 
     def delete(self, nickname):
@@ -587,27 +739,35 @@ class Submissions(Resource):
         Implementation of the response to a GET request to a Submissions resource.
         The returned list of items is empty if there is no exercises submitted by the user.
         The format of the list is defined in `_create_exercise_items_list` function.
+        The list is paginated with the `limit`, `after` and `before` query parameters.
         HTTP status codes:
             200 - the list of exercises is returned correctly
+            400 - invalid pagination query
             404 - the user with `nickname` does not exist
             500 - database error
         :param nickname: The nickname of the user.
         :return: flask.Response of the status code and response body.
         """
+        page_query = _parse_page_query()
+        if not page_query:
+            return BAD_PAGE_QUERY
+        limit, after, before = page_query
+
         # check if user exists
         if not g.con.get_user(nickname):
             return missing_user_response(nickname)
 
+        # get page of exercises submitted by the user with `nickname`
+        exercises_db, prev_cursor, next_cursor = g.con.get_exercises_page(limit, after, before, nickname)
+
         # create and add controls to the envelope
-        envelope = ChessApiObject(api.url_for(Submissions, nickname=nickname), EXERCISE_PROFILE)
+        envelope = ChessApiObject(serializers.url(Submissions.endpoint, nickname=nickname), EXERCISE_PROFILE)
         envelope.add_control('up', api.url_for(User, nickname=nickname))
-
-        # get list of exercises submitted by the user with `nickname`
-        exercises_db = g.con.get_exercises(nickname)
+        envelope.add_page_controls(Submissions, limit, prev_cursor, next_cursor, nickname=nickname)
         envelope['items'] = _create_exercise_items_list(exercises_db)
 
         # response
-        return Response(json.dumps(envelope), 200, mimetype=MASON+';'+EXERCISE_PROFILE)
+        return Response(codec.dumps(envelope), 200, mimetype=MASON+';'+EXERCISE_PROFILE)
 
 
 class Exercises(Resource):
@@ -618,22 +778,48 @@ class Exercises(Resource):
         """
         Implmentation of the response to a GET request to the Exercises resource.
         Returns empty list when there's no exercises in the database.
+        The list is paginated with the `limit`, `after` and `before` query parameters.
+        The encoded pages are cached until a modification in the database invalidates them, and compressed if the
+        client accepts gzip or deflate.
         HTTP status codes:
             200 - the list of exercises retrieved correctly
+            400 - invalid pagination query
             500 - database error
         :return: flask.Response of the status code and response body.
         """
+        page_query = _parse_page_query()
+        if not page_query:
+            return BAD_PAGE_QUERY
+
+        return _cached_response(self._build_page, MASON + ';' + EXERCISE_PROFILE, *page_query)
+
+    @staticmethod
+    def _build_page(limit, after, before):
+        """
+        Builds the body of a page of the exercises list.
+        :param limit: The page size.
+        :param after: The cursor of the previous page, or None.
+        :param before: The cursor of the next page, or None.
+        :return: tuple of the encoded body and its cache tags.
+        """
+        # get the page of exercises from the database
+        exercises_from_db, prev_cursor, next_cursor = g.con.get_exercises_page(limit, after, before)
+
         # create envelope and add controls to it
-        envelope = ChessApiObject(api.url_for(Exercises), EXERCISE_PROFILE)
+        envelope = ChessApiObject(serializers.url(Exercises.endpoint), EXERCISE_PROFILE)
         envelope.add_add_exercise_control()
         envelope.add_users_all_control()
+        envelope.add_page_controls(Exercises, limit, prev_cursor, next_cursor)
 
-        # get the list of exercises from the database and add them to the envelope - with a minimal format
-        exercises_from_db = g.con.get_exercises()
+        # add the exercises to the envelope - with a minimal format
         items = _create_exercise_items_list(exercises_from_db)
 
         envelope['items'] = items
-        return Response(json.dumps(envelope), 200, mimetype=MASON + ';' + EXERCISE_PROFILE)
+        tags = [database.EXERCISES_TAG]
+        for exercise in exercises_from_db:
+            tags.append(database.exercise_tag(exercise['exercise_id']))
+            tags.append(database.user_tag(exercise['author']))
+        return codec.dumps(envelope).encode('utf-8'), tags
 
     def post(self):
         """
@@ -644,15 +830,17 @@ class Exercises(Resource):
             400 - invalid chess data
             401 - the email address of the author does not match the email address in the database
             404 - the user with the given nickname does not exist
+            400 - the list of moves is too long or too costly to validate
             409 - the exercise title is already taken
             415 - the Content-Type of the request is not JSON
             500 - database error
+            503 - too many submissions are being validated, or no database connection is available
         :return: flask.Response of the status code.
         """
         # Check if json
         if JSON != request.headers.get(CONTENT_TYPE):
             return NOT_JSON_RESP
-        request_body = request.get_json(force=True)
+        request_body = _request_json()
 
         # check if has every required field
         try:
@@ -681,18 +869,39 @@ class Exercises(Resource):
         if not _check_author_email(author, author_email):
             return WRONG_AUTH_RESP
 
-        # check if sent data is valid chess-wise
-        if not _check_chess_data(initial_state, list_moves):
-            return INVALID_CHESS_DATA_RESP
+        # check if sent data is valid chess-wise, without holding the database connection
+        error = _validate_chess_data(initial_state, list_moves)
+        if error is not None:
+            return error
 
         # everything is ok - add the exercise to the database
-        new_id = g.con.create_exercise(headline, about, author, initial_state, list_moves)
+        try:
+            new_id = g.con.create_exercise(headline, about, author, initial_state, list_moves)
+        except database.ConflictError:
+            return EXISTING_TITLE_RESP
         if not new_id:
             return DB_PROBLEM_RESP
         url = api.url_for(Exercise, exerciseid=new_id)
         return Response(status=201, headers={'Location': url})
 
 
+class ExercisesExport(Resource):
+    """
+    Resource that represents the full exercise catalog as newline-delimited JSON.
+    """
+    def get(self):
+        """
+        Streams every exercise, one JSON object per line, in id order. The exercises are read from the database in
+        batches while the response is sent, so the memory use does not depend on the size of the catalog.
+        The format of the objects is defined in :py:meth:`database.Connection._create_exercise_object`.
+        HTTP status codes:
+            200 - the exercises are streamed
+            500 - database error
+        :return: flask.Response of the status code and the streamed body.
+        """
+        return Response(stream_with_context(export.ndjson_lines(g.con)), 200, mimetype=export.NDJSON)
+
+
 class Exercise(Resource):
     """
     Resource representation of the chess exercises.
@@ -700,8 +909,11 @@ class Exercise(Resource):
     def get(self, exerciseid):
         """
         Implementation of the response to a GET request to the Exercise resource.
+        The response carries the ETag and the Last-Modified header of the exercise, a conditional request for the
+        current version is answered without a body.
         HTTP status codes:
             200 - the exercise data is retrieved correctly
+            304 - the exercise has not been modified since the version of the client
             404 - the exercise with the given id does not exist
             500 - database error
         :param exerciseid: the identifier number of the exercise
@@ -711,6 +923,9 @@ class Exercise(Resource):
         exercise_db = g.con.get_exercise(exerciseid)
         if not exercise_db:
             return missing_exercise_response(exerciseid)
+        not_modified = _not_modified(exercise_db)
+        if not_modified is not None:
+            return not_modified
 
         # create envelope and add controls
         url = api.url_for(Exercise, exerciseid=exerciseid)
@@ -720,6 +935,7 @@ class Exercise(Resource):
         envelope.add_edit_exercise_control(exerciseid)
         envelope.add_control('chessapi:delete', url, 'DELETE')
         envelope.add_solver_control(exerciseid)
+        envelope.add_solver_session_control(exerciseid)
         envelope['initial-state'] = exercise_db['initial_state']
         envelope['list-moves'] = exercise_db['list_moves']
         envelope['author'] = exercise_db['author']
@@ -727,31 +943,42 @@ class Exercise(Resource):
         envelope['headline'] = exercise_db['title']
         envelope['about'] = exercise_db['description']
 
-        return Response(json.dumps(envelope), 200, mimetype=MASON + ';' + EXERCISE_PROFILE)
+        return _with_validators(Response(codec.dumps(envelope), 200, mimetype=MASON + ';' + EXERCISE_PROFILE),
+                                exercise_db)
 
     def put(self, exerciseid):
         """
         Implementation of modifying an exercise via a PUT request.
+        With an If-Match header, the exercise is modified only if it still has the version of the given ETag.
         HTTP status codes:
             204 - the exercise has been correctly modified
             400 - some required fields are missing from the request body
             400 - invalid chess data
             401 - the provided email address of the user does not match the one in the database
             404 - the exercise with the given id does not exist
+            400 - the list of moves is too long or too costly to validate
             409 - the new exercise title is already taken
+            412 - the exercise has been modified since the version of the If-Match header
             415 - the Content-Type of the request is not JSON
             500 - database error
+            503 - too many submissions are being validated, or no database connection is available
         :param exerciseid: the identifier number of the exercise
         :return: flask.Response of the status code and response body.
         """
         # check if the exercise exists
-        if not g.con.get_exercise(exerciseid):
+        exercise_db = g.con.get_exercise(exerciseid)
+        if not exercise_db:
             return missing_exercise_response(exerciseid)
 
+        # check if the client modifies the current version
+        version, precondition = _expected_version(exercise_db)
+        if not precondition:
+            return PRECONDITION_FAILED_RESP
+
         # check if the request data is valid JSON
         if JSON != request.headers.get(CONTENT_TYPE):
             return NOT_JSON_RESP
-        request_body = request.get_json(force=True)
+        request_body = _request_json()
 
         # extract fields
         try:
@@ -765,22 +992,27 @@ class Exercise(Resource):
                                          'author-mail, initial-state and list-moves.')
         # about is not required
         about = request_body.get('about')
-        author = g.con.get_exercise(exerciseid)['author']
+        author = exercise_db['author']
 
         # check if exercise title exists already
-        if not _check_free_exercise_title(headline):
+        if not _check_free_exercise_title(headline, exerciseid):
             return EXISTING_TITLE_RESP
 
         # validate author
         if not _check_author_email(author, author_email):
             return WRONG_AUTH_RESP
 
-        # check if sent data is valid chess-wise
-        if not _check_chess_data(initial_state, list_moves):
-            return INVALID_CHESS_DATA_RESP
+        # check if sent data is valid chess-wise, without holding the database connection
+        error = _validate_chess_data(initial_state, list_moves)
+        if error is not None:
+            return error
 
-        if exerciseid != g.con.modify_exercise(exerciseid, headline, about, initial_state, list_moves):
-            return DB_PROBLEM_RESP
+        # the version is checked again by the update, the exercise may have been modified during the validation
+        try:
+            if exerciseid != g.con.modify_exercise(exerciseid, headline, about, initial_state, list_moves, version):
+                return DB_PROBLEM_RESP if version is None else PRECONDITION_FAILED_RESP
+        except database.ConflictError:
+            return EXISTING_TITLE_RESP
         return Response(status=204)
 
     def delete(self, exerciseid):
@@ -820,9 +1052,12 @@ class Solver(Resource):
         Performs the response to the GET request to the Solver resource.
         A query string containing a comma-separated list of SAN moves has to be provided.
         The returned data's `value` field reports if the query is the solution, part of the solution or invalid.
+        The response depends only on the query and the version of the exercise, its ETag is derived from both and
+        it carries the Last-Modified header of the exercise.
         HTTP status codes:
             200 - the solver data returned correctly
-            400 - the provided solution query is not a valid SAN movelist for the current exercise
+            304 - the exercise has not been modified since the version of the client
+            400 - the provided solution query is not a valid SAN movelist for the current exercise, or it is too long
             404 - the exercise with the given id does not exist
             500 - database error
         :param exerciseid: the identifier number of the exercise
@@ -835,20 +1070,289 @@ class Solver(Resource):
 
         # fetch the query list-moves
         proposed_solution = request.args.get('solution')
-
-        # check if the query is valid for the board
-        if not _check_chess_data(exercise_db['initial_state'], proposed_solution, False):
+        if not proposed_solution:
             return BAD_SOLUTION_QUERY
-
-        # compare query with real solution
-        result = _compare_exercise_solution(exercise_db['list_moves'], proposed_solution)
+        if not app.config['Validator'].proposal_within_limits(proposed_solution):
+            return PROPOSAL_TOO_LONG_RESP
+        # the entity tag of a query has been sent with a graded answer only, the query is valid then
+        etag = _solver_entity_tag(exercise_db, proposed_solution)
+        if request.if_none_match:
+            not_modified = _not_modified(exercise_db, etag)
+            if not_modified is not None:
+                return not_modified
+
+        # look up the compiled solution, compile it if the exercise was stored without one
+        solution = g.con.get_solution(exerciseid) or g.con.compile_solution(exerciseid)
+
+        # compare query with the solution, queries leaving it are checked on the board
+        result, = solver.grade(exerciseid, exercise_db['initial_state'], exercise_db['list_moves'],
+                               solution.edges if solution is not None else None, [proposed_solution],
+                               app.config['BoardCache'])
+        if result is None:
+            return BAD_SOLUTION_QUERY
+        not_modified = _not_modified(exercise_db, etag)
+        if not_modified is not None:
+            return not_modified
 
         # create and return the envelope object
         envelope = ChessApiObject(api.url_for(Solver, exerciseid=exerciseid), EXERCISE_PROFILE)
         envelope.add_control('up', api.url_for(Exercise, exerciseid=exerciseid))
         envelope['value'] = result[0]
         envelope['opponent-move'] = result[1] if len(result) > 1 else None
-        return Response(json.dumps(envelope), 200, mimetype=MASON+';'+EXERCISE_PROFILE)
+        return _with_validators(Response(codec.dumps(envelope), 200, mimetype=MASON+';'+EXERCISE_PROFILE), exercise_db,
+                                etag)
+
+
+def _batch_exercise_id(value):
+    """
+    Reads the exercise id of an item of a solver batch.
+    :param value: The `exercise-id` field of the item.
+    :return: the id if it is an integer or a string of digits, otherwise None.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdecimal():
+        return int(value)
+    return None
+
+
+def _create_batch_item(item, result=None, error=None):
+    """
+    Creates the result of an item of a solver batch.
+    :param item: The item of the request.
+    :param result: The result of the grading as returned by chess_data.compare_solution, or None.
+    :param error: The message explaining why the item could not be graded, or None.
+    :return: dictionary of the exercise id, the proposed solution, and the value and opponent move or the error.
+    """
+    graded = {
+        'exercise-id': item.get('exercise-id') if isinstance(item, dict) else None,
+        'solution': item.get('solution') if isinstance(item, dict) else None
+    }
+    if error is not None:
+        graded['@error'] = {'@message': error}
+    else:
+        graded['value'] = result[0]
+        graded['opponent-move'] = result[1] if len(result) > 1 else None
+    return graded
+
+
+class SolverBatch(Resource):
+    """
+    Resource grading many proposed solutions at once.
+    """
+    def post(self):
+        """
+        Grades a batch of proposed solutions. The request body contains the `items` list, each item has the
+        `exercise-id` and the comma-separated SAN `solution` fields. The items are grouped by exercise, every exercise
+        is fetched once, and the grading is spread over a pool of worker processes.
+        The returned `items` list has the result of each item in the order of the request: its `value` field reports
+        if the solution is the solution, part of the solution or wrong, as the Solver resource does. The items which
+        cannot be graded have an `@error` field instead.
+        HTTP status codes:
+            200 - the batch has been graded
+            400 - the items are missing, are not a list or there are too many of them, or a proposed solution is
+                  too long
+            415 - the Content-Type of the request is not JSON
+            503 - a worker process of the grading died
+        :return: flask.Response of the status code and response body.
+        """
+        if JSON != request.headers.get(CONTENT_TYPE):
+            return NOT_JSON_RESP
+        request_body = _request_json()
+        try:
+            items = request_body['items']
+        except (KeyError, TypeError):
+            return create_error_response(400, 'Missing fields', 'Be sure to include the list of items.')
+        if not isinstance(items, list) or len(items) > MAX_BATCH_SIZE:
+            return BAD_BATCH_RESP
+        validator = app.config['Validator']
+        if not all(validator.proposal_within_limits(item.get('solution')) for item in items if isinstance(item, dict)):
+            return PROPOSAL_TOO_LONG_RESP
+
+        # group the items by exercise
+        groups = {}
+        for index, item in enumerate(items):
+            exercise_id = _batch_exercise_id(item.get('exercise-id')) if isinstance(item, dict) else None
+            if exercise_id is not None:
+                groups.setdefault(exercise_id, []).append(index)
+
+        # fetch every exercise once, compile the solutions stored without one
+        exercises = g.con.get_solver_data(groups)
+        tasks = []
+        for exercise_id, indices in groups.items():
+            if exercise_id not in exercises:
+                continue
+            initial_state, list_moves, edges = exercises[exercise_id]
+            if edges is None:
+                solution = g.con.compile_solution(exercise_id)
+                edges = solution.edges if solution is not None else None
+            proposals = [items[index].get('solution') for index in indices]
+            tasks.append((exercise_id, initial_state, list_moves, edges, proposals))
+
+        # grade the proposals in the worker pool, the database connection is returned to its pool meanwhile
+        g.con.release()
+        try:
+            batch_results = app.config['Grader'].grade_batch(tasks)
+        except BrokenProcessPool:
+            return GRADING_BUSY_RESP
+        graded = [None] * len(items)
+        for task, results in zip(tasks, batch_results):
+            for index, result in zip(groups[task[0]], results):
+                if result is None:
+                    graded[index] = _create_batch_item(items[index], error='Bad query')
+                else:
+                    graded[index] = _create_batch_item(items[index], result)
+        for index, item in enumerate(items):
+            if graded[index] is None:
+                if not isinstance(item, dict) or 'exercise-id' not in item:
+                    error = 'Missing fields'
+                elif _batch_exercise_id(item['exercise-id']) is None:
+                    error = 'Bad query'
+                else:
+                    error = 'Exercise does not exist'
+                graded[index] = _create_batch_item(item, error=error)
+
+        envelope = ChessApiObject(api.url_for(SolverBatch), EXERCISE_PROFILE)
+        envelope.add_control('up', api.url_for(Exercises))
+        envelope['items'] = graded
+        return Response(codec.dumps(envelope), 200, mimetype=MASON+';'+EXERCISE_PROFILE)
+
+
+def _create_solver_session_object(exerciseid, sessionid, session):
+    """
+    Creates the hypermedia representation of a solver session.
+    :param exerciseid: The identifier number of the exercise.
+    :param sessionid: The identifier of the session.
+    :param session: The solver.SolverSession object.
+    :return: The session as hypermedia object (MASON).
+    """
+    url = api.url_for(SolverSession, exerciseid=exerciseid, sessionid=sessionid)
+    envelope = ChessApiObject(url, EXERCISE_PROFILE)
+    envelope.add_control('up', api.url_for(Exercise, exerciseid=exerciseid))
+    envelope.add_control('chessapi:delete', url, 'DELETE')
+    if not session.finished:
+        envelope.add_solver_move_control(exerciseid, sessionid)
+    envelope['board-state'] = session.board.fen()
+    envelope['list-moves'] = ','.join(session.moves())
+    envelope['solved'] = session.finished
+    return envelope
+
+
+class SolverSessions(Resource):
+    """
+    Resource representation of the solver sessions of an exercise.
+    """
+    def post(self, exerciseid):
+        """
+        Starts a solver session. The session keeps the moves of the attempt on the server, so the moves can be sent
+        one by one to the created session resource.
+        HTTP status codes:
+            201 - the session has been started
+            404 - the exercise with the given id does not exist
+            500 - the stored exercise is not valid chess-wise
+        :param exerciseid: the identifier number of the exercise
+        :return: flask.Response of the status code, with the url of the session in the Location header.
+        """
+        exercise_db = g.con.get_exercise(exerciseid)
+        if not exercise_db:
+            return missing_exercise_response(exerciseid)
+        try:
+            sessionid, session = app.config['SolverSessions'].create(g.con, exercise_db)
+        except (ValueError, AttributeError):
+            return create_error_response(500, 'Invalid chess data', 'The stored exercise is not valid chess-wise.')
+        url = api.url_for(SolverSession, exerciseid=exerciseid, sessionid=sessionid)
+        envelope = _create_solver_session_object(exerciseid, sessionid, session)
+        return Response(codec.dumps(envelope), 201, headers={'Location': url}, mimetype=MASON+';'+EXERCISE_PROFILE)
+
+
+class SolverSession(Resource):
+    """
+    Resource representation of a live solver session.
+    """
+    def _get_session(self, exerciseid, sessionid):
+        """
+        Looks up a live session of the exercise.
+        :param exerciseid: the identifier number of the exercise
+        :param sessionid: the identifier of the session
+        :return: the solver.SolverSession object, or None if there is no such session.
+        """
+        session = app.config['SolverSessions'].get(g.con, sessionid)
+        if session is None or str(session.exercise_id) != str(exerciseid):
+            return None
+        return session
+
+    def get(self, exerciseid, sessionid):
+        """
+        Returns the current board and the moves played in the session.
+        HTTP status codes:
+            200 - the session data returned correctly
+            404 - the session does not exist or has expired
+        :param exerciseid: the identifier number of the exercise
+        :param sessionid: the identifier of the session
+        :return: flask.Response of the status code and response body.
+        """
+        session = self._get_session(exerciseid, sessionid)
+        if session is None:
+            return missing_solver_session_response(sessionid)
+        envelope = _create_solver_session_object(exerciseid, sessionid, session)
+        return Response(codec.dumps(envelope), 200, mimetype=MASON+';'+EXERCISE_PROFILE)
+
+    def post(self, exerciseid, sessionid):
+        """
+        Plays the next move of the solver. Only the move itself is validated, on the board kept by the session.
+        The returned data's `value` field reports if the move completed the solution, continued it or was wrong.
+        A wrong move is not played, so another move can be tried.
+        HTTP status codes:
+            200 - the move has been evaluated
+            400 - the move is missing or is not legal on the board of the session
+            404 - the session does not exist or has expired
+            409 - another move has been played in the session at the same time
+            415 - the Content-Type of the request is not JSON
+        :param exerciseid: the identifier number of the exercise
+        :param sessionid: the identifier of the session
+        :return: flask.Response of the status code and response body.
+        """
+        if JSON != request.headers.get(CONTENT_TYPE):
+            return NOT_JSON_RESP
+        request_body = _request_json()
+        session = self._get_session(exerciseid, sessionid)
+        if session is None:
+            return missing_solver_session_response(sessionid)
+        try:
+            move = request_body['move']
+        except (KeyError, TypeError):
+            return create_error_response(400, 'Missing fields', 'Be sure to include the move.')
+
+        with session.lock:
+            ply = session.ply
+            try:
+                value, opponent_move = session.play(move)
+            except (ValueError, TypeError):
+                return BAD_SOLVER_MOVE
+            if not app.config['SolverSessions'].save(g.con, sessionid, session, ply):
+                return CONCURRENT_SOLVER_MOVE
+
+        envelope = _create_solver_session_object(exerciseid, sessionid, session)
+        envelope['value'] = value
+        envelope['opponent-move'] = opponent_move
+        return Response(codec.dumps(envelope), 200, mimetype=MASON+';'+EXERCISE_PROFILE)
+
+    def delete(self, exerciseid, sessionid):
+        """
+        Ends the session.
+        HTTP status codes:
+            204 - the session has been ended
+            404 - the session does not exist or has expired
+        :param exerciseid: the identifier number of the exercise
+        :param sessionid: the identifier of the session
+        :return: flask.Response of the status code.
+        """
+        if self._get_session(exerciseid, sessionid) is None:
+            return missing_solver_session_response(sessionid)
+        app.config['SolverSessions'].delete(g.con, sessionid)
+        return Response(status=204)
 
 
 @app.route('/api/profiles/<profile_name>/')
@@ -865,8 +1369,12 @@ api.add_resource(Users, "/api/users/", endpoint="users")
 api.add_resource(User, "/api/users/<nickname>/", endpoint="user")
 api.add_resource(Submissions, "/api/users/<nickname>/submissions/", endpoint="submissions")
 api.add_resource(Exercises, "/api/exercises/", endpoint="exercises")
+api.add_resource(ExercisesExport, "/api/exercises/export", endpoint="exercises-export")
+api.add_resource(SolverBatch, "/api/exercises/solver/batch", endpoint="solver-batch")
 api.add_resource(Exercise, "/api/exercises/<exerciseid>/", endpoint="exercise")
 api.add_resource(Solver, "/api/exercises/<exerciseid>/solver/", endpoint="solver")
+api.add_resource(SolverSessions, "/api/exercises/<exerciseid>/solver/sessions/", endpoint="solver-sessions")
+api.add_resource(SolverSession, "/api/exercises/<exerciseid>/solver/sessions/<sessionid>/", endpoint="solver-session")
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,365 @@
+"""
+Created on 18.10.2026
+Serializes the MASON representations of the API. The static control blocks
+are built once and shared, and the URLs are expanded from templates prebuilt
+with url_for, so a list of items is emitted without calling url_for or
+building nested objects per item.
+@author: lorinc
+
+"""
+
+from urllib.parse import quote, quote_plus
+from flask import request, url_for
+from chessApi.cache import LRUCache
+
+LINK_RELATIONS = '/api/link-relations/'
+EXERCISE_PROFILE = '/profiles/exercise-profile/'
+USER_PROFILE = '/profiles/user-profile/'
+
+# The static parts of the controls. They are shared by every representation,
+# and must not be modified.
+NAMESPACES = {
+    'chessapi': {
+        'name': LINK_RELATIONS
+    }
+}
+PROFILE_CONTROLS = {
+    EXERCISE_PROFILE: {'href': EXERCISE_PROFILE},
+    USER_PROFILE: {'href': USER_PROFILE}
+}
+_EXERCISE_PROPERTIES = {
+    'headline': {
+        'title': 'Headline',
+        'description': 'Exercise title',
+        'type': 'string'
+    },
+    'about': {
+        'title': 'About',
+        'description': 'Exercise description',
+        'type': 'string'
+    },
+    'initial-state': {
+        'title': 'Initial state',
+        'description': 'FEN code of the initial board state',
+        'type': 'string'
+    },
+    'list-moves': {
+        'title': 'List of moves',
+        'description': 'comma-separated SAN entries movelist of the exercise solution, '
+                       'alternative lines separated by semicolons',
+        'type': 'string'
+    }
+}
+_AUTHOR_PROPERTY = {
+    'title': 'Author',
+    'description': 'Submitter of the exercise',
+    'type': 'string'
+}
+_AUTHOR_EMAIL_PROPERTY = {
+    'title': 'Author Email',
+    'description': 'The author\'s email address. Used for authentication.',
+    'type': 'string'
+}
+ADD_EXERCISE_SCHEMA = {
+    'type': 'object',
+    'properties': dict(_EXERCISE_PROPERTIES, **{'author': _AUTHOR_PROPERTY, 'author-email': _AUTHOR_EMAIL_PROPERTY}),
+    'required': ['headline', 'intial-state', 'list-moves', 'author', 'author-email']
+}
+EDIT_EXERCISE_SCHEMA = {
+    'type': 'object',
+    'properties': dict(_EXERCISE_PROPERTIES, **{'author-email': _AUTHOR_EMAIL_PROPERTY}),
+    'required': ['headline', 'intial-state', 'list-moves', 'author-email']
+}
+SOLVER_SCHEMA = {
+    'required': ['solution'],
+    'type': 'object',
+    'properties': {
+        'solution': {
+            'type': 'string',
+            'description': 'PGN code of the proposed solution of the exercise.'
+        }
+    }
+}
+SOLVER_MOVE_SCHEMA = {
+    'required': ['move'],
+    'type': 'object',
+    'properties': {
+        'move': {
+            'type': 'string',
+            'description': 'SAN code of the next move.'
+        }
+    }
+}
+ADD_USER_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'nickname': {
+            'title': 'Nickname',
+            'description': ' Unique id string of the user',
+            'type': 'string'
+        },
+        'email': {
+            'title': 'Email address',
+            'description': 'email address of the user.',
+            'type': 'string'
+        }
+    },
+    'required': ['nickname', 'email']
+}
+
+# url_for builds absolute URLs for the hosts other than the server name, so
+# the templates depend on the url root. The url root comes from the Host
+# header of the client, the number of url roots kept is bounded.
+MAX_URL_ROOTS = 16
+# url root -> _Templates
+_templates = LRUCache(MAX_URL_ROOTS)
+
+
+def _quote_path(value):
+    """
+    Quotes a path value like werkzeug's url_quote does.
+    """
+    return quote(value, safe='/:')
+
+
+def _quote_query(value):
+    """
+    Quotes a query value like werkzeug's url_quote_plus does.
+    """
+    return quote_plus(value, safe='')
+
+
+class UrlTemplate(object):
+    """
+    The URL of an endpoint built once with placeholder values. Expanding it
+    quotes the values the way url_for does: as path segments or as query
+    arguments, depending on where the placeholder is.
+
+    :param str endpoint: The endpoint of the URL.
+    :param names: The names of the URL values, in the order url_for receives
+        them.
+
+    """
+
+    def __init__(self, endpoint, *names):
+        super(UrlTemplate, self).__init__()
+        url = url_for(endpoint, **{name: '__%s__' % name for name in names})
+        query = url.find('?')
+        positions = sorted((url.index('__%s__' % name), name) for name in names)
+        # literal parts and (name, quote function) pairs, alternating
+        self._parts = []
+        start = 0
+        for position, name in positions:
+            self._parts.append(url[start:position])
+            self._parts.append((name, _quote_query if 0 <= query < position else _quote_path))
+            start = position + len(name) + 4
+        self._parts.append(url[start:])
+
+    def expand(self, **values):
+        """
+        :param values: The URL values, None is not allowed.
+        :return: The URL.
+
+        """
+        return ''.join(part if isinstance(part, str) else part[1](str(values[part[0]]))
+                       for part in self._parts)
+
+
+class _Templates(object):
+    """
+    The URL templates and the static controls of the API served at one url
+    root, built on first use.
+
+    """
+
+    def __init__(self):
+        super(_Templates, self).__init__()
+        self.urls = {}
+        self.controls = {}
+
+    def url(self, endpoint, values):
+        key = (endpoint,) + tuple(values)
+        template = self.urls.get(key)
+        if template is None:
+            template = self.urls[key] = UrlTemplate(endpoint, *values)
+        return template.expand(**values)
+
+
+def _current():
+    """
+    :return: the templates of the url root (scheme, host and script root) of
+        the current request.
+
+    """
+    root = request.url_root
+    templates = _templates.get(root)
+    if templates is None:
+        templates = _Templates()
+        _templates.put(root, templates)
+    return templates
+
+
+def url(endpoint, **values):
+    """
+    Equivalent of url_for for values which are not None, expanding a template
+    built on the first call with the same endpoint and value names.
+
+    :param str endpoint: The endpoint of the URL.
+    :param values: The URL values.
+    :return: The URL.
+
+    """
+    return _current().url(endpoint, values)
+
+
+def _static_control(name, build):
+    """
+    :param str name: The name of the control.
+    :param build: Callable building the control, called once per url root.
+    :return: the shared control of the current url root.
+
+    """
+    controls = _current().controls
+    control = controls.get(name)
+    if control is None:
+        control = controls[name] = build()
+    return control
+
+
+def envelope(self_href, profile, add_namespace=True):
+    """
+    :param str self_href: The url of the resource.
+    :param str profile: The profile of the resource.
+    :param bool add_namespace: Whether to add the chessapi namespace.
+    :return: a new MASON object with the self and profile controls.
+
+    """
+    obj = {}
+    if add_namespace:
+        obj['@namespaces'] = NAMESPACES
+    obj['@controls'] = {'self': {'href': self_href}, 'profile': PROFILE_CONTROLS.get(profile) or {'href': profile}}
+    return obj
+
+
+def add_exercise_control():
+    """
+    :return: the chessapi:add-exercise control.
+
+    """
+    return _static_control('chessapi:add-exercise', lambda: {
+        'title': 'Submit a new exercise',
+        'href': url('exercises'),
+        'encoding': 'json',
+        'method': 'POST',
+        'schema': ADD_EXERCISE_SCHEMA
+    })
+
+
+def edit_exercise_control(exerciseid):
+    """
+    :return: the edit control of an exercise.
+
+    """
+    return {
+        'title': 'Edit this exercise',
+        'href': url('exercise', exerciseid=exerciseid),
+        'encoding': 'json',
+        'method': 'PUT',
+        'schema': EDIT_EXERCISE_SCHEMA
+    }
+
+
+def solver_control(exerciseid):
+    """
+    :return: the chessapi:exercise-solver control of an exercise.
+
+    """
+    return {
+        'title': 'Exercise Solver',
+        'href': url('solver', exerciseid=exerciseid)[0:-1] + '{?solution}',
+        'method': 'GET',
+        'isHrefTemplate': True,
+        'schema': SOLVER_SCHEMA
+    }
+
+
+def solver_session_control(exerciseid):
+    """
+    :return: the chessapi:solver-session control of an exercise.
+
+    """
+    return {
+        'title': 'Start solving the exercise',
+        'href': url('solver-sessions', exerciseid=exerciseid),
+        'method': 'POST'
+    }
+
+
+def solver_move_control(exerciseid, sessionid):
+    """
+    :return: the chessapi:solver-move control of a solver session.
+
+    """
+    return {
+        'title': 'Play the next move',
+        'href': url('solver-session', exerciseid=exerciseid, sessionid=sessionid),
+        'encoding': 'json',
+        'method': 'POST',
+        'schema': SOLVER_MOVE_SCHEMA
+    }
+
+
+def users_all_control():
+    """
+    :return: the chessapi:users-all control.
+
+    """
+    return _static_control('chessapi:users-all', lambda: {'href': url('users'), 'method': 'GET'})
+
+
+def add_user_control():
+    """
+    :return: the chessapi:add-user control.
+
+    """
+    return _static_control('chessapi:add-user', lambda: {
+        'title': 'Add a new user',
+        'href': url('users'),
+        'encoding': 'json',
+        'method': 'POST',
+        'schema': ADD_USER_SCHEMA
+    })
+
+
+def exercise_items(exercises):
+    """
+    :param exercises: The exercises as returned by
+        :py:meth:`chessApi.database.Connection.get_exercises_page`.
+    :return: the list of the exercises as MASON items.
+
+    """
+    templates = _current()
+    profile = PROFILE_CONTROLS[EXERCISE_PROFILE]
+    return [{
+        '@controls': {'self': {'href': templates.url('exercise', {'exerciseid': exercise['exercise_id']})},
+                      'profile': profile},
+        'headline': exercise['title'],
+        'author': exercise['author']
+    } for exercise in exercises]
+
+
+def user_items(users):
+    """
+    :param users: The users as returned by
+        :py:meth:`chessApi.database.Connection.get_users_page`.
+    :return: the list of the users as MASON items.
+
+    """
+    templates = _current()
+    profile = PROFILE_CONTROLS[USER_PROFILE]
+    return [{
+        'nickname': user['nickname'],
+        'registrationdate': user['registrationdate'],
+        '@controls': {'self': {'href': templates.url('user', {'nickname': user['nickname']})},
+                      'profile': profile}
+    } for user in users]
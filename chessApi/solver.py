@@ -0,0 +1,537 @@
+"""
+Created on 18.10.2026
+Provides the stateful solver sessions: the moves of a solve attempt are kept
+server-side, so every move is validated against the current position only.
+@author: lorinc
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import secrets
+import sys
+import threading
+import chess
+from chessApi.cache import LRUCache
+from chessApi.chess_data import SOLUTION, PARTIAL, WRONG, CompiledSolution, compare_solution, normalize_san, \
+    parse_move
+
+DEFAULT_SESSION_LIMIT = 1024
+DEFAULT_SESSION_TTL = 900.0
+DEFAULT_SESSION_SOLUTIONS = 256
+DEFAULT_BOARD_CACHE_SIZE = 16384
+DEFAULT_BOARD_CACHE_BYTES = 8 * 1024 * 1024
+DEFAULT_BOARD_CACHE_PLIES = 32
+DEFAULT_GRADING_WORKERS = 2
+DEFAULT_GRADING_CHUNK = 256
+
+
+class SolverSession(object):
+    """
+    The attempt of solving one exercise. Each move is parsed on the live board
+    and followed in the compiled move tree of the solution, so its cost does
+    not depend on the number of moves played before. When the solution has
+    alternative lines, the opponent replies with the move of the first line
+    still open.
+
+    :param exercise: The exercise as returned by
+        :py:meth:`chessApi.database.Connection.get_exercise`.
+    :param solution: The :py:class:`chessApi.chess_data.CompiledSolution` of
+        the exercise, as stored by the database, or None if the exercise data
+        is not valid chess-wise.
+    :param moves: The SAN moves played so far in the session, the replies of
+        the opponent included.
+    :param position: tuple of the FEN and the hash of the current position in
+        the move tree, to resume the session from instead of replaying the
+        moves, or None.
+    :raises ValueError: if the exercise data is not valid chess-wise, or the
+        moves do not follow the solution.
+
+    """
+
+    def __init__(self, exercise, solution, moves=(), position=None):
+        super(SolverSession, self).__init__()
+        if solution is None:
+            raise ValueError('The exercise data is not valid chess-wise')
+        self.exercise_id = exercise['exercise_id']
+        self.version = exercise.get('version')
+        self.solution = solution
+        self.lock = threading.Lock()
+        if position is not None:
+            self.board = chess.Board(position[0])
+            self.node = position[1]
+            self._played = list(moves)
+            self.ply = len(self._played)
+            self.finished = self.solution.is_final(self.node)
+            return
+        self.board = chess.Board(exercise['initial_state'])
+        self.node = self.solution.root
+        self._played = []
+        self.ply = 0
+        for san in moves:
+            edge = self.solution.follow(self.node, self.board.parse_san(san).uci())
+            if edge is None:
+                raise ValueError('The moves do not follow the solution')
+            self._push(*edge)
+        self.finished = self.solution.is_final(self.node)
+
+    def _push(self, san, uci, node):
+        self.board.push_uci(uci)
+        self._played.append(san)
+        self.node = node
+        self.ply += 1
+
+    def play(self, san):
+        """
+        Plays a move of the solver. A correct move is pushed on the board
+        together with the reply of the opponent, a wrong move is not.
+
+        :param str san: The move in SAN notation.
+        :return: tuple of the result (:py:data:`SOLUTION`, :py:data:`PARTIAL`
+            or :py:data:`WRONG`) and the SAN of the opponent's reply (None
+            unless the result is :py:data:`PARTIAL`).
+        :raises ValueError: if the move is not legal on the current board or
+            the exercise has been solved already.
+
+        """
+        if self.finished:
+            raise ValueError('The exercise has been solved already')
+        move = self.board.parse_san(san)
+        edge = self.solution.follow(self.node, move.uci())
+        if edge is None:
+            return WRONG, None
+        self._push(*edge)
+        if self.solution.is_final(self.node):
+            self.finished = True
+            return SOLUTION, None
+        reply = self.solution.reply(self.node)
+        self._push(*reply)
+        if self.solution.is_final(self.node):
+            # the solution ended with the move of the opponent
+            self.finished = True
+        return PARTIAL, reply[0]
+
+    def moves(self):
+        """
+        :return: the moves played so far, as a list of SAN strings.
+
+        """
+        return list(self._played)
+
+    def position(self):
+        """
+        :return: tuple of the FEN and the hash of the current position in the
+            move tree, to resume the session from.
+
+        """
+        return self.board.fen(), self.node
+
+
+class SessionStore(object):
+    """
+    Keeps the solver sessions in the database, so every worker process of
+    the server can continue any session. A stored session holds the moves
+    played so far and the current position; the live
+    :py:class:`SolverSession` objects are kept in a per-process cache as well,
+    and resumed from the stored position when another process has played in
+    the session since, without replaying the moves. The move trees of the
+    solutions are cached per exercise version. The number of sessions is
+    bounded, the least recently used one is dropped when the store is full,
+    and a session expires ``ttl`` seconds after its last move.
+
+    :param int limit: The maximum number of stored sessions.
+    :param float ttl: The idle lifetime of a session in seconds.
+
+    """
+
+    def __init__(self, limit=DEFAULT_SESSION_LIMIT, ttl=DEFAULT_SESSION_TTL):
+        super(SessionStore, self).__init__()
+        self.limit = limit
+        self.ttl = ttl
+        self._sessions = LRUCache(limit, ttl)
+        self._solutions = LRUCache(DEFAULT_SESSION_SOLUTIONS)
+
+    def _solution(self, con, exercise):
+        """
+        :return: the compiled solution of an exercise stored by the database,
+            compiled and stored first if the exercise has none, or None if the
+            exercise data is not valid chess-wise.
+
+        """
+        key = (exercise['exercise_id'], exercise.get('version'))
+        solution = self._solutions.get(key)
+        if solution is None:
+            solution = con.get_solution(exercise['exercise_id']) or con.compile_solution(exercise['exercise_id'])
+            if solution is not None:
+                self._solutions.put(key, solution)
+        return solution
+
+    def create(self, con, exercise):
+        """
+        Starts a session for an exercise.
+
+        :param con: The :py:class:`chessApi.database.Connection` storing the
+            session.
+        :param exercise: The exercise as returned by
+            :py:meth:`chessApi.database.Connection.get_exercise`.
+        :return: tuple of the id of the session and the
+            :py:class:`SolverSession`.
+        :raises ValueError: if the exercise data is not valid chess-wise.
+
+        """
+        session = SolverSession(exercise, self._solution(con, exercise))
+        session_id = secrets.token_urlsafe(16)
+        con.create_solver_session(session_id, session.exercise_id, session.version, session.position(), self.limit,
+                                  self.ttl)
+        self._sessions.put(session_id, session)
+        return session_id, session
+
+    def get(self, con, session_id):
+        """
+        :param con: The :py:class:`chessApi.database.Connection` storing the
+            session.
+        :param str session_id: The id of the session.
+        :return: the :py:class:`SolverSession`, or None if it does not exist,
+            has expired, or its exercise has been modified since it started.
+
+        """
+        stored = con.get_solver_session(session_id, self.ttl)
+        if stored is None:
+            self._sessions.invalidate(session_id)
+            return None
+        session = self._sessions.get(session_id)
+        if session is not None and session.ply == stored['ply']:
+            return session
+        exercise = con.get_exercise(stored['exercise_id'])
+        if exercise is None or exercise.get('version') != stored['version']:
+            return None
+        try:
+            session = SolverSession(exercise, self._solution(con, exercise),
+                                    stored['list_moves'].split(',') if stored['list_moves'] else (),
+                                    (stored['fen'], stored['node']))
+        except ValueError:
+            return None
+        self._sessions.put(session_id, session)
+        return session
+
+    def save(self, con, session_id, session, ply):
+        """
+        Stores the moves of a session after a move, and restarts its expiry.
+
+        :param con: The :py:class:`chessApi.database.Connection` storing the
+            session.
+        :param str session_id: The id of the session.
+        :param SolverSession session: The session.
+        :param int ply: The ply of the session before the move.
+        :return: True if the moves have been stored, False if another move
+            has been stored since the session was read; the session is
+            forgotten then.
+
+        """
+        if con.update_solver_session(session_id, ply, ','.join(session.moves()), session.ply, session.position()):
+            self._sessions.put(session_id, session)
+            return True
+        self._sessions.invalidate(session_id)
+        return False
+
+    def delete(self, con, session_id):
+        """
+        Ends a session.
+
+        :param con: The :py:class:`chessApi.database.Connection` storing the
+            session.
+        :param str session_id: The id of the session.
+
+        """
+        self._sessions.invalidate(session_id)
+        con.delete_solver_session(session_id)
+
+    def clear(self):
+        """
+        Forgets the live sessions and the solutions cached by this process.
+        The stored sessions are kept.
+
+        """
+        self._sessions.clear()
+        self._solutions.clear()
+
+    def stats(self):
+        """
+        :return: the statistics of the per-process
+            :py:class:`chessApi.cache.LRUCache` of the live sessions.
+
+        """
+        return self._sessions.stats()
+
+
+def _board_entry_size(key, fen):
+    """
+    Estimates the memory used by an entry of the :py:class:`BoardCache`.
+
+    :param tuple key: The key of the entry.
+    :param str fen: The cached position.
+    :return: The size in bytes.
+
+    """
+    return sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key) + sys.getsizeof(fen)
+
+
+class BoardCache(object):
+    """
+    Bounded cache of the positions reached by replaying move lists, keyed by
+    the exercise, its initial state and the normalized moves played. The
+    positions are stored as FEN strings. A replay resumes from the longest
+    cached prefix of its moves instead of starting from the initial state, so
+    the popular lines of popular exercises are not replayed again and again.
+
+    The moves played are keyed by a hash chained ply by ply, so the keys of
+    every prefix of a move list are derived in linear time. Only the positions
+    of the first ``max_plies`` plies are cached: a long query does not fill
+    the cache with positions nobody else reaches.
+
+    The initial state is part of the key, so modifying an exercise does not
+    need to invalidate its positions.
+
+    :param int maxsize: The maximum number of cached positions.
+    :param int maxbytes: The maximum memory used by the cached positions.
+    :param int max_plies: The number of plies of the deepest cached position.
+
+    """
+
+    def __init__(self, maxsize=DEFAULT_BOARD_CACHE_SIZE, maxbytes=DEFAULT_BOARD_CACHE_BYTES,
+                 max_plies=DEFAULT_BOARD_CACHE_PLIES):
+        super(BoardCache, self).__init__()
+        self._boards = LRUCache(maxsize, maxbytes=maxbytes, sizeof=_board_entry_size)
+        self.max_plies = max_plies
+        self._lock = threading.Lock()
+        self._stats = {
+            'replays': 0,
+            'resumed': 0,
+            'plies_replayed': 0,
+            'plies_skipped': 0
+        }
+
+    def replay(self, exercise_id, initial_state, moves):
+        """
+        Plays a list of moves from the initial state of an exercise, resuming
+        from the longest cached prefix. Every position reached is cached.
+
+        :param exercise_id: The id of the exercise.
+        :param str initial_state: FEN string of the initial board state.
+        :param moves: List of the moves, in SAN or UCI.
+        :return: chess.Board object of the position after the moves.
+        :raises ValueError: if the initial state or a move is not valid.
+
+        """
+        exercise_id = str(exercise_id)
+        # keys[n] identifies the first n + 1 moves
+        keys = []
+        prefix = 0
+        for move in moves[:self.max_plies]:
+            prefix = hash((prefix, normalize_san(move)))
+            keys.append(prefix)
+        board = None
+        start = len(keys)
+        while start > 0:
+            fen = self._boards.get((exercise_id, initial_state, keys[start - 1]))
+            if fen is not None:
+                board = chess.Board(fen)
+                break
+            start -= 1
+        if board is None:
+            board = chess.Board(initial_state)
+        with self._lock:
+            self._stats['replays'] += 1
+            self._stats['resumed'] += 1 if start else 0
+            self._stats['plies_skipped'] += start
+            self._stats['plies_replayed'] += len(moves) - start
+        for ply in range(start, len(moves)):
+            board.push(parse_move(board, moves[ply]))
+            if ply < len(keys):
+                self._boards.put((exercise_id, initial_state, keys[ply]), board.fen())
+        return board
+
+    def clear(self):
+        """
+        Drops every cached position.
+
+        """
+        self._boards.clear()
+
+    def stats(self):
+        """
+        :return: the statistics of the underlying
+            :py:class:`chessApi.cache.LRUCache`, including the memory used
+            (``bytes``), extended with the number of ``replays``, the number of
+            replays ``resumed`` from a cached position, the ``plies_replayed``
+            and ``plies_skipped`` thanks to the cache, and the
+            ``resume_ratio`` of the replays.
+
+        """
+        stats = self._boards.stats()
+        with self._lock:
+            stats.update(self._stats)
+        stats['resume_ratio'] = stats['resumed'] / stats['replays'] if stats['replays'] else 0.0
+        return stats
+
+
+def grade(exercise_id, initial_state, list_moves, edges, proposals, boards=None):
+    """
+    Grades proposed solutions of one exercise. The proposals are walked in the
+    move tree of the solution; only the ones leaving it are replayed on a
+    board, to tell wrong moves from illegal ones.
+
+    :param exercise_id: The id of the exercise.
+    :param str initial_state: The initial state of the exercise.
+    :param str list_moves: The solution of the exercise.
+    :param edges: The move tree of the solution as returned by
+        :py:func:`chessApi.chess_data.compile_solution`, or None.
+    :param proposals: List of the proposed solutions, as comma-separated
+        moves.
+    :param BoardCache boards: The cache of the replayed positions. If None, a
+        new one is used for this call, so the proposals sharing a prefix are
+        still replayed only once.
+    :return: list of the results of the proposals, each a tuple as returned
+        by :py:func:`chessApi.chess_data.compare_solution`, or None if the
+        proposal is not legal.
+
+    """
+    solution = CompiledSolution(edges) if edges else None
+    if boards is None:
+        boards = BoardCache()
+    results = []
+    for proposed in proposals:
+        if not proposed or not isinstance(proposed, str):
+            results.append(None)
+            continue
+        moves = proposed.split(',')
+        result = solution.compare(moves) if solution is not None else None
+        if result is None:
+            try:
+                boards.replay(exercise_id, initial_state, moves)
+            except ValueError:
+                results.append(None)
+                continue
+            result = compare_solution(list_moves, proposed)
+        results.append(result)
+    return results
+
+
+def _grade_chunk(chunk):
+    """
+    Grades a chunk of a batch in a worker process.
+
+    :param chunk: list of argument tuples of :py:func:`grade`.
+    :return: list of the results of :py:func:`grade`.
+
+    """
+    return [grade(*task) for task in chunk]
+
+
+def grade_batch(tasks, chunk_size=DEFAULT_GRADING_CHUNK, pool=None):
+    """
+    Grades the proposals of several exercises. The tasks are split into chunks
+    of about ``chunk_size`` proposals which are graded in a pool of worker
+    processes. A batch fitting in one chunk is graded in the calling process.
+
+    :param tasks: list of argument tuples of :py:func:`grade` (exercise id,
+        initial state, solution, move tree of the solution and proposals), one per
+        exercise.
+    :param int chunk_size: The number of proposals graded by a worker at once.
+    :param pool: The executor of the worker processes. If None, every chunk is
+        graded in the calling process.
+    :return: list of the results of :py:func:`grade`, in the order of the
+        tasks.
+
+    """
+    chunks = [[]]
+    positions = []
+    chunk_proposals = 0
+    for index, (exercise_id, initial_state, list_moves, edges, proposals) in enumerate(tasks):
+        for start in range(0, len(proposals), chunk_size):
+            if chunk_proposals >= chunk_size:
+                chunks.append([])
+                chunk_proposals = 0
+            part = proposals[start:start + chunk_size]
+            positions.append(index)
+            chunks[-1].append((exercise_id, initial_state, list_moves, edges, part))
+            chunk_proposals += len(part)
+    if len(chunks) == 1 or pool is None:
+        graded = [results for chunk in chunks for results in _grade_chunk(chunk)]
+    else:
+        graded = [results for chunk in pool.map(_grade_chunk, chunks) for results in chunk]
+    results = [[] for _ in tasks]
+    for index, part in zip(positions, graded):
+        results[index].extend(part)
+    return results
+
+
+class Grader(object):
+    """
+    Grades the batches of proposed solutions, see :py:func:`grade_batch`, in a
+    pool of worker processes of bounded size. The pool is created on first use,
+    and dropped when a worker died.
+
+    :param int workers: The number of worker processes. If 0, the batches are
+        graded in the calling process.
+    :param int chunk_size: The number of proposals graded by a worker at once.
+
+    """
+
+    def __init__(self, workers=DEFAULT_GRADING_WORKERS, chunk_size=DEFAULT_GRADING_CHUNK):
+        super(Grader, self).__init__()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        """
+        :return: the pool of worker processes, created on first use, or None
+            if the batches are graded in the calling process.
+
+        """
+        if self.workers == 0:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers)
+            return self._pool
+
+    def grade_batch(self, tasks):
+        """
+        :py:func:`grade_batch` in the pool of worker processes.
+
+        :raises BrokenProcessPool: if a worker died. A new pool is created on
+            the next batch.
+
+        """
+        pool = self._get_pool()
+        try:
+            return grade_batch(tasks, self.chunk_size, pool)
+        except BrokenProcessPool:
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False)
+            raise
+
+    def reset_after_fork(self):
+        """
+        Forgets the worker processes inherited from the parent process. To be
+        called in a child process right after fork; a new pool is created on
+        the next batch.
+
+        """
+        self._pool_lock = threading.Lock()
+        self._pool = None
+
+    def shutdown(self):
+        """
+        Stops the worker processes. A new pool is created on the next batch.
+
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
@@ -0,0 +1,219 @@
+"""
+Created on 18.10.2026
+Provides the validation of submitted chess data off the request thread, in a
+bounded pool of worker processes with limits on the size and the cost of a
+submission.
+@author: lorinc
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import threading
+from chessApi.chess_data import check_chess_data
+
+DEFAULT_VALIDATION_WORKERS = 2
+DEFAULT_VALIDATION_TIMEOUT = 2.0
+DEFAULT_VALIDATION_CPU_BUDGET = 1.0
+DEFAULT_MAX_MOVES = 300
+# a SAN move with annotations is shorter than this
+MAX_MOVE_LENGTH = 12
+MAX_FEN_LENGTH = 100
+
+
+class ValidationBusyError(Exception):
+    """
+    Raised when every worker is busy and the queue of pending validations is
+    full.
+
+    """
+    pass
+
+
+class ValidationTimeoutError(Exception):
+    """
+    Raised when the validation of a submission exceeded its time or CPU budget.
+
+    """
+    pass
+
+
+class Validator(object):
+    """
+    Validates the chess data of submissions in a pool of worker processes, so
+    a hostile submission cannot tie up the request threads.
+
+    * Submissions with more than ``max_moves`` moves, or longer than such
+      moves can be, are rejected without parsing them.
+    * At most ``max_pending`` validations are queued or running at once, more
+      are rejected immediately with :py:class:`ValidationBusyError`.
+    * A validation is abandoned after ``timeout`` seconds, and gives up by
+      itself after using ``cpu_budget`` seconds of CPU time, with
+      :py:class:`ValidationTimeoutError`.
+
+    :param int workers: The number of worker processes. If 0, the validation
+        runs in the calling thread, still within the CPU budget.
+    :param float timeout: The wall-clock limit of a validation in seconds.
+    :param float cpu_budget: The CPU time limit of a validation in seconds.
+    :param int max_moves: The maximum number of moves of a submission.
+    :param int max_pending: The maximum number of queued or running
+        validations. Twice the number of workers if None.
+
+    """
+
+    def __init__(self, workers=DEFAULT_VALIDATION_WORKERS, timeout=DEFAULT_VALIDATION_TIMEOUT,
+                 cpu_budget=DEFAULT_VALIDATION_CPU_BUDGET, max_moves=DEFAULT_MAX_MOVES, max_pending=None):
+        super(Validator, self).__init__()
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_budget = cpu_budget
+        self.max_moves = max_moves
+        if max_pending is None:
+            max_pending = max(2 * workers, 1)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stats = {
+            'validations': 0,
+            'rejected_size': 0,
+            'rejected_busy': 0,
+            'timeouts': 0
+        }
+
+    def _get_pool(self):
+        """
+        :return: the pool of worker processes, created on first use.
+
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers)
+            return self._pool
+
+    def _reset_pool(self, pool):
+        """
+        Drops a broken pool, a new one is created on the next validation.
+
+        :param pool: The broken pool.
+
+        """
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def reset_after_fork(self):
+        """
+        Forgets the worker processes inherited from the parent process. To be
+        called in a child process right after fork; a new pool is created on
+        the next validation.
+
+        """
+        self._pool_lock = threading.Lock()
+        self._pool = None
+
+    def within_limits(self, initial_state, list_moves):
+        """
+        Checks the size of a submission without parsing it.
+
+        :param initial_state: FEN string of the initial board state.
+        :param list_moves: Comma-separated list of SAN moves, alternative
+            lines separated by semicolons.
+        :return: True if the submission is small enough to be validated.
+
+        """
+        if not isinstance(initial_state, str) or not isinstance(list_moves, str):
+            return True
+        moves = list_moves.count(',') + list_moves.count(';')
+        return len(initial_state) <= MAX_FEN_LENGTH and moves < self.max_moves and \
+            len(list_moves) <= self.max_moves * MAX_MOVE_LENGTH
+
+    def proposal_within_limits(self, solution):
+        """
+        Checks the size of a proposed solution without parsing it, so the
+        solvers replay at most as many moves as a submission may have.
+
+        :param solution: Comma-separated list of SAN moves, a single line.
+        :return: True if the proposal is small enough to be graded.
+
+        """
+        if not isinstance(solution, str):
+            return True
+        return solution.count(',') < self.max_moves and len(solution) <= self.max_moves * MAX_MOVE_LENGTH
+
+    def check(self, initial_state, list_moves, checkmate_needed=True):
+        """
+        Validates the chess data of a submission.
+
+        :param initial_state: FEN string of the initial board state.
+        :param list_moves: Comma-separated list of SAN moves.
+        :param bool checkmate_needed: Whether the moves have to end with
+            checkmate.
+        :return: True if the data is valid chess-wise.
+        :raises ValidationTimeoutError: if the submission is too large, or
+            its validation ran out of time or CPU budget.
+        :raises ValidationBusyError: if too many validations are pending.
+
+        """
+        if not self.within_limits(initial_state, list_moves):
+            self._count('rejected_size')
+            raise ValidationTimeoutError('The submission has more than %d moves' % self.max_moves)
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected_busy')
+            raise ValidationBusyError('Too many pending validations')
+        self._count('validations')
+        if self.workers == 0:
+            try:
+                valid = check_chess_data(initial_state, list_moves, checkmate_needed, self.cpu_budget)
+            finally:
+                self._slots.release()
+        else:
+            pool = self._get_pool()
+            try:
+                future = pool.submit(check_chess_data, initial_state, list_moves, checkmate_needed, self.cpu_budget)
+            except BrokenProcessPool:
+                self._slots.release()
+                self._reset_pool(pool)
+                raise
+            # the slot is kept until the worker is done, even if the request gave up waiting
+            future.add_done_callback(self._release_slot)
+            try:
+                valid = future.result(self.timeout)
+            except FutureTimeoutError:
+                # the worker gives up by itself when its CPU budget runs out
+                valid = None
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+                raise
+        if valid is None:
+            self._count('timeouts')
+            raise ValidationTimeoutError('The validation of the submission took too long')
+        return valid
+
+    def _release_slot(self, future):
+        self._slots.release()
+
+    def _count(self, name):
+        with self._pool_lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        """
+        :return: a dictionary with the number of ``validations`` run, of
+            submissions rejected for their size (``rejected_size``) or because
+            the pool was busy (``rejected_busy``), and of ``timeouts``.
+
+        """
+        with self._pool_lock:
+            return dict(self._stats)
+
+    def shutdown(self):
+        """
+        Stops the worker processes. A new pool is created on the next
+        validation.
+
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
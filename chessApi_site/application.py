@@ -3,6 +3,9 @@ Created on 28.04.2018
 @author: lorinc
 """
 from flask import Flask
+from chessApi_site import assets
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 app.debug = True
+# serves the fingerprinted and precompressed assets, if they have been built
+assets.init_app(app)
@@ -0,0 +1,187 @@
+"""
+Created on 18.10.2026
+Builds the static assets of the client site for long-term caching, and
+serves the built assets.
+
+The build names every script and stylesheet after the hash of its content,
+rewrites the references of the HTML pages to these names, and stores a
+gzip-compressed copy next to every file. The fingerprinted files never change,
+so they are served with far-future immutable caching; the pages keep their
+names and are revalidated with their ETag on every visit.
+@author: lorinc
+
+Usage, in the project root folder:
+    python -m chessApi_site.assets [--output chessApi_site/build]
+
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+from flask import request, send_file, abort
+from werkzeug.security import safe_join
+
+STATIC_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+BUILD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build')
+MANIFEST = 'manifest.json'
+PAGE_EXTENSIONS = ('.html',)
+FINGERPRINT_LENGTH = 12
+GZIP_LEVEL = 9
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+REFERENCE = re.compile(r'(\b(?:src|href)=")([^"#?]+)(")')
+
+
+def _digest(data):
+    """
+    :param bytes data: The content of a file.
+    :return: The hex digest of the content.
+
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _fingerprinted(name, digest):
+    """
+    :param str name: The relative path of an asset, e.g. ``js/solver.js``.
+    :param str digest: The digest of its content.
+    :return: The path with the fingerprint before the extension, e.g.
+        ``js/solver.0123456789ab.js``.
+
+    """
+    root, extension = os.path.splitext(name)
+    return '%s.%s%s' % (root, digest[:FINGERPRINT_LENGTH], extension)
+
+
+def _write(output, name, data, files):
+    """
+    Writes a built file and its gzip-compressed copy, if the copy is smaller.
+
+    :param str output: The build folder.
+    :param str name: The relative path of the file, with '/' separators.
+    :param bytes data: The content of the file.
+    :param dict files: The files of the manifest, the digest of the file is
+        added to it.
+
+    """
+    path = os.path.join(output, *name.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    compressed = gzip.compress(data, GZIP_LEVEL, mtime=0)
+    if len(compressed) < len(data):
+        with open(path + '.gz', 'wb') as f:
+            f.write(compressed)
+    files[name] = _digest(data)
+
+
+def build(source=STATIC_FOLDER, output=BUILD_FOLDER):
+    """
+    Builds the assets of the site. The previous build is removed.
+
+    :param str source: The folder of the static files.
+    :param str output: The build folder.
+    :return: The manifest of the build: ``assets`` maps the path of every
+        script and stylesheet to its fingerprinted path, ``files`` maps the
+        path of every built file to the digest of its content.
+
+    """
+    sources = {}
+    for folder, _, filenames in os.walk(source):
+        for filename in filenames:
+            path = os.path.join(folder, filename)
+            with open(path, 'rb') as f:
+                sources[os.path.relpath(path, source).replace(os.sep, '/')] = f.read()
+    if os.path.isdir(output):
+        shutil.rmtree(output)
+
+    manifest = {'assets': {}, 'files': {}}
+    pages = sorted(name for name in sources if name.endswith(PAGE_EXTENSIONS))
+    for name in sorted(set(sources) - set(pages)):
+        fingerprinted = _fingerprinted(name, _digest(sources[name]))
+        manifest['assets'][name] = fingerprinted
+        _write(output, fingerprinted, sources[name], manifest['files'])
+        # the original name keeps working, without long-term caching
+        _write(output, name, sources[name], manifest['files'])
+
+    def rewrite(match):
+        return match.group(1) + manifest['assets'].get(match.group(2), match.group(2)) + match.group(3)
+
+    for name in pages:
+        page = REFERENCE.sub(rewrite, sources[name].decode('utf-8'))
+        _write(output, name, page.encode('utf-8'), manifest['files'])
+
+    with open(os.path.join(output, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(folder=BUILD_FOLDER):
+    """
+    :param str folder: The build folder.
+    :return: The manifest of the build, or None if the assets have not been
+        built.
+
+    """
+    try:
+        with open(os.path.join(folder, MANIFEST)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return None
+
+
+def init_app(app, folder=BUILD_FOLDER):
+    """
+    Serves the built assets through the static route of the site, if they have
+    been built. Otherwise the static files are served as they are.
+
+    :param app: The flask application of the site.
+    :param str folder: The build folder.
+    :return: True if the built assets are served.
+
+    """
+    manifest = load_manifest(folder)
+    if manifest is None:
+        return False
+    immutable = frozenset(manifest['assets'].values())
+
+    def serve(filename):
+        """
+        Serves a built file, its gzip-compressed copy if the client accepts
+        gzip. The response is 304 if the client has the file already.
+        """
+        digest = manifest['files'].get(filename)
+        if digest is None:
+            abort(404)
+        path = safe_join(folder, filename)
+        etag = digest
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        encoded = request.accept_encodings['gzip'] > 0 and os.path.isfile(path + '.gz')
+        if encoded:
+            path += '.gz'
+            etag += '-gzip'
+        response = send_file(path, mimetype=mimetype, add_etags=False, conditional=False)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = IMMUTABLE if filename in immutable else REVALIDATE
+        del response.headers['Expires']
+        response.vary.add('Accept-Encoding')
+        if encoded:
+            response.content_encoding = 'gzip'
+        return response.make_conditional(request)
+
+    app.view_functions['static'] = serve
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the static assets of the client site.')
+    parser.add_argument('--source', default=STATIC_FOLDER, help='folder of the static files')
+    parser.add_argument('--output', default=BUILD_FOLDER, help='build folder, replaced by the build')
+    args = parser.parse_args()
+    result = build(args.source, args.output)
+    print('Built %d assets and %d files in %s' % (len(result['assets']), len(result['files']), args.output))
@@ -2,6 +2,26 @@
 
 var exercise_protorow = null;
 
+// shows the "more" button of a paginated list if the response has a next page
+function updateMoreButton(button, data, loadPage) {
+    var next = data["@controls"].next;
+    button.off("click");
+    if (next) {
+        button.show().click(function () {
+            loadPage(next.href);
+        });
+    } else {
+        button.hide();
+    }
+}
+
+function loadExercisePage(url) {
+    $.ajax({
+        url: url,
+        dataType: DATATYPE
+    }).done(processExerciseList).fail(alertRequestFail);
+}
+
 function processExerciseList(data) {
     function deleteExercise(exerciseid, row) {
         var loginInfo = getLoginInfo();
@@ -31,15 +51,13 @@ function processExerciseList(data) {
         }
         $("#exercise-all").append(row);
     });
+    updateMoreButton($("#exercise-more"), data, loadExercisePage);
 }
 
 function listUsers() {
     function listSubmissions(nickname) {
         $(".exercise-row").remove();
-        $.ajax({
-            url: "/api/users/" + encodeURIComponent(nickname) + "/submissions/",
-            dataType: DATATYPE
-        }).done(processExerciseList).fail(alertRequestFail);
+        loadExercisePage("/api/users/" + encodeURIComponent(nickname) + "/submissions/");
     }
 
     function deleteUser(nickname, row) {
@@ -57,30 +75,32 @@ function listUsers() {
 
     var user_protorow = $("#user-proto-row").hide();
 
-    $.ajax({
-        url: "/api/users/",
-        dataType: DATATYPE
-    }).done(function (data) {
-        data.items.forEach(function (userItem) {
-            var row = user_protorow.clone().show();
-            row.find("a").text(userItem.nickname).click(function () {
-                $(".active").removeClass("active");
-                row.addClass("active");
-                listSubmissions(userItem.nickname);
+    function loadUserPage(url) {
+        $.ajax({
+            url: url,
+            dataType: DATATYPE
+        }).done(function (data) {
+            data.items.forEach(function (userItem) {
+                var row = user_protorow.clone().show();
+                row.find("a").text(userItem.nickname).click(function () {
+                    $(".active").removeClass("active");
+                    row.addClass("active");
+                    listSubmissions(userItem.nickname);
+                });
+                // TODO delete users
+                row.find(".oi").hide();
+                $("#user-all").append(row);
             });
-            // TODO delete users
-            row.find(".oi").hide();
-            $("#user-all").append(row);
-        });
-    }).fail(alertRequestFail);
+            updateMoreButton($("#user-more"), data, loadUserPage);
+        }).fail(alertRequestFail);
+    }
+
+    loadUserPage("/api/users/");
 }
 
 function listExercises() {
     exercise_protorow = $("#exercise-proto-row").hide();
-    $.ajax({
-        url: "/api/exercises/",
-        dataType: DATATYPE
-    }).done(processExerciseList).fail(alertRequestFail);
+    loadExercisePage("/api/exercises/");
 }
 
 $(function () {
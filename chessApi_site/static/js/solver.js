@@ -1,11 +1,12 @@
 (function () {
 
 const EXERCISES_PATH = "/api/exercises/";
+const DEFAULT_CONTENTTYPE = "application/json";
 const opponentWaitMs = 500;
 
 var chessBoard = null;
 var chessGame = null;
-var movelist = "";
+var sessionUrl = null;
 var moveEnabled = true;
 
 // from stackoverflow
@@ -29,9 +30,7 @@ function boardClickCallback(fromsan, tosan) {
     if (chessGame.move({from: fromsan, to: tosan})) {
         var history = chessGame.history();
         var newSan = history[history.length - 1];
-        var testMovelist = movelist === "" ? "" : movelist + ",";
-        testMovelist = testMovelist + newSan;
-        getSolverResult(testMovelist);
+        getSolverResult(newSan);
     }
 }
 
@@ -52,20 +51,32 @@ function getExercise(apiurl) {
         $("#ex-title").text(data.headline);
         $("#ex-about").text(data.about);
         $("#ex-author").text(data.author);
-        chessBoard.registerBoardClickCallback(boardClickCallback);
         chessGame = new Chess(data["initial-state"]);
         chessBoard.drawPieces(chessGame);
         displayNextTurn();
+        startSolverSession(data["@controls"]["chessapi:solver-session"].href);
     }).fail(alertRequestFail);
 }
 
-function getSolverResult(newMoveList, callback) {
+function startSolverSession(apiurl) {
+    return $.ajax({
+        url: apiurl,
+        dataType: DATATYPE,
+        type: "POST"
+    }).done(function (data, textStatus, xhr) {
+        sessionUrl = xhr.getResponseHeader("Location");
+        chessBoard.registerBoardClickCallback(boardClickCallback);
+    }).fail(alertRequestFail);
+}
+
+function getSolverResult(newSan) {
     moveEnabled = false;
-    var apiurl = EXERCISES_PATH + getUrlParameter("exerciseid")
-        + "/solver?solution=" + encodeURIComponent(newMoveList);
     $.ajax({
-        url: apiurl,
-        dataType: DATATYPE
+        url: sessionUrl,
+        contentType: DEFAULT_CONTENTTYPE,
+        data: JSON.stringify({"move": newSan}),
+        dataType: DATATYPE,
+        type: "POST"
     }).done(function (data, textStatus) {
         var solverValue = data["value"];
         if (solverValue === "WRONG") {
@@ -74,7 +85,6 @@ function getSolverResult(newMoveList, callback) {
         } else {
             updateMoveList(chessGame);
             chessBoard.drawPieces(chessGame);
-            movelist = newMoveList;
             if (solverValue === "SOLUTION") {
                 $("#solve-message").text("Exercise solved");
                 alert("Exercise solved!");
@@ -82,7 +92,6 @@ function getSolverResult(newMoveList, callback) {
                 displayNextTurn();
                 setTimeout(function () {
                     var opponentMove = data["opponent-move"];
-                    movelist = movelist + "," + opponentMove;
                     chessGame.move(opponentMove);
                     updateMoveList(chessGame);
                     chessBoard.drawPieces(chessGame, true);
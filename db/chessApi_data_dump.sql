@@ -1,8 +1,8 @@
-INSERT INTO "users" VALUES(1,'Mystery',1362015937,'mystery@mymail.com');
-INSERT INTO "users" VALUES(2,'AxelW',1357724086,'axelw@mymail.com');
-INSERT INTO "users" VALUES(3,'LinuxPenguin',1362012937,'linuxpenguin@mymail.com');
-INSERT INTO "users" VALUES(4,'Koodari',1389260086,'koodari@mymail.com');
-INSERT INTO "users" VALUES(5,'HockeyFan',1394357686,'hockeyfan@mymail.com');
-INSERT INTO "exercises" VALUES(1,1,'Fool Mate','The quickest checkmate available.', 1519061565, 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1','e6,g4,Qh4#');
-INSERT INTO "exercises" VALUES(2,1,'Fool Mate II','Fool mate again. From non-default starting position.', 1519071565, 'rnbqkbnr/pppppppp/8/8/8/6Qn/PPPPPPPP/RNBQKBNR w KQkq - 0 1','Qxh3,f6,Qh4,g5,Qh5#');
-INSERT INTO "exercises" VALUES(3,4,'Simple bishop','Stolen from chess.com.', 1502337273, 'r1b2bkr/ppp3pp/2n5/3qp3/2B5/8/PPPP1PPP/RNBQK1NR w KQkq - 0 1','Bxd5+,Be6,Bxe6#');
\ No newline at end of file
+INSERT INTO "users"(user_id, nickname, reg_date, email) VALUES(1,'Mystery',1362015937,'mystery@mymail.com');
+INSERT INTO "users"(user_id, nickname, reg_date, email) VALUES(2,'AxelW',1357724086,'axelw@mymail.com');
+INSERT INTO "users"(user_id, nickname, reg_date, email) VALUES(3,'LinuxPenguin',1362012937,'linuxpenguin@mymail.com');
+INSERT INTO "users"(user_id, nickname, reg_date, email) VALUES(4,'Koodari',1389260086,'koodari@mymail.com');
+INSERT INTO "users"(user_id, nickname, reg_date, email) VALUES(5,'HockeyFan',1394357686,'hockeyfan@mymail.com');
+INSERT INTO "exercises"(exercise_id, user_id, title, description, sub_date, initial_state, list_moves) VALUES(1,1,'Fool Mate','The quickest checkmate available.', 1519061565, 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1','e6,g4,Qh4#');
+INSERT INTO "exercises"(exercise_id, user_id, title, description, sub_date, initial_state, list_moves) VALUES(2,1,'Fool Mate II','Fool mate again. From non-default starting position.', 1519071565, 'rnbqkbnr/pppppppp/8/8/8/6Qn/PPPPPPPP/RNBQKBNR w KQkq - 0 1','Qxh3,f6,Qh4,g5,Qh5#');
+INSERT INTO "exercises"(exercise_id, user_id, title, description, sub_date, initial_state, list_moves) VALUES(3,4,'Simple bishop','Stolen from chess.com.', 1502337273, 'r1b2bkr/ppp3pp/2n5/3qp3/2B5/8/PPPP1PPP/RNBQK1NR w KQkq - 0 1','Bxd5+,Be6,Bxe6#');
\ No newline at end of file
@@ -4,12 +4,14 @@ Created on 28.04.2018
 """
 from werkzeug.serving import run_simple
 from werkzeug.wsgi import DispatcherMiddleware
+from chessApi.compression import CompressionMiddleware
 from chessApi.resources import app as chessApi
 from chessApi_site.application import app as chessApiSite
 
-application = DispatcherMiddleware(chessApi, {
+# the list pages of the API are compressed and cached by the API itself, the middleware leaves them alone
+application = CompressionMiddleware(DispatcherMiddleware(chessApi, {
     '/site': chessApiSite
-})
+}), level=chessApi.config['CompressionLevel'], min_size=chessApi.config['CompressionMinSize'])
 
 if __name__ == '__main__':
     run_simple('localhost', 5000, application,
@@ -0,0 +1,80 @@
+"""
+Created on 18.10.2026
+Production entry point: serves the REST API and the client site of main.py
+with debug off, in a pre-forking server.
+@author: lorinc
+
+Usage, in the project root folder:
+    python server.py [--host HOST] [--port PORT] [--workers N] [--threads N] [--preload]
+
+Send SIGHUP to the master process to restart the workers gracefully, e.g.
+after a deployment, and SIGTERM or SIGINT to shut down.
+
+"""
+
+import argparse
+from functools import partial
+import logging
+from chessApi.prefork import PreforkServer, DEFAULT_WORKERS, DEFAULT_THREADS, DEFAULT_GRACEFUL_TIMEOUT
+
+
+def load_application():
+    """
+    Imports the combined application of main.py, with debug off. Unless the
+    server preloads it, this runs in every worker, after the fork.
+
+    :return: The WSGI application.
+
+    """
+    import main
+    main.chessApi.debug = False
+    main.chessApiSite.debug = False
+    return main.application
+
+
+def setup_worker(threads, application):
+    """
+    Prepares the state of a worker after the fork: the database pool, the
+    validation pool and the grading pool inherited from the master are
+    forgotten, and the database pool is sized for the threads of the worker.
+
+    :param int threads: The number of requests the worker serves at once.
+    :param application: The WSGI application.
+
+    """
+    import main
+    engine = main.chessApi.config['Engine']
+    engine.reset_after_fork()
+    engine.pool_size = max(engine.pool_size, threads)
+    main.chessApi.config['Validator'].reset_after_fork()
+    main.chessApi.config['Grader'].reset_after_fork()
+
+
+def shutdown_worker(application):
+    """
+    Stops the validation pool and the grading pool of a worker when it exits,
+    so their processes do not outlive it.
+
+    :param application: The WSGI application.
+
+    """
+    import main
+    main.chessApi.config['Validator'].shutdown()
+    main.chessApi.config['Grader'].shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the API and the site in a pre-forking server.')
+    parser.add_argument('--host', default='127.0.0.1', help='host to listen on')
+    parser.add_argument('--port', type=int, default=5000, help='port to listen on')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='number of worker processes')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='number of requests a worker serves at once, in threads')
+    parser.add_argument('--graceful-timeout', type=float, default=DEFAULT_GRACEFUL_TIMEOUT,
+                        help='seconds the workers have to finish their requests when stopped')
+    parser.add_argument('--preload', action='store_true',
+                        help='load the application once in the master; a restart does not load new code then')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(levelname)s %(message)s')
+    PreforkServer(load_application, args.host, args.port, args.workers, args.threads, args.graceful_timeout,
+                  args.preload, partial(setup_worker, args.threads), shutdown_worker).run()
@@ -9,6 +9,19 @@ import unittest
 
 from test.database_api_tests_user import UserDbApiTestCase
 from test.database_api_tests_exercise import ExerciseApiDbTestCase
+from test.database_api_tests_pool import ConnectionPoolTestCase
+from test.database_api_tests_engine import EngineTestCase
+from test.database_api_tests_unit_of_work import UnitOfWorkTestCase
+from test.cache_tests import LRUCacheTestCase
+from test.cache_tests import ResponseCacheTestCase
+from test.solver_tests import SolverSessionTestCase
+from test.validation_tests import ValidatorTestCase
+from test.serializers_tests import SerializersTestCase
+from test.codec_tests import CodecTestCase
+from test.compression_tests import CompressionTestCase
+from test.site_assets_tests import SiteAssetsTestCase
+from test.prefork_tests import PreforkServerTestCase
+from test.dataset_tests import DatasetTestCase
 from test.resource_api_tests import ExercisesTestCase
 from test.resource_api_tests import UsersTestCase
 
@@ -16,6 +29,19 @@ if __name__ == '__main__':
     suite = unittest.TestSuite((
         unittest.defaultTestLoader.loadTestsFromTestCase(UserDbApiTestCase),
         unittest.defaultTestLoader.loadTestsFromTestCase(ExerciseApiDbTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(ConnectionPoolTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(EngineTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(UnitOfWorkTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(LRUCacheTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(ResponseCacheTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(SolverSessionTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(ValidatorTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(SerializersTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(CodecTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(CompressionTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(SiteAssetsTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(PreforkServerTestCase),
+        unittest.defaultTestLoader.loadTestsFromTestCase(DatasetTestCase),
         unittest.defaultTestLoader.loadTestsFromTestCase(ExercisesTestCase),
         unittest.defaultTestLoader.loadTestsFromTestCase(UsersTestCase)
     ))
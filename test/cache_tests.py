@@ -0,0 +1,179 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import unittest
+from chessApi.cache import LRUCache, ResponseCache
+
+
+class FakeClock(object):
+    """Manually advanced clock for testing expiry."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    """Test cases for the bounded LRU cache."""
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = LRUCache(2, ttl=10, clock=self.clock)
+
+    def test_get_put(self):
+        """Checks if stored values are returned and missing ones counted as misses"""
+        print('(' + self.test_get_put.__name__ + ')', self.test_get_put.__doc__)
+        self.cache.put('a', 1)
+        self.assertEqual(1, self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        stats = self.cache.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(0.5, stats['hit_ratio'])
+
+    def test_least_recently_used_evicted(self):
+        """Checks if the least recently used entry is evicted when the cache is full"""
+        print('(' + self.test_least_recently_used_evicted.__name__ + ')',
+              self.test_least_recently_used_evicted.__doc__)
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.get('a')
+        self.cache.put('c', 3)
+        self.assertEqual(1, self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(3, self.cache.get('c'))
+        self.assertEqual(1, self.cache.stats()['evictions'])
+        self.assertEqual(2, len(self.cache))
+
+    def test_expiry(self):
+        """Checks if entries older than the ttl are not returned"""
+        print('(' + self.test_expiry.__name__ + ')', self.test_expiry.__doc__)
+        self.cache.put('a', 1)
+        self.clock.now = 9
+        self.assertEqual(1, self.cache.get('a'))
+        self.clock.now = 10
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(1, self.cache.stats()['expirations'])
+
+    def test_invalidate(self):
+        """Checks if entries can be invalidated by key and by predicate"""
+        print('(' + self.test_invalidate.__name__ + ')', self.test_invalidate.__doc__)
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.cache.invalidate('a')
+        self.cache.invalidate('missing')
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', 1)
+        self.cache.invalidate_where(lambda key, value: value > 1)
+        self.assertEqual(1, self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(2, self.cache.stats()['invalidations'])
+
+    def test_put_after_invalidation(self):
+        """Checks if a value read before an invalidation is not stored"""
+        print('(' + self.test_put_after_invalidation.__name__ + ')', self.test_put_after_invalidation.__doc__)
+        generation = self.cache.generation()
+        self.cache.invalidate('a')
+        self.cache.put('a', 1, generation)
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', 1, self.cache.generation())
+        self.assertEqual(1, self.cache.get('a'))
+        self.assertEqual(1, self.cache.stats()['discarded'])
+
+    def test_memory_bound(self):
+        """Checks if the memory used by the entries is accounted and bounded"""
+        print('(' + self.test_memory_bound.__name__ + ')', self.test_memory_bound.__doc__)
+        cache = LRUCache(10, maxbytes=10, sizeof=lambda key, value: len(value))
+        cache.put('a', 'xxxx')
+        cache.put('b', 'xxxx')
+        self.assertEqual(8, cache.stats()['bytes'])
+        cache.put('a', 'xx')
+        self.assertEqual(6, cache.stats()['bytes'])
+        cache.put('c', 'xxxxxx')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual('xx', cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual(8, stats['bytes'])
+        self.assertEqual(10, stats['maxbytes'])
+        self.assertEqual(1, stats['evictions'])
+        cache.invalidate('a')
+        self.assertEqual(6, cache.stats()['bytes'])
+        cache.clear()
+        self.assertEqual(0, cache.stats()['bytes'])
+        self.assertRaises(ValueError, LRUCache, 10, maxbytes=10)
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """Test cases for the tagged cache of encoded responses."""
+    def setUp(self):
+        self.cache = ResponseCache(10)
+        self.builds = 0
+
+    def _build(self, body, *tags):
+        def build():
+            self.builds += 1
+            return body, tags
+        return build
+
+    def test_get_builds_once(self):
+        """Checks if a body is built on the first lookup only"""
+        print('(' + self.test_get_builds_once.__name__ + ')', self.test_get_builds_once.__doc__)
+        self.assertEqual(b'a', self.cache.get('/a', self._build(b'a', 'x')))
+        self.assertEqual(b'a', self.cache.get('/a', self._build(b'b', 'x')))
+        self.assertEqual(1, self.builds)
+        stats = self.cache.stats()
+        self.assertEqual(1, stats['rebuilds'])
+        self.assertEqual(0.5, stats['hit_ratio'])
+        self.assertEqual(stats['rebuild_time'], stats['avg_rebuild_time'])
+
+    def test_invalidate_by_tag(self):
+        """Checks if only the bodies having an invalidated tag are rebuilt"""
+        print('(' + self.test_invalidate_by_tag.__name__ + ')', self.test_invalidate_by_tag.__doc__)
+        self.cache.get('/a', self._build(b'a', 'x', 'y'))
+        self.cache.get('/b', self._build(b'b', 'y'))
+        self.cache.get('/c', self._build(b'c', 'z'))
+        self.cache.invalidate('x', 'z')
+        self.assertEqual(b'b', self.cache.get('/b', self._build(b'B')))
+        self.assertEqual(b'A', self.cache.get('/a', self._build(b'A')))
+        self.assertEqual(b'C', self.cache.get('/c', self._build(b'C')))
+        self.assertEqual(5, self.builds)
+
+    def test_concurrent_invalidation(self):
+        """Checks if a body built during an invalidation is not stored"""
+        print('(' + self.test_concurrent_invalidation.__name__ + ')', self.test_concurrent_invalidation.__doc__)
+
+        def build():
+            self.cache.invalidate('x')
+            return b'stale', ('x',)
+
+        self.assertEqual(b'stale', self.cache.get('/a', build))
+        self.assertEqual(b'fresh', self.cache.get('/a', self._build(b'fresh', 'x')))
+        self.assertEqual(1, self.cache.stats()['discarded'])
+
+    def test_variants_stored_with_body(self):
+        """Checks if the variants of a body are encoded once and dropped with the body"""
+        print('(' + self.test_variants_stored_with_body.__name__ + ')', self.test_variants_stored_with_body.__doc__)
+        encodes = []
+
+        def encode(body):
+            encodes.append(body)
+            return body.upper() if len(body) > 1 else None
+
+        self.assertEqual((b'ab', b'AB'), self.cache.get_variant('/a', self._build(b'ab', 'x'), 'upper', encode))
+        self.assertEqual((b'ab', b'AB'), self.cache.get_variant('/a', self._build(b'cd', 'x'), 'upper', encode))
+        self.assertEqual(b'ab', self.cache.get('/a', self._build(b'cd', 'x')))
+        self.assertEqual((b'b', None), self.cache.get_variant('/b', self._build(b'b', 'y'), 'upper', encode))
+        self.assertEqual((b'b', None), self.cache.get_variant('/b', self._build(b'b', 'y'), 'upper', encode))
+        self.assertEqual([b'ab', b'b'], encodes)
+        self.cache.invalidate('x')
+        self.assertEqual((b'cd', b'CD'), self.cache.get_variant('/a', self._build(b'cd', 'x'), 'upper', encode))
+        self.assertEqual(3, self.builds)
+        self.assertEqual(3, self.cache.stats()['variants'])
+
+
+if __name__ == '__main__':
+    print('Start running cache tests')
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import json
+import math
+import unittest
+from chessApi import codec
+
+
+class CodecTestCase(unittest.TestCase):
+    """Test cases for the JSON codec."""
+    def setUp(self):
+        self.names = codec.names()
+
+    def tearDown(self):
+        codec.use(*self.names)
+
+    def test_dumps_same_as_json(self):
+        """Checks if every available encoder produces the output of the json module"""
+        print('(' + self.test_dumps_same_as_json.__name__ + ')', self.test_dumps_same_as_json.__doc__)
+        documents = codec.PROBES + [{'lone': '\ud800'}, {'del': 'a\x7fb', 'small': 1.5e-7}]
+        self.assertIn(codec.STDLIB, codec.available_encoders())
+        for name in codec.available_encoders():
+            codec.use(encoder=name)
+            for document in documents:
+                self.assertEqual(json.dumps(document), codec.dumps(document))
+        self.assertRaises(TypeError, codec.dumps, {'set': {1}})
+
+    def test_loads_same_as_json(self):
+        """Checks if every available decoder accepts what the json module accepts"""
+        print('(' + self.test_loads_same_as_json.__name__ + ')', self.test_loads_same_as_json.__doc__)
+        for name in codec.available_decoders():
+            codec.use(decoder=name)
+            for document in codec.PROBES:
+                encoded = json.dumps(document)
+                self.assertEqual(document, codec.loads(encoded))
+                self.assertEqual(document, codec.loads(encoded.encode('utf-8')))
+            self.assertEqual({'move': 'e4'}, codec.loads('{"move": "e4"}'.encode('utf-16')))
+            self.assertTrue(math.isnan(codec.loads('[NaN]')[0]))
+            self.assertEqual(2 ** 70, codec.loads(str(2 ** 70)))
+            self.assertRaises(ValueError, codec.loads, '{"move": ')
+            self.assertRaises(ValueError, codec.loads, b'\xff')
+
+    def test_use_unavailable(self):
+        """Checks if selecting a missing encoder or decoder is refused"""
+        print('(' + self.test_use_unavailable.__name__ + ')', self.test_use_unavailable.__doc__)
+        self.assertRaises(ValueError, codec.use, 'yaml')
+        self.assertRaises(ValueError, codec.use, None, 'yaml')
+        codec.use(codec.STDLIB, codec.STDLIB)
+        self.assertEqual((codec.STDLIB, codec.STDLIB), codec.names())
+
+
+if __name__ == '__main__':
+    print('Start running codec tests')
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import gzip
+import json
+import unittest
+import zlib
+from werkzeug.test import Client
+from werkzeug.wrappers import BaseResponse, Response
+from chessApi import compression
+
+BODY = json.dumps([{'initial_state': 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1'}] * 50)
+
+
+class CompressionTestCase(unittest.TestCase):
+    """Test cases for the response compression middleware."""
+    def setUp(self):
+        self.calls = 0
+        self.response = Response(BODY, mimetype='application/vnd.mason+json')
+        self.middleware = compression.CompressionMiddleware(self._app)
+        self.client = Client(self.middleware, BaseResponse)
+
+    def _app(self, environ, start_response):
+        self.calls += 1
+        return self.response(environ, start_response)
+
+    def test_negotiate(self):
+        """Checks if the content coding is picked from the Accept-Encoding header"""
+        print('(' + self.test_negotiate.__name__ + ')', self.test_negotiate.__doc__)
+        self.assertEqual(compression.GZIP, compression.negotiate('gzip, deflate, br'))
+        self.assertEqual(compression.DEFLATE, compression.negotiate('deflate'))
+        self.assertEqual(compression.DEFLATE, compression.negotiate('gzip;q=0.5, deflate'))
+        self.assertEqual(compression.GZIP, compression.negotiate('*'))
+        self.assertIsNone(compression.negotiate('gzip;q=0'))
+        self.assertIsNone(compression.negotiate('identity'))
+        self.assertIsNone(compression.negotiate(None))
+
+    def test_compressed(self):
+        """Checks if a large response is compressed with the negotiated coding"""
+        print('(' + self.test_compressed.__name__ + ')', self.test_compressed.__doc__)
+        self.response.set_etag('abc')
+        resp = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual('gzip', resp.headers['Content-Encoding'])
+        self.assertEqual('Accept-Encoding', resp.headers['Vary'])
+        self.assertEqual('W/"abc"', resp.headers['ETag'])
+        self.assertEqual(str(len(resp.data)), resp.headers['Content-Length'])
+        self.assertLess(len(resp.data), len(BODY))
+        self.assertEqual(BODY, gzip.decompress(resp.data).decode('utf-8'))
+        resp = self.client.get('/', headers={'Accept-Encoding': 'deflate'})
+        self.assertEqual('deflate', resp.headers['Content-Encoding'])
+        self.assertEqual(BODY, zlib.decompress(resp.data).decode('utf-8'))
+
+    def test_not_compressed(self):
+        """Checks if small, streamed, binary, no-transform and already encoded responses are left alone"""
+        print('(' + self.test_not_compressed.__name__ + ')', self.test_not_compressed.__doc__)
+        resp = self.client.get('/')
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(BODY, resp.data.decode('utf-8'))
+        for body, response in (('{}', Response('{}', mimetype='application/json')),
+                               (BODY, Response(BODY, mimetype='image/png')),
+                               (BODY, Response(BODY, mimetype='application/json',
+                                               headers={'Cache-Control': 'no-transform'})),
+                               (BODY, Response(BODY, mimetype='application/json', headers={'Content-Encoding': 'br'})),
+                               (BODY, Response(iter([BODY]), mimetype='application/json')),
+                               (BODY, Response(BODY, status=404, mimetype='application/json'))):
+            self.response = response
+            resp = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers.get('Content-Encoding'), resp.headers.get('Content-Encoding'))
+            self.assertEqual(body, resp.data.decode('utf-8'))
+
+    def test_compressed_once_per_etag(self):
+        """Checks if the compressed form of a response with an ETag is reused"""
+        print('(' + self.test_compressed_once_per_etag.__name__ + ')', self.test_compressed_once_per_etag.__doc__)
+        self.response.set_etag('abc')
+        first = self.client.get('/', headers={'Accept-Encoding': 'gzip'}).data
+        second = self.client.get('/', headers={'Accept-Encoding': 'gzip'}).data
+        self.assertEqual(first, second)
+        self.assertEqual(2, self.calls)
+        stats = self.middleware.stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+
+if __name__ == '__main__':
+    print('Start running compression tests')
+    unittest.main()
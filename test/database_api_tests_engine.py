@@ -0,0 +1,229 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import sqlite3
+import unittest
+from chessApi import database
+
+DB_PATH = 'db/chessApi_test.db'
+ENGINE = database.Engine(DB_PATH)
+
+
+class EngineTestCase(unittest.TestCase):
+    """Test cases for the configuration of the database by the Engine."""
+    @classmethod
+    def setUpClass(cls):
+        """ Creates the database structure. Removes first any preexisting
+            database file
+        """
+        print("Testing ", cls.__name__)
+        ENGINE.remove_database()
+        ENGINE.create_tables()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the testing database"""
+        print("Testing ENDED for ", cls.__name__)
+        ENGINE.remove_database()
+        ENGINE.create_tables()
+
+    def setUp(self):
+        """Populates the database"""
+        ENGINE.populate_tables()
+
+    def tearDown(self):
+        """Remove all records from database"""
+        ENGINE.clear()
+
+    def _pragma(self, connection, name):
+        """Returns the current value of the PRAGMA `name` of the connection."""
+        return connection.con.execute('PRAGMA ' + name).fetchone()[0]
+
+    def test_profile_applied(self):
+        """Checks if the PRAGMA statements of the profile are applied to a new connection"""
+        print('(' + self.test_profile_applied.__name__ + ')', self.test_profile_applied.__doc__)
+        for name, pragmas in database.PROFILES.items():
+            connection = database.Engine(DB_PATH, profile=name).connect()
+            self.assertEqual(pragmas['journal_mode'].lower(), self._pragma(connection, 'journal_mode'))
+            self.assertEqual(pragmas['busy_timeout'], self._pragma(connection, 'busy_timeout'))
+            self.assertEqual(1, self._pragma(connection, 'foreign_keys'))
+            connection.close()
+
+    def test_profile_pooled_connection(self):
+        """Checks if pooled connections are configured with the profile"""
+        print('(' + self.test_profile_pooled_connection.__name__ + ')', self.test_profile_pooled_connection.__doc__)
+        engine = database.Engine(DB_PATH, profile='fast')
+        connection = engine.checkout()
+        self.assertEqual('wal', self._pragma(connection, 'journal_mode'))
+        self.assertEqual(0, self._pragma(connection, 'synchronous'))
+        self.assertEqual(database.PROFILES['fast']['cache_size'], self._pragma(connection, 'cache_size'))
+        connection.close()
+        engine.dispose_pool()
+
+    def test_profile_not_reapplied(self):
+        """Checks if the database API methods do not run PRAGMA statements"""
+        print('(' + self.test_profile_not_reapplied.__name__ + ')', self.test_profile_not_reapplied.__doc__)
+        connection = ENGINE.connect()
+        statements = []
+        connection.con.set_trace_callback(statements.append)
+        connection.get_exercises()
+        connection.get_exercise(1)
+        connection.get_user('Mystery')
+        connection.get_users()
+        connection.con.set_trace_callback(None)
+        connection.close()
+        self.assertFalse([stmnt for stmnt in statements if stmnt.startswith('PRAGMA')])
+
+    def test_migrations_applied(self):
+        """Checks if the migrations are applied when the tables are created"""
+        print('(' + self.test_migrations_applied.__name__ + ')', self.test_migrations_applied.__doc__)
+        self.assertEqual(database.MIGRATIONS[-1][0], ENGINE.schema_version())
+        self.assertEqual([], ENGINE.migrate())
+        connection = ENGINE.connect()
+        indexes = [row['name'] for row in connection.con.execute('PRAGMA index_list(exercises)')]
+        connection.close()
+        self.assertIn('exercises_user_id', indexes)
+        self.assertIn('exercises_sub_date', indexes)
+
+    def test_migrate_unversioned_database(self):
+        """Checks if a database created from the bare schema dump is brought up to date"""
+        print('(' + self.test_migrate_unversioned_database.__name__ + ')',
+              self.test_migrate_unversioned_database.__doc__)
+        engine = database.Engine('db/chessApi_migration_test.db')
+        engine.remove_database()
+        con = sqlite3.connect(engine.db_path)
+        with open(database.DEFAULT_SCHEMA, encoding='utf-8') as f:
+            con.executescript(f.read())
+        con.close()
+        self.assertEqual(0, engine.schema_version())
+        self.assertEqual([migration[0] for migration in database.MIGRATIONS], engine.migrate())
+        self.assertEqual(database.MIGRATIONS[-1][0], engine.schema_version())
+        engine.remove_database()
+
+    def test_connect_migrates(self):
+        """Checks if a database of the bare schema and data dumps is migrated when it is first read"""
+        print('(' + self.test_connect_migrates.__name__ + ')', self.test_connect_migrates.__doc__)
+        engine = database.Engine('db/chessApi_migration_test.db')
+        engine.remove_database()
+        con = sqlite3.connect(engine.db_path)
+        for dump in (database.DEFAULT_SCHEMA, database.DEFAULT_DATA_DUMP):
+            with open(dump, encoding='utf-8') as f:
+                con.executescript(f.read())
+        con.close()
+        connection = engine.connect()
+        self.assertEqual(1, connection.get_exercise(1)['version'])
+        connection.close()
+        self.assertEqual(database.MIGRATIONS[-1][0], engine.schema_version())
+        engine.remove_database()
+
+    def test_failed_migration_rolled_back(self):
+        """Checks if a failing migration leaves the schema version unchanged"""
+        print('(' + self.test_failed_migration_rolled_back.__name__ + ')',
+              self.test_failed_migration_rolled_back.__doc__)
+        version = ENGINE.schema_version()
+        broken = [(version + 1, 'Broken', ('CREATE TABLE broken(id INTEGER)', 'SELECT * FROM missing_table'))]
+        self.assertRaises(sqlite3.OperationalError, ENGINE.migrate, broken)
+        self.assertEqual(version, ENGINE.schema_version())
+        connection = ENGINE.connect()
+        tables = [row['name'] for row in connection.con.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        connection.close()
+        self.assertNotIn('broken', tables)
+
+    def test_submissions_query_uses_index(self):
+        """Checks if listing the exercises of a user does not scan the exercises table"""
+        print('(' + self.test_submissions_query_uses_index.__name__ + ')',
+              self.test_submissions_query_uses_index.__doc__)
+        connection = ENGINE.connect()
+        plan = connection.con.execute('EXPLAIN QUERY PLAN SELECT exercise_id FROM exercises WHERE user_id = ?',
+                                      (1,)).fetchall()
+        connection.close()
+        self.assertTrue(any('exercises_user_id' in row['detail'] for row in plan))
+
+    def test_sync_caches(self):
+        """Checks if the caches repeat the invalidations logged by the connections of another engine"""
+        print('(' + self.test_sync_caches.__name__ + ')', self.test_sync_caches.__doc__)
+        engine, other = database.Engine(DB_PATH), database.Engine(DB_PATH)
+        connection, other_connection = engine.connect(), other.connect()
+        engine.sync_caches(connection)
+        exercise = connection.get_exercise(1)
+        engine.response_cache.get('/api/exercises/', lambda: ('page', [database.EXERCISES_TAG]))
+        engine.response_cache.get('/api/users/', lambda: ('page', [database.USERS_TAG]))
+        other_connection.modify_exercise(1, 'Synced', exercise['description'], exercise['initial_state'],
+                                         exercise['list_moves'])
+        other_connection.create_exercise('Synced II', None, 'Mystery', exercise['initial_state'],
+                                         exercise['list_moves'])
+        # the caches of the engine do not know about the modifications yet
+        self.assertEqual(exercise['title'], connection.get_exercise(1)['title'])
+        engine.sync_caches(connection)
+        self.assertEqual('Synced', connection.get_exercise(1)['title'])
+        self.assertEqual('new', engine.response_cache.get('/api/exercises/', lambda: ('new', [])))
+        self.assertEqual('page', engine.response_cache.get('/api/users/', lambda: ('new', [])))
+        connection.close()
+        other_connection.close()
+
+    def test_sync_caches_lagging(self):
+        """Checks if the caches are dropped when the invalidations to repeat are not logged anymore"""
+        print('(' + self.test_sync_caches_lagging.__name__ + ')', self.test_sync_caches_lagging.__doc__)
+        engine, other = database.Engine(DB_PATH), database.Engine(DB_PATH)
+        connection, other_connection = engine.connect(), other.connect()
+        engine.sync_caches(connection)
+        engine.response_cache.get('/api/users/', lambda: ('page', [database.USERS_TAG]))
+        for _ in range(database.INVALIDATION_LOG_SIZE + 1):
+            other_connection._log_invalidations(1)
+        other_connection._commit()
+        engine.sync_caches(connection)
+        self.assertEqual('new', engine.response_cache.get('/api/users/', lambda: ('new', [])))
+        self.assertEqual(database.INVALIDATION_LOG_SIZE, len(connection.get_invalidations(0)))
+        connection.close()
+        other_connection.close()
+
+    def test_sync_caches_no_change(self):
+        """Checks if the modifications which change no row log no invalidation"""
+        print('(' + self.test_sync_caches_no_change.__name__ + ')', self.test_sync_caches_no_change.__doc__)
+        connection = database.Engine(DB_PATH).connect()
+        last = connection.get_last_invalidation()
+        self.assertFalse(connection.delete_exercise(200))
+        self.assertFalse(connection.delete_user('Nobody'))
+        self.assertIsNone(connection.modify_exercise(200, 'Missing', None, 'fen', 'e4'))
+        self.assertEqual([], connection.get_invalidations(last))
+        self.assertTrue(connection.delete_exercise(1))
+        self.assertEqual([('exercise', '1'), ('tag', database.EXERCISES_TAG)],
+                         [(kind, value) for _, kind, value in connection.get_invalidations(last)])
+        connection.close()
+
+    def test_sync_caches_rolled_back(self):
+        """Checks if the invalidations of a rolled back modification are not logged"""
+        print('(' + self.test_sync_caches_rolled_back.__name__ + ')', self.test_sync_caches_rolled_back.__doc__)
+        connection = database.Engine(DB_PATH).connect()
+        last = connection.get_last_invalidation()
+        connection.begin()
+        self.assertTrue(connection.delete_exercise(1))
+        connection.rollback()
+        self.assertEqual([], connection.get_invalidations(last))
+        connection.close()
+
+    def test_sync_caches_cleared(self):
+        """Checks if the caches are dropped after the tables are cleared or populated by another engine"""
+        print('(' + self.test_sync_caches_cleared.__name__ + ')', self.test_sync_caches_cleared.__doc__)
+        engine, other = database.Engine(DB_PATH), database.Engine(DB_PATH)
+        connection = engine.connect()
+        for modify in (other.clear, other.populate_tables):
+            engine.sync_caches(connection)
+            engine.response_cache.get('/api/users/', lambda: ('page', [database.USERS_TAG]))
+            modify()
+            engine.sync_caches(connection)
+            self.assertEqual('new', engine.response_cache.get('/api/users/', lambda: ('new', [])))
+        connection.close()
+
+    def test_unknown_profile(self):
+        """Checks if an unknown profile name is rejected"""
+        print('(' + self.test_unknown_profile.__name__ + ')', self.test_unknown_profile.__doc__)
+        self.assertRaises(ValueError, database.Engine, DB_PATH, profile='turbo')
+
+
+if __name__ == '__main__':
+    print('Start running engine tests')
+    unittest.main()
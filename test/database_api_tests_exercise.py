@@ -4,9 +4,15 @@ Created on 20.02.2018
 
 """
 
+import io
+import json
+import os
+import tempfile
 import unittest
 import sqlite3
+from chessApi import chess_data
 from chessApi import database
+from chessApi import export
 
 DB_PATH = 'db/chessApi_test.db'
 ENGINE = database.Engine(DB_PATH)
@@ -19,7 +25,9 @@ EXERCISE1 = {
     'description': 'The quickest checkmate available.',
     'sub_date': 1519061565,
     'initial_state': 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1',
-    'list_moves': 'e6,g4,Qh4#'
+    'list_moves': 'e6,g4,Qh4#',
+    'version': 1,
+    'modified': 1519061565
 }
 EXERCISE2_MODIFIED = {
     'exercise_id': 2,
@@ -41,6 +49,24 @@ EXERCISE_CREATE = {
 }
 USER1_NICKNAME = 'Mystery'
 USER2_NICKNAME = 'AxelW'
+IMPORT_PGN = '''[Event "Imported mate"]
+[SetUp "1"]
+[FEN "rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1"]
+
+1... e6 2. g4 Qh4# *
+
+[Event "Not a mate"]
+
+1. e4 e5 *
+
+[Event "Fool Mate"]
+
+1. f3 e5 2. g4 Qh4# *
+'''
+IMPORT_EPD = '''rnbqkbnr/pppp1ppp/8/4p3/6P1/5P2/PPPPP2P/RNBQKBNR b KQkq - bm Qh4#; id "EPD best move";
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - pv f3 e5 g4 Qh4#; id "EPD principal variation";
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - bm e4; id "EPD no mate";
+'''
 
 
 class ExerciseApiDbTestCase(unittest.TestCase):
@@ -84,6 +110,30 @@ class ExerciseApiDbTestCase(unittest.TestCase):
             exercises = cur.fetchall()
             return len(exercises)
 
+    @staticmethod
+    def _without_version(exercise):
+        """Returns the exercise without its version and modification time, which depend on the time of the test."""
+        return {key: value for key, value in exercise.items() if key not in ('version', 'modified')}
+
+    def _add_exercises(self, count, user_id=1):
+        """Inserts `count` additional exercises submitted by the user with `user_id`."""
+        stmnt = 'INSERT INTO exercises (user_id, title, description, sub_date, initial_state, list_moves) \
+                 VALUES(?,?,?,?,?,?)'
+        con = self.connection.con
+        with con:
+            con.executemany(stmnt, [(user_id, 'Extra %d' % i, 'Extra', 1519061565,
+                                     EXERCISE1['initial_state'], EXERCISE1['list_moves']) for i in range(count)])
+
+    def _count_statements(self, function, *args):
+        """Calls `function` with `args`, returns the number of SQL statements it executed."""
+        statements = []
+        self.connection.con.set_trace_callback(statements.append)
+        try:
+            function(*args)
+        finally:
+            self.connection.con.set_trace_callback(None)
+        return len(statements)
+
     def test_exercise_table_created(self):
         """Checks if exercises table has been created with 3 rows."""
         print('('+self.test_exercise_table_created.__name__+')',
@@ -122,6 +172,129 @@ class ExerciseApiDbTestCase(unittest.TestCase):
               self.test_exercises_get_empty.__doc__)
         self.assertIsNone(self.connection.get_exercises(USER2_NICKNAME))
 
+    def test_exercises_get_constant_query_count(self):
+        """Checks if listing exercises runs the same number of queries regardless of the number of rows"""
+        print('('+self.test_exercises_get_constant_query_count.__name__+')',
+              self.test_exercises_get_constant_query_count.__doc__)
+        all_before = self._count_statements(self.connection.get_exercises)
+        user_before = self._count_statements(self.connection.get_exercises, USER1_NICKNAME)
+        self._add_exercises(50)
+        self.assertEqual(INITIAL_EXERCISE_SIZE + 50, len(self.connection.get_exercises()))
+        self.assertEqual(all_before, self._count_statements(self.connection.get_exercises))
+        self.assertEqual(user_before, self._count_statements(self.connection.get_exercises, USER1_NICKNAME))
+
+    def test_exercise_get_single_query(self):
+        """Checks if an exercise and its author are fetched with a single query"""
+        print('('+self.test_exercise_get_single_query.__name__+')',
+              self.test_exercise_get_single_query.__doc__)
+        statements = []
+        self.connection.con.set_trace_callback(statements.append)
+        self.connection.get_exercise(1)
+        self.connection.con.set_trace_callback(None)
+        self.assertEqual(1, len([stmnt for stmnt in statements if stmnt.lstrip().startswith('SELECT')]))
+
+    def test_exercises_get_page(self):
+        """Checks if get_exercises_page seeks the pages in id order"""
+        print('('+self.test_exercises_get_page.__name__+')',
+              self.test_exercises_get_page.__doc__)
+        exercises, prev_cursor, next_cursor = self.connection.get_exercises_page(2)
+        self.assertEqual([1, 2], [exercise['exercise_id'] for exercise in exercises])
+        self.assertIsNone(prev_cursor)
+        self.assertEqual(2, next_cursor)
+        exercises, prev_cursor, next_cursor = self.connection.get_exercises_page(2, after=next_cursor)
+        self.assertEqual([3], [exercise['exercise_id'] for exercise in exercises])
+        self.assertEqual('Koodari', exercises[0]['author'])
+        self.assertEqual(3, prev_cursor)
+        self.assertIsNone(next_cursor)
+        exercises, prev_cursor, next_cursor = self.connection.get_exercises_page(2, before=prev_cursor)
+        self.assertEqual([1, 2], [exercise['exercise_id'] for exercise in exercises])
+        self.assertIsNone(prev_cursor)
+        self.assertEqual(2, next_cursor)
+
+    def test_exercises_get_page_nickname(self):
+        """Checks if get_exercises_page filters the exercises of a user"""
+        print('('+self.test_exercises_get_page_nickname.__name__+')',
+              self.test_exercises_get_page_nickname.__doc__)
+        exercises, prev_cursor, next_cursor = self.connection.get_exercises_page(1, nickname=USER1_NICKNAME)
+        self.assertEqual([1], [exercise['exercise_id'] for exercise in exercises])
+        self.assertEqual(1, next_cursor)
+        exercises, prev_cursor, next_cursor = self.connection.get_exercises_page(5, after=1, nickname=USER1_NICKNAME)
+        self.assertEqual([2], [exercise['exercise_id'] for exercise in exercises])
+        self.assertIsNone(next_cursor)
+        self.assertEqual(([], None, None), self.connection.get_exercises_page(5, nickname=USER2_NICKNAME))
+
+    def test_exercises_iterate(self):
+        """Checks if iter_exercises yields every exercise in id order, fetching in batches"""
+        print('('+self.test_exercises_iterate.__name__+')', self.test_exercises_iterate.__doc__)
+        self._add_exercises(5)
+        statements = []
+        self.connection.con.set_trace_callback(statements.append)
+        exercises = list(self.connection.iter_exercises(batch_size=2))
+        self.connection.con.set_trace_callback(None)
+        self.assertEqual(1, len(statements))
+        self.assertEqual(list(range(1, INITIAL_EXERCISE_SIZE + 6)), [exercise['exercise_id'] for exercise in exercises])
+        self.assertDictEqual(EXERCISE1, exercises[0])
+
+    def test_exercises_export(self):
+        """Checks if the exercises are exported as newline-delimited JSON"""
+        print('('+self.test_exercises_export.__name__+')', self.test_exercises_export.__doc__)
+        output = io.StringIO()
+        self.assertEqual(INITIAL_EXERCISE_SIZE, export.export(ENGINE, output, batch_size=2))
+        lines = output.getvalue().splitlines()
+        self.assertEqual(INITIAL_EXERCISE_SIZE, len(lines))
+        self.assertDictEqual(EXERCISE1, json.loads(lines[0]))
+
+    def _count_selects(self, function, *args):
+        """Calls `function` with `args`, returns the number of SELECT statements it executed."""
+        statements = []
+        self.connection.con.set_trace_callback(statements.append)
+        try:
+            function(*args)
+        finally:
+            self.connection.con.set_trace_callback(None)
+        return len([stmnt for stmnt in statements if stmnt.lstrip().startswith('SELECT')])
+
+    def test_exercise_get_cached(self):
+        """Checks if a repeatedly requested exercise is served from the cache"""
+        print('('+self.test_exercise_get_cached.__name__+')', self.test_exercise_get_cached.__doc__)
+        hits = ENGINE.exercise_cache_stats()['hits']
+        self.assertEqual(1, self._count_selects(self.connection.get_exercise, 1))
+        self.assertEqual(0, self._count_selects(self.connection.get_exercise, '1'))
+        self.assertEqual(hits + 1, ENGINE.exercise_cache_stats()['hits'])
+        # the cached dictionary cannot be modified through the returned one
+        self.connection.get_exercise(1)['title'] = 'Changed'
+        self.assertDictEqual(EXERCISE1, self.connection.get_exercise(1))
+
+    def test_exercise_cache_invalidated(self):
+        """Checks if modifying or deleting an exercise or its author invalidates the cached exercise"""
+        print('('+self.test_exercise_cache_invalidated.__name__+')', self.test_exercise_cache_invalidated.__doc__)
+        self.connection.get_exercise(2)
+        self.connection.modify_exercise(2, "Modified Title", "Description", "asd", "dsa")
+        self.assertDictEqual(EXERCISE2_MODIFIED, self._without_version(self.connection.get_exercise(2)))
+        self.connection.modify_user(USER1_NICKNAME, 'Renamed', 'renamed@mymail.com')
+        self.assertEqual('Renamed', self.connection.get_exercise(2)['author'])
+        self.connection.delete_user('Renamed')
+        self.assertIsNone(self.connection.get_exercise(2)['author'])
+        self.connection.delete_exercise(2)
+        self.assertIsNone(self.connection.get_exercise(2))
+
+    def test_exercise_cache_concurrent_modification(self):
+        """Checks if an exercise read before a concurrent modification is not cached"""
+        print('('+self.test_exercise_cache_concurrent_modification.__name__+')',
+              self.test_exercise_cache_concurrent_modification.__doc__)
+        other = ENGINE.connect()
+        create_exercise_object = self.connection._create_exercise_object
+
+        def modified_meanwhile(row):
+            # another thread modifies the exercise after the row was read
+            other.modify_exercise(2, "Modified Title", "Description", "asd", "dsa")
+            return create_exercise_object(row)
+        self.connection._create_exercise_object = modified_meanwhile
+        self.assertNotEqual("Modified Title", self.connection.get_exercise(2)['title'])
+        del self.connection._create_exercise_object
+        self.assertEqual("Modified Title", self.connection.get_exercise(2)['title'])
+        other.close()
+
     def test_exercise_delete_valid(self):
         """Checks if an existing exercise can be deleted"""
         print('('+self.test_exercise_delete_valid.__name__+')',
@@ -142,7 +315,7 @@ class ExerciseApiDbTestCase(unittest.TestCase):
               self.test_exercise_modify_valid.__doc__)
         value = self.connection.modify_exercise(2, "Modified Title", "Description", "asd", "dsa")
         self.assertEqual(value, 2)
-        self.assertDictEqual(self.connection.get_exercise(2), EXERCISE2_MODIFIED)
+        self.assertDictEqual(self._without_version(self.connection.get_exercise(2)), EXERCISE2_MODIFIED)
 
     def test_exercise_modify_invalid(self):
         """Checks when a non-existing exercise is to be modified, the retun value is False"""
@@ -150,6 +323,173 @@ class ExerciseApiDbTestCase(unittest.TestCase):
               self.test_exercise_modify_invalid.__doc__)
         self.assertFalse(self.connection.modify_exercise(200, "zvc", "fasd", "dsa", "Asd"))
 
+    def test_exercise_version(self):
+        """Checks if the version of an exercise is bumped by its modifications and the renaming of its author"""
+        print('(' + self.test_exercise_version.__name__ + ')', self.test_exercise_version.__doc__)
+        self.assertEqual(1, self.connection.get_exercise(2)['version'])
+        self.assertEqual(2, self.connection.modify_exercise(2, "Modified Title", "Description", "asd", "dsa", 1))
+        exercise = self.connection.get_exercise(2)
+        self.assertEqual(2, exercise['version'])
+        self.assertGreater(exercise['modified'], EXERCISE2_MODIFIED['sub_date'])
+        # a modification based on an older version is refused
+        self.assertIsNone(self.connection.modify_exercise(2, "Lost Update", "Description", "asd", "dsa", 1))
+        self.assertEqual("Modified Title", self.connection.get_exercise(2)['title'])
+        self.connection.modify_user(USER1_NICKNAME, USER1_NICKNAME, 'changed@mymail.com')
+        self.assertEqual(2, self.connection.get_exercise(2)['version'])
+        self.connection.modify_user(USER1_NICKNAME, 'Renamed', 'changed@mymail.com')
+        self.assertEqual(3, self.connection.get_exercise(2)['version'])
+        self.connection.delete_user('Renamed')
+        self.assertEqual(4, self.connection.get_exercise(2)['version'])
+
+    def test_exercise_modify_existing_title(self):
+        """Checks if setting the title of another exercise raises a conflict"""
+        print('(' + self.test_exercise_modify_existing_title.__name__ + ')',
+              self.test_exercise_modify_existing_title.__doc__)
+        self.assertRaises(database.ConflictError, self.connection.modify_exercise,
+                          2, EXERCISE1['title'], "Description", "asd", "dsa")
+        self.assertEqual(2, self.connection.modify_exercise(2, self.connection.get_exercise(2)['title'],
+                                                            "Description", "asd", "dsa"))
+
+    def test_exercise_create_existing_title(self):
+        """Checks if creating an exercise with an existing title raises a conflict"""
+        print('(' + self.test_exercise_create_existing_title.__name__ + ')',
+              self.test_exercise_create_existing_title.__doc__)
+        self.assertRaises(database.ConflictError, self.connection.create_exercise,
+                          EXERCISE1['title'], "Description new", "Mystery", "new state", "new new")
+        self.assertEqual(INITIAL_EXERCISE_SIZE, self._get_exercise_table_row_count())
+
+    def test_title_exists(self):
+        """Checks the indexed existence check of exercise titles"""
+        print('(' + self.test_title_exists.__name__ + ')', self.test_title_exists.__doc__)
+        self.assertTrue(self.connection.title_exists(EXERCISE1['title']))
+        self.assertFalse(self.connection.title_exists(EXERCISE1['title'], 1))
+        self.assertTrue(self.connection.title_exists(EXERCISE1['title'], 2))
+        self.assertFalse(self.connection.title_exists(EXERCISE_CREATE['title']))
+        plan = self.connection.con.execute('EXPLAIN QUERY PLAN SELECT 1 FROM exercises WHERE title = ?',
+                                           (EXERCISE1['title'],)).fetchall()
+        self.assertIn('USING COVERING INDEX', ' '.join(row[-1] for row in plan))
+
+    def test_exercise_solution_compiled(self):
+        """Checks if the solution of a created or modified exercise is compiled"""
+        print('(' + self.test_exercise_solution_compiled.__name__ + ')',
+              self.test_exercise_solution_compiled.__doc__)
+        exercise_id = self.connection.create_exercise("New Exercise", None, "Mystery",
+                                                      EXERCISE1['initial_state'], EXERCISE1['list_moves'])
+        solution = self.connection.get_solution(exercise_id)
+        self.assertEqual(3, len(solution))
+        self.assertEqual(['e7e6', 'g2g4', 'd8h4'], [uci for _, _, uci, _ in solution.edges])
+        self.assertEqual((chess_data.SOLUTION,), solution.compare(['e6', 'g4', 'Qh4']))
+        self.assertEqual((chess_data.PARTIAL, 'g4'), solution.compare(['e7e6']))
+        self.assertIsNone(solution.compare(['e6', 'g3']))
+        self.connection.modify_exercise(exercise_id, "New Exercise", None, "asd", "dsa")
+        self.assertIsNone(self.connection.get_solution(exercise_id))
+        self.connection.modify_exercise(exercise_id, "New Exercise", None,
+                                        EXERCISE1['initial_state'], 'e5,g4,Qh4#')
+        self.assertEqual('e5', self.connection.get_solution(exercise_id).edges[0][1])
+        self.connection.delete_exercise(exercise_id)
+        self.assertEqual(0, self.connection.con.execute('SELECT COUNT(*) FROM solution_edges').fetchone()[0])
+
+    def test_exercise_solution_tree(self):
+        """Checks if the alternative lines of a solution are stored as one move tree"""
+        print('(' + self.test_exercise_solution_tree.__name__ + ')', self.test_exercise_solution_tree.__doc__)
+        exercise_id = self.connection.create_exercise("New Exercise", None, "Mystery", EXERCISE1['initial_state'],
+                                                      'e6,g4,Qh4#;e5,g4,Qh4#;e6,g4,Qh4#')
+        solution = self.connection.get_solution(exercise_id)
+        # the repeated line is stored once
+        self.assertEqual(6, len(solution))
+        self.assertEqual(6, self.connection.con.execute('SELECT COUNT(*) FROM solution_edges WHERE exercise_id = ?',
+                                                        (exercise_id,)).fetchone()[0])
+        self.assertEqual((chess_data.SOLUTION,), solution.compare(['e5', 'g4', 'Qh4']))
+        self.assertEqual((chess_data.PARTIAL, 'g4'), solution.compare(['e7e5']))
+
+    def test_exercise_solution_compiled_lazily(self):
+        """Checks if the solution of an exercise stored without one can be compiled later"""
+        print('(' + self.test_exercise_solution_compiled_lazily.__name__ + ')',
+              self.test_exercise_solution_compiled_lazily.__doc__)
+        self.assertIsNone(self.connection.get_solution(1))
+        solution = self.connection.compile_solution(1)
+        self.assertEqual(solution.edges, self.connection.get_solution(1).edges)
+        self.assertIsNone(self.connection.compile_solution(200))
+
+    def test_exercise_get_solver_data(self):
+        """Checks if the solver data of several exercises is read at once"""
+        print('(' + self.test_exercise_get_solver_data.__name__ + ')',
+              self.test_exercise_get_solver_data.__doc__)
+        self.connection.compile_solution(1)
+        data = self.connection.get_solver_data([1, 2, 200])
+        self.assertEqual({1, 2}, set(data))
+        initial_state, list_moves, edges = data[1]
+        self.assertEqual(EXERCISE1['initial_state'], initial_state)
+        self.assertEqual(EXERCISE1['list_moves'], list_moves)
+        self.assertEqual(self.connection.get_solution(1).edges, edges)
+        self.assertIsNone(data[2][2])
+
+    def _write_import_file(self, content, suffix):
+        """Writes `content` to a temporary file with `suffix`, returns its path."""
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_bulk_import_pgn(self):
+        """Checks if the valid puzzles of a PGN file are imported"""
+        print('(' + self.test_bulk_import_pgn.__name__ + ')', self.test_bulk_import_pgn.__doc__)
+        path = self._write_import_file(IMPORT_PGN, '.pgn')
+        report = ENGINE.bulk_import(path, USER2_NICKNAME, processes=2)
+        self.assertEqual(1, report['accepted'])
+        self.assertEqual(1, report['rejected'])
+        self.assertEqual(1, report['duplicates'])
+        self.assertGreater(report['per_second'], 0)
+        exercises = self.connection.get_exercises(USER2_NICKNAME)
+        self.assertEqual(['Imported mate'], [exercise['title'] for exercise in exercises])
+        exercise = self.connection.get_exercise(exercises[0]['exercise_id'])
+        self.assertEqual(EXERCISE1['initial_state'], exercise['initial_state'])
+        self.assertEqual(EXERCISE1['list_moves'], exercise['list_moves'])
+        # the solution is compiled by the import
+        self.assertEqual(chess_data.compile_solution(EXERCISE1['initial_state'], EXERCISE1['list_moves']),
+                         self.connection.get_solution(exercise['exercise_id']).edges)
+
+    def test_bulk_import_constraint_failure(self):
+        """Checks if only the puzzles with an existing title are counted as duplicates"""
+        print('(' + self.test_bulk_import_constraint_failure.__name__ + ')',
+              self.test_bulk_import_constraint_failure.__doc__)
+        path = self._write_import_file(IMPORT_EPD, '.epd')
+        con = self.connection.con
+        with con:
+            con.execute("CREATE TRIGGER refuse_pv BEFORE INSERT ON exercises \
+                         WHEN NEW.title = 'EPD principal variation' BEGIN SELECT RAISE(ABORT, 'refused'); END")
+        try:
+            report = ENGINE.bulk_import(path, processes=0)
+        finally:
+            with con:
+                con.execute('DROP TRIGGER refuse_pv')
+        self.assertEqual(1, report['accepted'])
+        self.assertEqual(2, report['rejected'])
+        self.assertEqual(0, report['duplicates'])
+        report = ENGINE.bulk_import(path, processes=0)
+        self.assertEqual(1, report['accepted'])
+        self.assertEqual(1, report['duplicates'])
+
+    def test_bulk_import_epd(self):
+        """Checks if the valid puzzles of an EPD file are imported in small batches"""
+        print('(' + self.test_bulk_import_epd.__name__ + ')', self.test_bulk_import_epd.__doc__)
+        path = self._write_import_file(IMPORT_EPD, '.epd')
+        report = ENGINE.bulk_import(path, processes=0, batch_size=1)
+        self.assertEqual(2, report['accepted'])
+        self.assertEqual(1, report['rejected'])
+        self.assertEqual(INITIAL_EXERCISE_SIZE + 2, self._get_exercise_table_row_count())
+        titles = [exercise['title'] for exercise in self.connection.get_exercises()]
+        self.assertIn('EPD best move', titles)
+        self.assertIn('EPD principal variation', titles)
+
+    def test_bulk_import_unknown_creator(self):
+        """Checks if importing for a non-existing user is refused"""
+        print('(' + self.test_bulk_import_unknown_creator.__name__ + ')', self.test_bulk_import_unknown_creator.__doc__)
+        path = self._write_import_file(IMPORT_EPD, '.epd')
+        self.assertRaises(ValueError, ENGINE.bulk_import, path, 'CarrotHead', processes=0)
+        self.assertEqual(INITIAL_EXERCISE_SIZE, self._get_exercise_table_row_count())
+
     def test_exercise_create_valid(self):
         """Checks if an exercise can be created"""
         print('(' + self.test_exercise_create_valid.__name__ + ')',
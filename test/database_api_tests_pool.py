@@ -0,0 +1,126 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import threading
+import time
+import unittest
+from chessApi import database
+
+DB_PATH = 'db/chessApi_test.db'
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    """Test cases for the pooled connections of the Engine."""
+    @classmethod
+    def setUpClass(cls):
+        """ Creates the database structure. Removes first any preexisting
+            database file
+        """
+        print("Testing ", cls.__name__)
+        engine = database.Engine(DB_PATH)
+        engine.remove_database()
+        engine.create_tables()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the testing database"""
+        print("Testing ENDED for ", cls.__name__)
+        engine = database.Engine(DB_PATH)
+        engine.remove_database()
+        engine.create_tables()
+
+    def setUp(self):
+        """Populates the database and creates an engine with a small pool"""
+        self.engine = database.Engine(DB_PATH, pool_size=2, pool_timeout=0.2)
+        self.engine.populate_tables()
+
+    def tearDown(self):
+        """Closes the pooled connections and removes all records from database"""
+        self.engine.dispose_pool()
+        self.engine.clear()
+
+    def test_connection_reused(self):
+        """Checks if a returned connection is handed out again"""
+        print('(' + self.test_connection_reused.__name__ + ')', self.test_connection_reused.__doc__)
+        con = self.engine.checkout()
+        sqlite_con = con.con
+        con.close()
+        con = self.engine.checkout()
+        self.assertIs(sqlite_con, con.con)
+        self.assertFalse(con.isclosed())
+        self.assertEqual(5, len(con.get_users()))
+        con.close()
+        self.assertEqual(1, self.engine.pool_stats()['created'])
+
+    def test_pool_bounded(self):
+        """Checks if the checkout times out when every connection is in use"""
+        print('(' + self.test_pool_bounded.__name__ + ')', self.test_pool_bounded.__doc__)
+        con1 = self.engine.checkout()
+        con2 = self.engine.checkout()
+        self.assertRaises(database.PoolTimeoutError, self.engine.checkout)
+        stats = self.engine.pool_stats()
+        self.assertEqual(1, stats['timeouts'])
+        self.assertEqual(1.0, stats['utilisation'])
+        con1.close()
+        con2.close()
+        self.assertEqual(0.0, self.engine.pool_stats()['utilisation'])
+
+    def test_checkout_waits_for_release(self):
+        """Checks if a waiting checkout gets the connection released by another thread"""
+        print('(' + self.test_checkout_waits_for_release.__name__ + ')',
+              self.test_checkout_waits_for_release.__doc__)
+        con1 = self.engine.checkout()
+        con2 = self.engine.checkout()
+        timer = threading.Timer(0.05, con1.close)
+        timer.start()
+        con3 = self.engine.checkout(timeout=5)
+        self.assertIs(con1, con3)
+        self.assertGreater(self.engine.pool_stats()['max_wait'], 0.0)
+        con2.close()
+        con3.close()
+
+    def test_idle_eviction(self):
+        """Checks if connections idle for too long are closed"""
+        print('(' + self.test_idle_eviction.__name__ + ')', self.test_idle_eviction.__doc__)
+        self.engine.pool_max_idle = 0.01
+        con = self.engine.checkout()
+        con.close()
+        time.sleep(0.02)
+        con = self.engine.checkout()
+        con.close()
+        stats = self.engine.pool_stats()
+        self.assertEqual(2, stats['created'])
+        self.assertEqual(1, stats['evicted'])
+
+    def test_failed_health_check(self):
+        """Checks if a broken idle connection is replaced on checkout"""
+        print('(' + self.test_failed_health_check.__name__ + ')', self.test_failed_health_check.__doc__)
+        self.engine.pool_ping_interval = 0
+        con = self.engine.checkout()
+        con.close()
+        con.con.close()
+        con = self.engine.checkout()
+        self.assertTrue(con.ping())
+        con.close()
+        self.assertEqual(1, self.engine.pool_stats()['failed_pings'])
+
+    def test_reset_after_fork(self):
+        """Checks if the pooled connections are forgotten, not closed, after a fork"""
+        print('(' + self.test_reset_after_fork.__name__ + ')', self.test_reset_after_fork.__doc__)
+        con = self.engine.checkout()
+        con.close()
+        self.engine.reset_after_fork()
+        self.assertTrue(con.ping())
+        new_con = self.engine.checkout()
+        self.assertIsNot(con.con, new_con.con)
+        new_con.close()
+        self.assertEqual(1, self.engine.pool_stats()['created'])
+        con.con.close()
+
+
+if __name__ == '__main__':
+    print('Start running pool tests')
+    unittest.main()
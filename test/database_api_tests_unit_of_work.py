@@ -0,0 +1,124 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import sqlite3
+import unittest
+from chessApi import database
+
+DB_PATH = 'db/chessApi_test.db'
+USER1_NICKNAME = 'Mystery'
+NEW_NICKNAME = 'Enigma'
+
+
+class UnitOfWorkTestCase(unittest.TestCase):
+    """Test cases for the request-scoped unit of work."""
+    @classmethod
+    def setUpClass(cls):
+        """ Creates the database structure. Removes first any preexisting
+            database file
+        """
+        print("Testing ", cls.__name__)
+        engine = database.Engine(DB_PATH)
+        engine.remove_database()
+        engine.create_tables()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the testing database"""
+        print("Testing ENDED for ", cls.__name__)
+        engine = database.Engine(DB_PATH)
+        engine.remove_database()
+        engine.create_tables()
+
+    def setUp(self):
+        """Populates the database and starts a unit of work"""
+        self.engine = database.Engine(DB_PATH, exercise_cache_size=0)
+        self.engine.populate_tables()
+        self.statements = []
+        connection = self.engine.checkout()
+        connection.con.set_trace_callback(self.statements.append)
+        self.uow = database.UnitOfWork(connection)
+
+    def tearDown(self):
+        """Ends the unit of work and removes all records from database"""
+        self.uow.connection.con.set_trace_callback(None)
+        if not self.uow.isclosed():
+            self.uow.close()
+        self.engine.dispose_pool()
+        self.engine.clear()
+
+    def _count_selects(self, table):
+        """
+        Counts the SELECT statements reading `table` executed in the unit of work.
+        :param table: The name of the table.
+        """
+        return len([s for s in self.statements if s.startswith('SELECT') and 'FROM ' + table in s])
+
+    def test_user_memoized(self):
+        """Checks if a user is read only once in a unit of work"""
+        print('(' + self.test_user_memoized.__name__ + ')', self.test_user_memoized.__doc__)
+        user = self.uow.get_user(USER1_NICKNAME)
+        self.assertIs(user, self.uow.get_user(USER1_NICKNAME))
+        self.assertIsNone(self.uow.get_user(NEW_NICKNAME))
+        self.assertIsNone(self.uow.get_user(NEW_NICKNAME))
+        self.assertEqual(2, self._count_selects('users'))
+
+    def test_exercise_memoized(self):
+        """Checks if an exercise is read only once in a unit of work"""
+        print('(' + self.test_exercise_memoized.__name__ + ')', self.test_exercise_memoized.__doc__)
+        exercise = self.uow.get_exercise(1)
+        self.assertIs(exercise, self.uow.get_exercise('1'))
+        self.assertEqual(1, self._count_selects('exercises'))
+
+    def test_write_forgets_memo(self):
+        """Checks if the memoized rows are read again after they are modified"""
+        print('(' + self.test_write_forgets_memo.__name__ + ')', self.test_write_forgets_memo.__doc__)
+        exercise = self.uow.get_exercise(1)
+        self.uow.modify_exercise(1, 'Renamed', None, exercise['initial_state'], exercise['list_moves'])
+        self.assertEqual('Renamed', self.uow.get_exercise(1)['title'])
+        self.uow.get_user(USER1_NICKNAME)
+        self.uow.modify_user(USER1_NICKNAME, NEW_NICKNAME, 'enigma@mymail.com')
+        self.assertIsNone(self.uow.get_user(USER1_NICKNAME))
+        self.assertEqual(NEW_NICKNAME, self.uow.get_exercise(1)['author'])
+
+    def test_release(self):
+        """Checks if the connection can be returned to the pool during the work"""
+        print('(' + self.test_release.__name__ + ')', self.test_release.__doc__)
+        user = self.uow.get_user(USER1_NICKNAME)
+        self.uow.delete_exercise(1)
+        self.uow.connection.con.set_trace_callback(None)
+        self.uow.release()
+        self.assertEqual(0, self.engine.pool_stats()['in_use'])
+        self.assertRaises(sqlite3.ProgrammingError, self.uow.get_exercise, 2)
+        self.uow._checkout = self.engine.checkout
+        self.assertIs(user, self.uow.get_user(USER1_NICKNAME))
+        self.assertIsNone(self.uow.get_exercise(1))
+        self.assertEqual(1, self.engine.pool_stats()['in_use'])
+
+    def test_close_commits(self):
+        """Checks if the modifications are committed when the unit of work ends"""
+        print('(' + self.test_close_commits.__name__ + ')', self.test_close_commits.__doc__)
+        self.uow.delete_exercise(1)
+        self.uow.close()
+        con = self.engine.connect()
+        self.assertIsNone(con.get_exercise(1))
+        con.close()
+
+    def test_close_rolls_back(self):
+        """Checks if the modifications are rolled back when the unit of work fails"""
+        print('(' + self.test_close_rolls_back.__name__ + ')', self.test_close_rolls_back.__doc__)
+        self.uow.delete_exercise(1)
+        self.uow.append_user(NEW_NICKNAME, 'enigma@mymail.com')
+        self.uow.close(RuntimeError('request failed'))
+        con = self.engine.connect()
+        self.assertIsNotNone(con.get_exercise(1))
+        self.assertIsNone(con.get_user(NEW_NICKNAME))
+        con.close()
+
+
+if __name__ == '__main__':
+    print('Start running unit of work tests')
+    unittest.main()
@@ -14,11 +14,13 @@ ENGINE = database.Engine(DB_PATH)
 # CONSTANTS DEFINING DIFFERENT USERS
 USER1_NICKNAME = 'Mystery'
 USER1_ID = 1
-USER1 = {'registrationdate': 1362015937, 'nickname': USER1_NICKNAME, 'email': 'mystery@mymail.com'}
+USER1 = {'registrationdate': 1362015937, 'nickname': USER1_NICKNAME, 'email': 'mystery@mymail.com',
+         'version': 1, 'modified': 1362015937}
 
 USER2_NICKNAME = 'AxelW'
 USER2_ID = 2
-USER2 = {'registrationdate': 1357724086, 'nickname': USER2_NICKNAME, 'email': 'axelw@mymail.com'}
+USER2 = {'registrationdate': 1357724086, 'nickname': USER2_NICKNAME, 'email': 'axelw@mymail.com',
+         'version': 1, 'modified': 1357724086}
 
 NEW_USER_NICKNAME = 'sully'
 NEW_USER_MAIL = 'sully@rda.com'
@@ -120,6 +122,30 @@ class UserDbApiTestCase(unittest.TestCase):
         ENGINE.clear()
         self.assertListEqual([], self.connection.get_users())
 
+    def test_get_users_page(self):
+        """Test that get_users_page returns the users page by page in id order"""
+        print('(' + self.test_get_users_page.__name__ + ')',
+              self.test_get_users_page.__doc__)
+        users, prev_cursor, next_cursor = self.connection.get_users_page(2)
+        self.assertEqual([USER1_NICKNAME, USER2_NICKNAME], [user['nickname'] for user in users])
+        self.assertIsNone(prev_cursor)
+        self.assertEqual(USER2_ID, next_cursor)
+        users, prev_cursor, next_cursor = self.connection.get_users_page(2, after=4)
+        self.assertEqual(['HockeyFan'], [user['nickname'] for user in users])
+        self.assertEqual(5, prev_cursor)
+        self.assertIsNone(next_cursor)
+        users, prev_cursor, next_cursor = self.connection.get_users_page(2, before=5)
+        self.assertEqual(['LinuxPenguin', 'Koodari'], [user['nickname'] for user in users])
+        self.assertEqual(3, prev_cursor)
+        self.assertEqual(4, next_cursor)
+
+    def test_get_users_page_empty(self):
+        """Test that get_users_page returns an empty page without cursors when there are no users"""
+        print('(' + self.test_get_users_page_empty.__name__ + ')',
+              self.test_get_users_page_empty.__doc__)
+        ENGINE.clear()
+        self.assertEqual(([], None, None), self.connection.get_users_page(2))
+
     def test_delete_user(self):
         """Test that the user can be deleted"""
         print('(' + self.test_delete_user.__name__ + ')',
@@ -163,10 +189,27 @@ class UserDbApiTestCase(unittest.TestCase):
         user = self.connection.get_user(NEW_USER_NICKNAME)
         self.assertDictContainsSubset(NEW_USER, user)
 
+    def test_modify_user_version(self):
+        """Test that modifying an user bumps its version, and a modification of an older version is refused"""
+        print('(' + self.test_modify_user_version.__name__ + ')', self.test_modify_user_version.__doc__)
+        self.assertTrue(self.connection.modify_user(USER1_NICKNAME, USER1_NICKNAME, NEW_USER_MAIL, 1))
+        user = self.connection.get_user(USER1_NICKNAME)
+        self.assertEqual(2, user['version'])
+        self.assertGreater(user['modified'], USER1['registrationdate'])
+        self.assertFalse(self.connection.modify_user(USER1_NICKNAME, NEW_USER_NICKNAME, NEW_USER_MAIL, 1))
+        self.assertIsNone(self.connection.get_user(NEW_USER_NICKNAME))
+
     def test_modify_user_existing(self):
-        """Test if changing an user's nickname to an existing one yields error"""
+        """Test if changing an user's nickname to an existing one raises a conflict"""
         print('(' + self.test_modify_user_existing.__name__ + ')', self.test_modify_user_existing.__doc__)
-        self.assertFalse(self.connection.modify_user(USER1_NICKNAME, USER2_NICKNAME, NEW_USER_MAIL))
+        self.assertRaises(database.ConflictError,
+                          self.connection.modify_user, USER1_NICKNAME, USER2_NICKNAME, NEW_USER_MAIL)
+
+    def test_nickname_exists(self):
+        """Test the indexed existence check of nicknames"""
+        print('(' + self.test_nickname_exists.__name__ + ')', self.test_nickname_exists.__doc__)
+        self.assertTrue(self.connection.nickname_exists(USER1_NICKNAME))
+        self.assertFalse(self.connection.nickname_exists(NEW_USER_NICKNAME))
 
 
 if __name__ == '__main__':
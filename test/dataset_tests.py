@@ -0,0 +1,94 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from chessApi import chess_data, database, dataset
+
+
+class DatasetTestCase(unittest.TestCase):
+    """Test cases for the generator of synthetic databases."""
+    @classmethod
+    def setUpClass(cls):
+        print("Testing ", cls.__name__)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Testing ENDED for ", cls.__name__)
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _dump(self, path):
+        con = sqlite3.connect(path)
+        try:
+            return [con.execute('SELECT * FROM %s ORDER BY 1, 2' % table).fetchall()
+                    for table in ('users', 'exercises', 'solution_edges')]
+        finally:
+            con.close()
+
+    def test_seed_mates_valid(self):
+        """Checks if the mates the exercises are generated from are valid"""
+        print('(' + self.test_seed_mates_valid.__name__ + ')', self.test_seed_mates_valid.__doc__)
+        for _, initial_state, list_moves in dataset.SEED_MATES:
+            self.assertTrue(chess_data.check_chess_data(initial_state, list_moves), initial_state)
+
+    def test_mutations_valid(self):
+        """Checks if the mutated mates are valid and different"""
+        print('(' + self.test_mutations_valid.__name__ + ')', self.test_mutations_valid.__doc__)
+        rnd = random.Random(0)
+        exercises = set()
+        for _ in range(200):
+            _, initial_state, list_moves = rnd.choice(dataset.SEED_MATES)
+            exercise = dataset.mutate(rnd, initial_state, list_moves)
+            self.assertTrue(chess_data.check_chess_data(*exercise), exercise)
+            exercises.add(exercise)
+        self.assertGreater(len(exercises), 150)
+
+    def test_generate(self):
+        """Checks if the generated database is served by the database API"""
+        print('(' + self.test_generate.__name__ + ')', self.test_generate.__doc__)
+        path = os.path.join(self.folder, 'generated.db')
+        report = dataset.generate(path, 20, 300, processes=0, chunk_size=64)
+        self.assertEqual(300, report['exercises'])
+        engine = database.Engine(path)
+        self.assertEqual(len(database.MIGRATIONS), engine.schema_version())
+        con = engine.connect()
+        try:
+            self.assertEqual(20, len(con.get_users()))
+            self.assertEqual(300, len(con.get_exercises()))
+            exercise = con.get_exercise(300)
+            solution = con.get_solution(300)
+            self.assertIsNotNone(solution)
+            self.assertEqual(chess_data.compile_solution(exercise['initial_state'], exercise['list_moves']),
+                             solution.edges)
+        finally:
+            con.close()
+        self.assertRaises(ValueError, dataset.generate, path, 20, 300)
+
+    def test_deterministic(self):
+        """Checks if the same seed gives the same database with any number of processes"""
+        print('(' + self.test_deterministic.__name__ + ')', self.test_deterministic.__doc__)
+        serial = os.path.join(self.folder, 'serial.db')
+        parallel = os.path.join(self.folder, 'parallel.db')
+        other = os.path.join(self.folder, 'other.db')
+        dataset.generate(serial, 30, 200, seed=7, processes=0, chunk_size=50)
+        dataset.generate(parallel, 30, 200, seed=7, processes=2, chunk_size=50)
+        dataset.generate(other, 30, 200, seed=8, processes=0, chunk_size=50)
+        self.assertEqual(self._dump(serial), self._dump(parallel))
+        self.assertNotEqual(self._dump(serial)[1], self._dump(other)[1])
+
+
+if __name__ == '__main__':
+    print('Start running dataset tests')
+    unittest.main()
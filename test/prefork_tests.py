@@ -0,0 +1,90 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import os
+import shutil
+import signal
+import tempfile
+import time
+import unittest
+import urllib.request
+from chessApi import prefork
+
+
+def _pid_app(environ, start_response):
+    """Answers the pid of the worker serving the request."""
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid()).encode('ascii')]
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'requires fork')
+class PreforkServerTestCase(unittest.TestCase):
+    """Test cases for the pre-forking server."""
+    def setUp(self):
+        self.exited = tempfile.mkdtemp()
+        self.server = prefork.PreforkServer(lambda: _pid_app, port=0, workers=2, graceful_timeout=5,
+                                            worker_exit=self._worker_exit)
+        self.port = self.server.bind()[1]
+        self.master = os.fork()
+        if self.master == 0:
+            try:
+                self.server.run()
+            finally:
+                os._exit(0)
+        self.server.socket.close()
+
+    def tearDown(self):
+        try:
+            os.kill(self.master, signal.SIGKILL)
+            os.waitpid(self.master, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+        shutil.rmtree(self.exited)
+
+    def _worker_exit(self, app):
+        """Records the exit of the worker."""
+        open(os.path.join(self.exited, str(os.getpid())), 'w').close()
+
+    def _get(self):
+        with urllib.request.urlopen('http://127.0.0.1:%d/' % self.port, timeout=5) as resp:
+            return int(resp.read())
+
+    def _workers_after(self, condition, timeout=5.0):
+        """Requests until the set of the workers answering satisfies the condition."""
+        deadline = time.monotonic() + timeout
+        pids = set()
+        while time.monotonic() < deadline:
+            pids.add(self._get())
+            if condition(pids):
+                return pids
+        self.fail('The workers did not answer as expected: %s' % pids)
+
+    def test_workers_serve_requests(self):
+        """Checks if the requests are served by the forked workers"""
+        print('(' + self.test_workers_serve_requests.__name__ + ')', self.test_workers_serve_requests.__doc__)
+        pids = self._workers_after(lambda pids: len(pids) == 2)
+        self.assertNotIn(self.master, pids)
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_graceful_restart_and_shutdown(self):
+        """Checks if SIGHUP replaces the workers and SIGTERM stops the server"""
+        print('(' + self.test_graceful_restart_and_shutdown.__name__ + ')',
+              self.test_graceful_restart_and_shutdown.__doc__)
+        old = self._workers_after(lambda pids: len(pids) == 2)
+        os.kill(self.master, signal.SIGHUP)
+        time.sleep(2 * prefork.POLL_INTERVAL)
+        self._workers_after(lambda pids: len(pids - old) == 2)
+        os.kill(self.master, signal.SIGTERM)
+        _, status = os.waitpid(self.master, 0)
+        self.assertEqual(0, status)
+        self.assertRaises(OSError, self._get)
+        # every stopped worker ran the exit hook
+        self.assertEqual(4, len(os.listdir(self.exited)))
+
+
+if __name__ == '__main__':
+    print('Start running prefork tests')
+    unittest.main()
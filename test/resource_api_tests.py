@@ -3,12 +3,18 @@ Created on 09.04.2018
 @author: lorinc
 """
 
+import gzip
+import os
+import shutil
+import tempfile
 import unittest
 import json
 import flask
 import urllib.parse
 import chessApi.database as database
 import chessApi.resources as resources
+import chessApi.solver as solver
+import chessApi.validation as validation
 
 DB_PATH = 'db/chessApi_test.db'
 ENGINE = database.Engine(DB_PATH)
@@ -46,7 +52,8 @@ GOT_EXERCISES = {
                     'list-moves': {
                         'type': 'string',
                         'title': 'List of moves',
-                        'description': 'comma-separated SAN entries movelist of the exercise solution'
+                        'description': 'comma-separated SAN entries movelist of the exercise solution, '
+                                       'alternative lines separated by semicolons'
                     },
                     'initial-state': {
                         'type': 'string',
@@ -178,7 +185,8 @@ GOT_EXERCISE = {
                     },
                     'list-moves': {
                         'type': 'string',
-                        'description': 'comma-separated SAN entries movelist of the exercise solution',
+                        'description': 'comma-separated SAN entries movelist of the exercise solution, '
+                                       'alternative lines separated by semicolons',
                         'title': 'List of moves'
                     }
                 }
@@ -206,6 +214,11 @@ GOT_EXERCISE = {
             'method': 'GET',
             'href': '/api/exercises/1/solver{?solution}',
             'title': 'Exercise Solver'
+        },
+        'chessapi:solver-session': {
+            'method': 'POST',
+            'href': '/api/exercises/1/solver/sessions/',
+            'title': 'Start solving the exercise'
         }
     },
     'headline': 'Fool Mate'
@@ -490,6 +503,41 @@ class ResourcesApiTestCase(unittest.TestCase):
         ENGINE.clear()
         self.app_context.pop()
 
+    def _count_statements(self, url, method='get', match='', **kwargs):
+        """
+        Sends a request to `url`, and counts the SQL statements executed while serving it.
+        :param url: The url to send the request to.
+        :param method: The name of the test client method sending the request.
+        :param match: Only the statements containing this string are counted.
+        :param kwargs: Passed on to the test client method.
+        :return: tuple of the flask.Response object and the number of executed statements.
+        """
+        statements = []
+        checkout = ENGINE.checkout
+
+        def traced_checkout(*args, **kwargs):
+            con = checkout(*args, **kwargs)
+            con.con.set_trace_callback(statements.append)
+            return con
+
+        ENGINE.checkout = traced_checkout
+        try:
+            resp = getattr(self.client, method)(url, **kwargs)
+        finally:
+            del ENGINE.checkout
+            ENGINE.dispose_pool()
+        return resp, len([statement for statement in statements if match in statement])
+
+    def _add_exercises(self, count):
+        """
+        Inserts `count` additional exercises submitted by the user 'Mystery'.
+        :param count: The number of exercises to add.
+        """
+        con = ENGINE.connect()
+        for i in range(count):
+            con.create_exercise('Extra %d' % i, None, 'Mystery', DEFAULT_BOARD_FEN, FOOLS_MATE_MOVES)
+        con.close()
+
     def _assertErrorMessage(self, resp, code, message):
         """
         Convenience method for asserting on MASON responses of 40X status codes.
@@ -507,11 +555,24 @@ class ExercisesTestCase(ResourcesApiTestCase):
         """Tests if the default database contains chess data reported as valid"""
         print('(' + self.test_database_contains_valid_chess_data.__name__ + ')',
               self.test_database_contains_valid_chess_data.__doc__)
-        engine = database.Engine()
-        con = engine.connect()
-        for exercise_list_item in con.get_exercises():
-            exercise_data = con.get_exercise(exercise_list_item['exercise_id'])
-            self.assertTrue(resources._check_chess_data(exercise_data['initial_state'], exercise_data['list_moves']))
+        # the tracked database is left untouched, the copy is migrated
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'chessApi.db')
+            shutil.copyfile(database.DEFAULT_DB_PATH, path)
+            engine = database.Engine(path)
+            engine.migrate()
+            con = engine.connect()
+            try:
+                for exercise_list_item in con.get_exercises():
+                    exercise_data = con.get_exercise(exercise_list_item['exercise_id'])
+                    self.assertTrue(resources._check_chess_data(exercise_data['initial_state'],
+                                                                exercise_data['list_moves']))
+            finally:
+                con.close()
+                engine.dispose_pool()
+        finally:
+            shutil.rmtree(folder)
 
     def test_check_chess_data_default_board(self):
         """Tests if checkmate from default board state is reported as correct"""
@@ -537,6 +598,20 @@ class ExercisesTestCase(ResourcesApiTestCase):
               self.test_check_chess_data_non_checkmate.__doc__)
         self.assertFalse(resources._check_chess_data(DEFAULT_BOARD_FEN, NON_CHECKMATE_RESULT))
 
+    def test_check_chess_data_alternatives(self):
+        """Tests if alternative lines are valid only if each of them ends in checkmate"""
+        print('(' + self.test_check_chess_data_alternatives.__name__ + ')',
+              self.test_check_chess_data_alternatives.__doc__)
+        self.assertTrue(resources._check_chess_data(DEFAULT_BOARD_FEN, FOOLS_MATE_MOVES + ';g4,e5,f3,Qh4#'))
+        self.assertFalse(resources._check_chess_data(DEFAULT_BOARD_FEN, FOOLS_MATE_MOVES + ';g4,e5,f3'))
+        self.assertFalse(resources._check_chess_data(DEFAULT_BOARD_FEN, FOOLS_MATE_MOVES + ';'))
+
+    def test_check_chess_data_inconsistent_replies(self):
+        """Tests if alternative lines disagreeing on the reply of the opponent are reported as invalid"""
+        print('(' + self.test_check_chess_data_inconsistent_replies.__name__ + ')',
+              self.test_check_chess_data_inconsistent_replies.__doc__)
+        self.assertFalse(resources._check_chess_data(DEFAULT_BOARD_FEN, FOOLS_MATE_MOVES + ';f3,e6,g4,Qh4#'))
+
     def test_url(self):
         """Checks that the URL points to the right resource"""
         print('('+self.test_url.__name__+')', self.test_url.__doc__)
@@ -555,6 +630,127 @@ class ExercisesTestCase(ResourcesApiTestCase):
         data = json.loads(resp.data.decode('utf-8'))
         self.assertDictEqual(data, GOT_EXERCISES)
 
+    def test_get_exercises_query_count(self):
+        """Checks if the exercise list is served with a constant number of SQL statements"""
+        print('(' + self.test_get_exercises_query_count.__name__ + ')', self.test_get_exercises_query_count.__doc__)
+        resp, statements_before = self._count_statements(flask.url_for('exercises'))
+        self.assertEqual(200, resp.status_code)
+        self._add_exercises(20)
+        resp, statements_after = self._count_statements(flask.url_for('exercises'))
+        self.assertEqual(len(GOT_EXERCISES['items']) + 20, len(json.loads(resp.data.decode('utf-8'))['items']))
+        self.assertEqual(statements_before, statements_after)
+
+    def test_get_exercises_cached(self):
+        """Checks if the encoded exercise list is cached until an exercise or its author is modified"""
+        print('(' + self.test_get_exercises_cached.__name__ + ')', self.test_get_exercises_cached.__doc__)
+        url = flask.url_for('exercises') + '?limit=2'
+        self.client.get(url)
+        resp, reads = self._count_statements(url, match='FROM exercises')
+        self.assertEqual(0, reads)
+        self.assertListEqual(GOT_EXERCISES['items'][:2], json.loads(resp.data.decode('utf-8'))['items'])
+        # a modification of an exercise on another page keeps the page
+        self.client.put(resources.api.url_for(resources.Exercise, exerciseid=3),
+                        headers={CONTENT_TYPE: resources.JSON}, data=json.dumps(MODIFY_EXERCISE_VALID_DATA))
+        self.assertEqual(0, self._count_statements(url, match='FROM exercises')[1])
+        self.client.put(resources.api.url_for(resources.Exercise, exerciseid=1),
+                        headers={CONTENT_TYPE: resources.JSON}, data=json.dumps(MODIFY_EXERCISE_VALID_DATA))
+        data = json.loads(self.client.get(url).data.decode('utf-8'))
+        self.assertEqual(MODIFY_EXERCISE_VALID_DATA['headline'], data['items'][0]['headline'])
+        self.client.put(resources.api.url_for(resources.User, nickname='Mystery'),
+                        headers={CONTENT_TYPE: resources.JSON}, data=json.dumps(MODIFY_USER_VALID_DATA))
+        data = json.loads(self.client.get(url).data.decode('utf-8'))
+        self.assertEqual(MODIFY_USER_VALID_DATA['nickname'], data['items'][0]['author'])
+        self._add_exercises(1)
+        data = json.loads(self.client.get(flask.url_for('exercises')).data.decode('utf-8'))
+        self.assertEqual(len(GOT_EXERCISES['items']) + 1, len(data['items']))
+        stats = ENGINE.response_cache_stats()
+        self.assertGreater(stats['hits'], 0)
+        self.assertGreater(stats['rebuild_time'], 0.0)
+
+    def test_get_exercises_modified_by_other_process(self):
+        """Checks if the cached exercise list and exercise are dropped after a modification by another process"""
+        print('(' + self.test_get_exercises_modified_by_other_process.__name__ + ')',
+              self.test_get_exercises_modified_by_other_process.__doc__)
+        url = flask.url_for('exercises') + '?limit=2'
+        exercise_url = resources.api.url_for(resources.Exercise, exerciseid=1)
+        self.client.get(url)
+        etag = self.client.get(exercise_url).headers.get('ETag')
+        # the connection of another engine stands for another worker process of the server
+        con = database.Engine(ENGINE.db_path).connect()
+        exercise = con.get_exercise(1)
+        con.modify_exercise(1, 'Modified elsewhere', exercise['description'], exercise['initial_state'],
+                            exercise['list_moves'])
+        con.close()
+        data = json.loads(self.client.get(url).data.decode('utf-8'))
+        self.assertEqual('Modified elsewhere', data['items'][0]['headline'])
+        resp = self.client.get(exercise_url)
+        self.assertEqual('Modified elsewhere', json.loads(resp.data.decode('utf-8'))['headline'])
+        self.assertNotEqual(etag, resp.headers.get('ETag'))
+
+    def test_get_exercises_compressed(self):
+        """Checks if the exercise list is compressed when the client accepts gzip, and compressed once"""
+        print('(' + self.test_get_exercises_compressed.__name__ + ')', self.test_get_exercises_compressed.__doc__)
+        url = flask.url_for('exercises')
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+        resp = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual('gzip', resp.headers['Content-Encoding'])
+        self.assertIn('Accept-Encoding', resp.headers['Vary'])
+        self.assertEqual(resources.MASON + ';' + resources.EXERCISE_PROFILE, resp.headers.get(CONTENT_TYPE))
+        self.assertEqual(plain.data, gzip.decompress(resp.data))
+        variants = ENGINE.response_cache_stats()['variants']
+        self.assertEqual(resp.data, self.client.get(url, headers={'Accept-Encoding': 'gzip'}).data)
+        self.assertEqual(variants, ENGINE.response_cache_stats()['variants'])
+        # a page smaller than the threshold is sent as it is
+        min_size = resources.app.config['CompressionMinSize']
+        resources.app.config['CompressionMinSize'] = len(plain.data)
+        try:
+            resp = self.client.get(url + '?limit=1', headers={'Accept-Encoding': 'gzip'})
+        finally:
+            resources.app.config['CompressionMinSize'] = min_size
+        self.assertNotIn('Content-Encoding', resp.headers)
+        self.assertEqual(1, len(json.loads(resp.data.decode('utf-8'))['items']))
+
+    def test_get_exercises_paginated(self):
+        """Checks if the exercise list can be paged through with the next and prev controls"""
+        print('(' + self.test_get_exercises_paginated.__name__ + ')', self.test_get_exercises_paginated.__doc__)
+        resp = self.client.get(flask.url_for('exercises') + '?limit=2')
+        self.assertEqual(200, resp.status_code)
+        data = json.loads(resp.data.decode('utf-8'))
+        self.assertListEqual(GOT_EXERCISES['items'][:2], data['items'])
+        self.assertNotIn('prev', data['@controls'])
+        resp = self.client.get(data['@controls']['next']['href'])
+        self.assertEqual(200, resp.status_code)
+        data = json.loads(resp.data.decode('utf-8'))
+        self.assertListEqual(GOT_EXERCISES['items'][2:], data['items'])
+        self.assertNotIn('next', data['@controls'])
+        resp = self.client.get(data['@controls']['prev']['href'])
+        data = json.loads(resp.data.decode('utf-8'))
+        self.assertListEqual(GOT_EXERCISES['items'][:2], data['items'])
+
+    def test_get_exercises_bad_page_query(self):
+        """Checks error message when the pagination query is invalid. Displays error code 400."""
+        print('(' + self.test_get_exercises_bad_page_query.__name__ + ')',
+              self.test_get_exercises_bad_page_query.__doc__)
+        resp = self.client.get(flask.url_for('exercises') + '?limit=0')
+        self._assertErrorMessage(resp, 400, 'Bad query')
+        resp = self.client.get(flask.url_for('exercises') + '?after=first')
+        self._assertErrorMessage(resp, 400, 'Bad query')
+
+    def test_export_exercises(self):
+        """Checks if the exercise catalog is streamed as newline-delimited JSON"""
+        print('(' + self.test_export_exercises.__name__ + ')', self.test_export_exercises.__doc__)
+        resp = self.client.get(resources.api.url_for(resources.ExercisesExport))
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('application/x-ndjson', resp.headers.get(CONTENT_TYPE))
+        lines = resp.data.decode('utf-8').splitlines()
+        self.assertEqual(len(GOT_EXERCISES['items']), len(lines))
+        exercise = json.loads(lines[0])
+        self.assertEqual(GOT_EXERCISE['headline'], exercise['title'])
+        self.assertEqual(GOT_EXERCISE['list-moves'], exercise['list_moves'])
+        self.assertEqual(GOT_EXERCISE['initial-state'], exercise['initial_state'])
+
     def test_add_exercise_valid(self):
         """Check if valid exercise data can be added"""
         print('(' + self.test_add_exercise_valid.__name__ + ')', self.test_add_exercise_valid.__doc__)
@@ -564,6 +760,74 @@ class ExercisesTestCase(ResourcesApiTestCase):
         self.assertEqual(201, resp.status_code)
         self.assertEqual(ADDED_EXERCISE_LOCATION, resp.headers.get('Location'))
 
+    def test_add_exercise_single_user_lookup(self):
+        """Check if the author of a new exercise is looked up only once while serving the request"""
+        print('(' + self.test_add_exercise_single_user_lookup.__name__ + ')',
+              self.test_add_exercise_single_user_lookup.__doc__)
+        resp, statements = self._count_statements(resources.api.url_for(resources.Exercises), 'post',
+                                                  'FROM users WHERE users.nickname',
+                                                  headers={CONTENT_TYPE: resources.JSON},
+                                                  data=json.dumps(ADD_EXERCISE_VALID_DATA))
+        self.assertEqual(201, resp.status_code)
+        self.assertEqual(1, statements)
+
+    def test_add_exercise_too_many_moves(self):
+        """Check if a submission with too many moves is rejected before validating it. Displays error code 400."""
+        print('(' + self.test_add_exercise_too_many_moves.__name__ + ')',
+              self.test_add_exercise_too_many_moves.__doc__)
+        request_data = ADD_EXERCISE_VALID_DATA.copy()
+        request_data['list-moves'] = ','.join(['Nf3', 'Nf6', 'Ng1', 'Ng8'] * 100)
+        resp = self.client.post(resources.api.url_for(resources.Exercises),
+                                headers={CONTENT_TYPE: resources.JSON},
+                                data=json.dumps(request_data))
+        self._assertErrorMessage(resp, 400, 'Chess data too costly')
+
+    def test_add_exercise_validated_without_connection(self):
+        """Check if no database connection is held while the chess data of a submission is validated"""
+        print('(' + self.test_add_exercise_validated_without_connection.__name__ + ')',
+              self.test_add_exercise_validated_without_connection.__doc__)
+        validator = resources.app.config['Validator']
+        connections_in_use = []
+
+        def check(*args, **kwargs):
+            connections_in_use.append(ENGINE.pool_stats()['in_use'])
+            return validation.Validator.check(validator, *args, **kwargs)
+
+        validator.check = check
+        try:
+            resp = self.client.post(resources.api.url_for(resources.Exercises),
+                                    headers={CONTENT_TYPE: resources.JSON},
+                                    data=json.dumps(ADD_EXERCISE_VALID_DATA))
+        finally:
+            del validator.check
+        self.assertEqual(201, resp.status_code)
+        self.assertEqual([0], connections_in_use)
+
+    def test_add_exercise_validation_pool_broken(self):
+        """Check if a submission is rejected with error code 503 when a validation worker died"""
+        print('(' + self.test_add_exercise_validation_pool_broken.__name__ + ')',
+              self.test_add_exercise_validation_pool_broken.__doc__)
+        previous, validator = resources.app.config['Validator'], validation.Validator(workers=1)
+        pool = validator._get_pool()
+        pool.submit(os.getpid).result()
+        for process in list(pool._processes.values()):
+            process.kill()
+            process.join()
+        resources.app.config['Validator'] = validator
+        try:
+            resp = self.client.post(resources.api.url_for(resources.Exercises),
+                                    headers={CONTENT_TYPE: resources.JSON},
+                                    data=json.dumps(ADD_EXERCISE_VALID_DATA))
+            self._assertErrorMessage(resp, 503, 'Validation busy')
+            # the next submission is validated by a new pool
+            resp = self.client.post(resources.api.url_for(resources.Exercises),
+                                    headers={CONTENT_TYPE: resources.JSON},
+                                    data=json.dumps(ADD_EXERCISE_VALID_DATA))
+            self.assertEqual(201, resp.status_code)
+        finally:
+            resources.app.config['Validator'] = previous
+            validator.shutdown()
+
     def test_add_exercise_not_json(self):
         """Check if error code is correct when Content-Type is not set. Displays error code 415"""
         print('(' + self.test_add_exercise_not_json.__name__ + ')', self.test_add_exercise_not_json.__doc__)
@@ -571,6 +835,14 @@ class ExercisesTestCase(ResourcesApiTestCase):
                                 data=json.dumps(ADD_EXERCISE_VALID_DATA))
         self._assertErrorMessage(resp, 415, 'Wrong request format')
 
+    def test_add_exercise_malformed_json(self):
+        """Check if a body which is not valid JSON is rejected with error code 400"""
+        print('(' + self.test_add_exercise_malformed_json.__name__ + ')', self.test_add_exercise_malformed_json.__doc__)
+        resp = self.client.post(resources.api.url_for(resources.Exercises),
+                                headers={CONTENT_TYPE: resources.JSON},
+                                data=json.dumps(ADD_EXERCISE_VALID_DATA)[:-1])
+        self.assertEqual(400, resp.status_code)
+
     def test_add_exercise_missing_fields(self):
         """Check if error code is correct when not all fields are provided in request. Displays error code 400."""
         print('(' + self.test_add_exercise_missing_fields.__name__ + ')', self.test_add_exercise_missing_fields.__doc__)
@@ -633,6 +905,28 @@ class ExercisesTestCase(ResourcesApiTestCase):
         data = json.loads(resp.data.decode('utf-8'))
         self.assertDictEqual(GOT_EXERCISE, data)
 
+    def test_get_exercise_conditional(self):
+        """Check if a conditional GET of the current version of an exercise is answered with 304"""
+        print('(' + self.test_get_exercise_conditional.__name__ + ')', self.test_get_exercise_conditional.__doc__)
+        url = resources.api.url_for(resources.Exercise, exerciseid=1)
+        resp = self.client.get(url)
+        etag = resp.headers['ETag']
+        self.assertEqual('"1-1519061565"', etag)
+        self.assertEqual('Mon, 19 Feb 2018 17:32:45 GMT', resp.headers['Last-Modified'])
+        resp = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(b'', resp.data)
+        self.assertEqual(etag, resp.headers['ETag'])
+        resp = self.client.get(url, headers={'If-Modified-Since': 'Mon, 19 Feb 2018 17:32:45 GMT'})
+        self.assertEqual(304, resp.status_code)
+        resp = self.client.get(url, headers={'If-Modified-Since': 'Mon, 19 Feb 2018 17:32:44 GMT'})
+        self.assertEqual(200, resp.status_code)
+        # a modification changes the entity tag
+        self.client.put(url, headers={CONTENT_TYPE: resources.JSON}, data=json.dumps(MODIFY_EXERCISE_VALID_DATA))
+        resp = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(200, resp.status_code)
+        self.assertNotEqual(etag, resp.headers['ETag'])
+
     def test_get_exercise_non_existing(self):
         """Check error code when 404ing exercise"""
         print('(' + self.test_get_exercise_non_existing.__name__ + ')', self.test_get_exercise_non_existing.__doc__)
@@ -655,6 +949,21 @@ class ExercisesTestCase(ResourcesApiTestCase):
         self.assertEqual(MODIFY_EXERCISE_VALID_DATA['list-moves'], data['list-moves'])
         self.assertEqual(MODIFY_EXERCISE_VALID_DATA['initial-state'], data['initial-state'])
 
+    def test_modify_exercise_if_match(self):
+        """Check if a modification of an outdated version of an exercise is refused with 412"""
+        print('(' + self.test_modify_exercise_if_match.__name__ + ')', self.test_modify_exercise_if_match.__doc__)
+        url = resources.api.url_for(resources.Exercise, exerciseid=1)
+        etag = self.client.get(url).headers['ETag']
+        resp = self.client.put(url, headers={CONTENT_TYPE: resources.JSON, 'If-Match': etag},
+                               data=json.dumps(MODIFY_EXERCISE_VALID_DATA))
+        self.assertEqual(204, resp.status_code)
+        resp = self.client.put(url, headers={CONTENT_TYPE: resources.JSON, 'If-Match': etag},
+                               data=json.dumps(MODIFY_EXERCISE_VALID_DATA))
+        self._assertErrorMessage(resp, 412, 'Precondition failed')
+        resp = self.client.put(url, headers={CONTENT_TYPE: resources.JSON, 'If-Match': '*'},
+                               data=json.dumps(MODIFY_EXERCISE_VALID_DATA))
+        self.assertEqual(204, resp.status_code)
+
     def test_modify_exercise_non_existing(self):
         """Checks if error message is correct when trying to modify non-existing exercise. Displays error code 404."""
         print('(' + self.test_modify_exercise_non_existing.__name__ + ')',
@@ -698,6 +1007,27 @@ class ExercisesTestCase(ResourcesApiTestCase):
                                data=json.dumps(request_data))
         self._assertErrorMessage(resp, 409, 'Existing exercise headline')
 
+    def test_modify_exercise_same_title(self):
+        """Checks if an exercise can be modified while keeping its headline."""
+        print('(' + self.test_modify_exercise_same_title.__name__ + ')', self.test_modify_exercise_same_title.__doc__)
+        request_data = MODIFY_EXERCISE_VALID_DATA.copy()
+        request_data['headline'] = GOT_EXERCISE['headline']
+        resp = self.client.put(resources.api.url_for(resources.Exercise, exerciseid=1),
+                               headers={CONTENT_TYPE: resources.JSON},
+                               data=json.dumps(request_data))
+        self.assertEqual(204, resp.status_code)
+
+    def test_add_exercise_no_catalog_scan(self):
+        """Check if validating a new exercise does not read the exercise catalog"""
+        print('(' + self.test_add_exercise_no_catalog_scan.__name__ + ')',
+              self.test_add_exercise_no_catalog_scan.__doc__)
+        resp, scans = self._count_statements(resources.api.url_for(resources.Exercises), 'post',
+                                             'SELECT exercises.',
+                                             headers={CONTENT_TYPE: resources.JSON},
+                                             data=json.dumps(ADD_EXERCISE_VALID_DATA))
+        self.assertEqual(201, resp.status_code)
+        self.assertEqual(0, scans)
+
     def test_modify_exercise_invalid_email(self):
         """Checks if error message is correct when the provided user's email does
          not match the one in the database. Error code 401."""
@@ -771,6 +1101,124 @@ class ExercisesTestCase(ResourcesApiTestCase):
         self.assertEqual((resources.SOLVER_WRONG,),
                          resources._compare_exercise_solution(FOOLS_MATE_MOVES, NON_CHECKMATE_MOVES))
 
+    def test_solver_value_token_prefix(self):
+        """Checks solver module if a string prefix of a move is not reported as the beginning of the solution"""
+        print('(' + self.test_solver_value_token_prefix.__name__ + ')', self.test_solver_value_token_prefix.__doc__)
+        self.assertEqual((resources.SOLVER_WRONG,),
+                         resources._compare_exercise_solution(FOOLS_MATE_MOVES, 'f3,e5,g'))
+        self.assertEqual((resources.SOLVER_SOLUTION,),
+                         resources._compare_exercise_solution(FOOLS_MATE_MOVES, 'f3,e5,g4,Qh4'))
+
+    def test_get_solver_conditional(self):
+        """Checks if a repeated solver query is answered with 304 until the exercise is modified"""
+        print('(' + self.test_get_solver_conditional.__name__ + ')', self.test_get_solver_conditional.__doc__)
+        url = resources.api.url_for(resources.Solver, exerciseid=1) + '?solution=e6'
+        etag = self.client.get(url).headers['ETag']
+        resp, reads = self._count_statements(url, headers={'If-None-Match': etag}, match='FROM solution_edges')
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(0, reads)
+
+    def test_get_solver_etag(self):
+        """Checks if the ETag of a solver answer depends on the proposed solution, and malformed queries get no 304"""
+        print('(' + self.test_get_solver_etag.__name__ + ')', self.test_get_solver_etag.__doc__)
+        url = resources.api.url_for(resources.Solver, exerciseid=1)
+        exercise_etag = self.client.get(resources.api.url_for(resources.Exercise, exerciseid=1)).headers['ETag']
+        etag = self.client.get(url + '?solution=e6').headers['ETag']
+        self.assertNotEqual(exercise_etag, etag)
+        self.assertNotEqual(etag, self.client.get(url + '?solution=e5').headers['ETag'])
+        resp = self.client.get(url + '?solution=e5', headers={'If-None-Match': etag})
+        self.assertEqual(200, resp.status_code)
+        resp = self.client.get(url + '?solution=e6', headers={'If-None-Match': exercise_etag})
+        self.assertEqual(200, resp.status_code)
+        since = {'If-Modified-Since': 'Mon, 19 Feb 2018 17:32:45 GMT'}
+        self.assertEqual(304, self.client.get(url + '?solution=e6', headers=since).status_code)
+        self._assertErrorMessage(self.client.get(url + '?solution=e6,g4,Qh5', headers=since), 400, 'Bad query')
+        self._assertErrorMessage(self.client.get(url + '?solution=', headers=since), 400, 'Bad query')
+
+    def test_get_solver_compiled(self):
+        """Checks if solver GET compares the query with the compiled solution table"""
+        print('(' + self.test_get_solver_compiled.__name__ + ')', self.test_get_solver_compiled.__doc__)
+        url = resources.api.url_for(resources.Solver, exerciseid=1)
+        # the first request compiles the solution of the dumped exercise
+        self.assertEqual(200, self.client.get(url + '?solution=e6').status_code)
+        resp, reads = self._count_statements(url + '?solution=' + urllib.parse.quote_plus('e6,g4,Qh4'),
+                                             match='FROM solution_edges')
+        self.assertEqual(1, reads)
+        data = json.loads(resp.data.decode('utf-8'))
+        self.assertEqual(resources.SOLVER_SOLUTION, data['value'])
+        data = json.loads(self.client.get(url + '?solution=e6,g3').data.decode('utf-8'))
+        self.assertEqual(resources.SOLVER_WRONG, data['value'])
+        resp = self.client.get(url + '?solution=e6,g4,Qh5')
+        self._assertErrorMessage(resp, 400, 'Bad query')
+
+    def test_solver_batch(self):
+        """Checks if a batch of proposed solutions is graded item by item"""
+        print('(' + self.test_solver_batch.__name__ + ')', self.test_solver_batch.__doc__)
+        items = [
+            {'exercise-id': 1, 'solution': OTHER_FOOLS_MATE_MOVES},
+            {'exercise-id': 1, 'solution': 'e6'},
+            {'exercise-id': '2', 'solution': 'Qxh3,f5'},
+            {'exercise-id': 1, 'solution': 'dksajakldjs'},
+            {'exercise-id': 100, 'solution': 'e6'},
+            {'solution': 'e6'},
+            {'exercise-id': 1.9, 'solution': 'e6'},
+            {'exercise-id': True, 'solution': 'e6'}
+        ]
+        resp, reads = self._count_statements(resources.api.url_for(resources.SolverBatch), 'post',
+                                             'FROM exercises LEFT JOIN solution_edges',
+                                             headers={CONTENT_TYPE: resources.JSON},
+                                             data=json.dumps({'items': items}))
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(1, reads)
+        graded = json.loads(resp.data.decode('utf-8'))['items']
+        self.assertEqual(len(items), len(graded))
+        self.assertEqual(resources.SOLVER_SOLUTION, graded[0]['value'])
+        self.assertEqual(resources.SOLVER_PARTIAL, graded[1]['value'])
+        self.assertEqual('g4', graded[1]['opponent-move'])
+        self.assertEqual(resources.SOLVER_WRONG, graded[2]['value'])
+        self.assertEqual('2', graded[2]['exercise-id'])
+        self.assertEqual('Bad query', graded[3]['@error']['@message'])
+        self.assertEqual('Exercise does not exist', graded[4]['@error']['@message'])
+        self.assertEqual('Missing fields', graded[5]['@error']['@message'])
+        self.assertEqual('Bad query', graded[6]['@error']['@message'])
+        self.assertEqual('Bad query', graded[7]['@error']['@message'])
+
+    def test_solver_batch_graded_without_connection(self):
+        """Checks if no database connection is held while a solver batch is graded"""
+        print('(' + self.test_solver_batch_graded_without_connection.__name__ + ')',
+              self.test_solver_batch_graded_without_connection.__doc__)
+        grader = resources.app.config['Grader']
+        connections_in_use = []
+
+        def grade_batch(tasks):
+            connections_in_use.append(ENGINE.pool_stats()['in_use'])
+            return solver.Grader.grade_batch(grader, tasks)
+
+        grader.grade_batch = grade_batch
+        try:
+            resp = self.client.post(resources.api.url_for(resources.SolverBatch),
+                                    headers={CONTENT_TYPE: resources.JSON},
+                                    data=json.dumps({'items': [{'exercise-id': 1, 'solution': 'e6'}]}))
+        finally:
+            del grader.grade_batch
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual([0], connections_in_use)
+
+    def test_solver_batch_invalid(self):
+        """Checks error messages of malformed solver batches. Displays error codes 400 and 415."""
+        print('(' + self.test_solver_batch_invalid.__name__ + ')', self.test_solver_batch_invalid.__doc__)
+        url = resources.api.url_for(resources.SolverBatch)
+        resp = self.client.post(url, data=json.dumps({'items': []}))
+        self._assertErrorMessage(resp, 415, 'Wrong request format')
+        resp = self.client.post(url, headers={CONTENT_TYPE: resources.JSON}, data=json.dumps({}))
+        self._assertErrorMessage(resp, 400, 'Missing fields')
+        resp = self.client.post(url, headers={CONTENT_TYPE: resources.JSON}, data=json.dumps({'items': 'e6'}))
+        self._assertErrorMessage(resp, 400, 'Bad batch')
+        items = [{'exercise-id': 1, 'solution': FOOLS_MATE_MOVES},
+                 {'exercise-id': 1, 'solution': ','.join(['Nf6', 'Ng8'] * validation.DEFAULT_MAX_MOVES)}]
+        resp = self.client.post(url, headers={CONTENT_TYPE: resources.JSON}, data=json.dumps({'items': items}))
+        self._assertErrorMessage(resp, 400, 'Bad query')
+
     def test_get_solver(self):
         """Checks if solver GET works"""
         print('(' + self.test_get_solver.__name__ + ')', self.test_get_solver.__doc__)
@@ -803,6 +1251,112 @@ class ExercisesTestCase(ResourcesApiTestCase):
                                '?solution='+urllib.parse.quote_plus("dksajakldjs"))
         self._assertErrorMessage(resp, 400, 'Bad query')
 
+    def test_get_solver_too_long_query(self):
+        """Checks error message when the query has more moves than a submission may have. Displays error code 400."""
+        print('(' + self.test_get_solver_too_long_query.__name__ + ')', self.test_get_solver_too_long_query.__doc__)
+        exercise_id = 1
+        solution = ','.join(['Nf6', 'Ng8'] * validation.DEFAULT_MAX_MOVES)
+        resp = self.client.get(resources.api.url_for(resources.Solver, exerciseid=exercise_id) +
+                               '?solution='+urllib.parse.quote_plus(solution))
+        self._assertErrorMessage(resp, 400, 'Bad query')
+        self.assertIn('too long', json.loads(resp.data.decode('utf-8'))['@error']['@messages'][0])
+
+    def _start_solver_session(self, exercise_id=1):
+        """
+        Starts a solver session of an exercise.
+        :param exercise_id: The id of the exercise.
+        :return: The url of the session.
+        """
+        resp = self.client.post(resources.api.url_for(resources.SolverSessions, exerciseid=exercise_id))
+        self.assertEqual(201, resp.status_code)
+        return resp.headers.get('Location')
+
+    def _play_move(self, url, move):
+        """
+        Sends a move to a solver session.
+        :param url: The url of the session.
+        :param move: The SAN move.
+        :return: flask.Response object.
+        """
+        return self.client.post(url, headers={CONTENT_TYPE: resources.JSON}, data=json.dumps({'move': move}))
+
+    def test_solver_session_solution(self):
+        """Checks if an exercise can be solved move by move in a solver session"""
+        print('(' + self.test_solver_session_solution.__name__ + ')', self.test_solver_session_solution.__doc__)
+        url = self._start_solver_session()
+        resp = self._play_move(url, 'e6')
+        self.assertEqual(200, resp.status_code)
+        data = json.loads(resp.data.decode('utf-8'))
+        self.assertEqual(resources.SOLVER_PARTIAL, data['value'])
+        self.assertEqual('g4', data['opponent-move'])
+        self.assertEqual('e6,g4', data['list-moves'])
+        self.assertIn('chessapi:solver-move', data['@controls'])
+        data = json.loads(self._play_move(url, 'Qh4#').data.decode('utf-8'))
+        self.assertEqual(resources.SOLVER_SOLUTION, data['value'])
+        self.assertTrue(data['solved'])
+        self.assertNotIn('chessapi:solver-move', data['@controls'])
+        self._assertErrorMessage(self._play_move(url, 'Ke7'), 400, 'Bad move')
+
+    def test_solver_session_wrong_move(self):
+        """Checks if a wrong move is not played in the solver session"""
+        print('(' + self.test_solver_session_wrong_move.__name__ + ')', self.test_solver_session_wrong_move.__doc__)
+        url = self._start_solver_session()
+        data = json.loads(self._play_move(url, 'e5').data.decode('utf-8'))
+        self.assertEqual(resources.SOLVER_WRONG, data['value'])
+        self.assertIsNone(data['opponent-move'])
+        self.assertEqual('', data['list-moves'])
+        data = json.loads(self._play_move(url, 'e6').data.decode('utf-8'))
+        self.assertEqual(resources.SOLVER_PARTIAL, data['value'])
+
+    def test_solver_session_illegal_move(self):
+        """Checks error message when the move is not legal on the board of the session. Displays error code 400."""
+        print('(' + self.test_solver_session_illegal_move.__name__ + ')',
+              self.test_solver_session_illegal_move.__doc__)
+        url = self._start_solver_session()
+        self._assertErrorMessage(self._play_move(url, 'Qh4#'), 400, 'Bad move')
+        self._assertErrorMessage(self._play_move(url, 'dksajakldjs'), 400, 'Bad move')
+
+    def test_solver_session_no_database_access(self):
+        """Checks if playing a move in a solver session does not replay the exercise from the database"""
+        print('(' + self.test_solver_session_no_database_access.__name__ + ')',
+              self.test_solver_session_no_database_access.__doc__)
+        url = self._start_solver_session()
+        resp, statements = self._count_statements(url, 'post', 'FROM exercises',
+                                                  headers={CONTENT_TYPE: resources.JSON},
+                                                  data=json.dumps({'move': 'e6'}))
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(0, statements)
+
+    def test_solver_session_shared(self):
+        """Checks if a solver session is continued by a process which did not start it"""
+        print('(' + self.test_solver_session_shared.__name__ + ')', self.test_solver_session_shared.__doc__)
+        url = self._start_solver_session()
+        self.assertEqual(200, self._play_move(url, 'e6').status_code)
+        # the sessions live in the database, the other worker processes only lack the cached session
+        resources.app.config['SolverSessions'].clear()
+        data = json.loads(self._play_move(url, 'Qh4#').data.decode('utf-8'))
+        self.assertEqual(resources.SOLVER_SOLUTION, data['value'])
+        self.assertEqual('e6,g4,Qh4#', data['list-moves'])
+        resources.app.config['SolverSessions'].clear()
+        self.assertTrue(json.loads(self.client.get(url).data.decode('utf-8'))['solved'])
+
+    def test_solver_session_delete(self):
+        """Checks if a solver session can be ended"""
+        print('(' + self.test_solver_session_delete.__name__ + ')', self.test_solver_session_delete.__doc__)
+        url = self._start_solver_session()
+        self.assertEqual(200, self.client.get(url).status_code)
+        self.assertEqual(204, self.client.delete(url).status_code)
+        self._assertErrorMessage(self.client.get(url), 404, 'Solver session does not exist')
+
+    def test_solver_session_non_existing(self):
+        """Checks error messages of non-existing exercises and sessions. Displays error code 404."""
+        print('(' + self.test_solver_session_non_existing.__name__ + ')',
+              self.test_solver_session_non_existing.__doc__)
+        resp = self.client.post(resources.api.url_for(resources.SolverSessions, exerciseid=100))
+        self._assertErrorMessage(resp, 404, 'Exercise does not exist')
+        url = resources.api.url_for(resources.SolverSession, exerciseid=1, sessionid='nosuchsession')
+        self._assertErrorMessage(self._play_move(url, 'e6'), 404, 'Solver session does not exist')
+
 
 class UsersTestCase(ResourcesApiTestCase):
     def test_url(self):
@@ -822,6 +1376,30 @@ class UsersTestCase(ResourcesApiTestCase):
         self.assertEqual(200, resp.status_code)
         self.assertDictEqual(GOT_SUBMISSIONS_NONEMPTY, json.loads(resp.data.decode('utf-8')))
 
+    def test_get_submissions_query_count(self):
+        """Checks if the submission list is served with a constant number of SQL statements"""
+        print('(' + self.test_get_submissions_query_count.__name__ + ')',
+              self.test_get_submissions_query_count.__doc__)
+        url = resources.api.url_for(resources.Submissions, nickname='Mystery')
+        resp, statements_before = self._count_statements(url)
+        self.assertEqual(200, resp.status_code)
+        self._add_exercises(20)
+        resp, statements_after = self._count_statements(url)
+        self.assertEqual(len(GOT_SUBMISSIONS_NONEMPTY['items']) + 20, len(json.loads(resp.data.decode('utf-8'))['items']))
+        self.assertEqual(statements_before, statements_after)
+
+    def test_get_submissions_paginated(self):
+        """Checks if the submission list can be paged through with the next control"""
+        print('(' + self.test_get_submissions_paginated.__name__ + ')', self.test_get_submissions_paginated.__doc__)
+        resp = self.client.get(resources.api.url_for(resources.Submissions, nickname='Mystery', limit=1))
+        self.assertEqual(200, resp.status_code)
+        data = json.loads(resp.data.decode('utf-8'))
+        self.assertListEqual(GOT_SUBMISSIONS_NONEMPTY['items'][:1], data['items'])
+        resp = self.client.get(data['@controls']['next']['href'])
+        data = json.loads(resp.data.decode('utf-8'))
+        self.assertListEqual(GOT_SUBMISSIONS_NONEMPTY['items'][1:], data['items'])
+        self.assertEqual(GOT_SUBMISSIONS_NONEMPTY['@controls']['up'], data['@controls']['up'])
+
     def test_get_submissions_empty(self):
         """Checks if submissions gives result even when there is no exercises submitted by the user"""
         print('(' + self.test_get_submissions_empty.__name__ + ')', self.test_get_submissions_empty.__doc__)
@@ -847,6 +1425,17 @@ class UsersTestCase(ResourcesApiTestCase):
         data = json.loads(resp.data.decode('utf-8'))
         self.assertDictEqual(GOT_USER, data)
 
+    def test_get_user_conditional(self):
+        """Check if a conditional GET of the current version of a user is answered with 304"""
+        print('(' + self.test_get_user_conditional.__name__ + ')', self.test_get_user_conditional.__doc__)
+        url = resources.api.url_for(resources.User, nickname='Mystery')
+        etag = self.client.get(url).headers['ETag']
+        resp = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(b'', resp.data)
+        resp = self.client.get(url, headers={'If-None-Match': '"0-0"'})
+        self.assertEqual(200, resp.status_code)
+
     def test_get_user_non_existing(self):
         """Check error code when 404ing user"""
         print('(' + self.test_get_user_non_existing.__name__ + ')', self.test_get_user_non_existing.__doc__)
@@ -867,6 +1456,18 @@ class UsersTestCase(ResourcesApiTestCase):
         data = json.loads(resp.data.decode('utf-8'))
         self.assertEqual(MODIFY_USER_VALID_DATA['nickname'], data['nickname'])
 
+    def test_modify_user_if_match(self):
+        """Check if a modification of an outdated version of a user is refused with 412"""
+        print('(' + self.test_modify_user_if_match.__name__ + ')', self.test_modify_user_if_match.__doc__)
+        url = resources.api.url_for(resources.User, nickname='Mystery')
+        resp = self.client.put(url, headers={CONTENT_TYPE: resources.JSON, 'If-Match': '"0-0"'},
+                               data=json.dumps(MODIFY_USER_VALID_DATA))
+        self._assertErrorMessage(resp, 412, 'Precondition failed')
+        etag = self.client.get(url).headers['ETag']
+        resp = self.client.put(url, headers={CONTENT_TYPE: resources.JSON, 'If-Match': etag},
+                               data=json.dumps(MODIFY_USER_VALID_DATA))
+        self.assertEqual(204, resp.status_code)
+
     def test_modify_user_non_existing(self):
         """Checks if error message is correct when trying to modify non-existing user. Displays error code 404."""
         print('(' + self.test_modify_user_non_existing.__name__ + ')', self.test_modify_user_non_existing.__doc__)
@@ -960,6 +1561,32 @@ class UsersTestCase(ResourcesApiTestCase):
         data = json.loads(resp.data.decode('utf-8'))
         self.assertDictEqual(data, GOT_USERS)
 
+    def test_get_users_cached(self):
+        """Checks if the encoded user list is cached until a user is added"""
+        print('(' + self.test_get_users_cached.__name__ + ')', self.test_get_users_cached.__doc__)
+        url = flask.url_for('users')
+        self.client.get(url)
+        resp, reads = self._count_statements(url, match='FROM users')
+        self.assertEqual(0, reads)
+        self.assertDictEqual(GOT_USERS, json.loads(resp.data.decode('utf-8')))
+        self.client.post(url, headers={CONTENT_TYPE: resources.JSON}, data=json.dumps(ADD_USER_VALID_DATA))
+        data = json.loads(self.client.get(url).data.decode('utf-8'))
+        self.assertEqual(len(GOT_USERS['items']) + 1, len(data['items']))
+
+    def test_get_users_paginated(self):
+        """Checks if the user list can be paged through with the next control"""
+        print('(' + self.test_get_users_paginated.__name__ + ')', self.test_get_users_paginated.__doc__)
+        url = resources.api.url_for(resources.Users, limit=2)
+        items = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(200, resp.status_code)
+            data = json.loads(resp.data.decode('utf-8'))
+            self.assertLessEqual(len(data['items']), 2)
+            items.extend(data['items'])
+            url = data['@controls'].get('next', {}).get('href')
+        self.assertListEqual(GOT_USERS['items'], items)
+
     def test_add_user_valid(self):
         """Check if valid user data can be added"""
         print('(' + self.test_add_user_valid.__name__ + ')', self.test_add_user_valid.__doc__)
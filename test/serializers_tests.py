@@ -0,0 +1,76 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import unittest
+from flask import url_for
+from chessApi import resources, serializers
+
+NICKNAMES = ['Mystery', 'two words', 'a/b', 'q?x=1&y', 'plus+sign', '%41', 'kérdés', '♞']
+
+
+class SerializersTestCase(unittest.TestCase):
+    """Test cases for the precompiled MASON templates."""
+    def setUp(self):
+        serializers._templates.clear()
+
+    def test_url_same_as_url_for(self):
+        """Checks if the URLs expanded from the templates are the same as the ones built by url_for"""
+        print('(' + self.test_url_same_as_url_for.__name__ + ')', self.test_url_same_as_url_for.__doc__)
+        for script_root in ('', '/mounted'):
+            with resources.app.test_request_context('/', base_url='http://localhost' + script_root):
+                for nickname in NICKNAMES:
+                    self.assertEqual(url_for('user', nickname=nickname), serializers.url('user', nickname=nickname))
+                    self.assertEqual(url_for('submissions', nickname=nickname, limit=2, after=nickname),
+                                     serializers.url('submissions', nickname=nickname, limit=2, after=nickname))
+                self.assertEqual(url_for('exercise', exerciseid=12), serializers.url('exercise', exerciseid=12))
+                self.assertEqual(url_for('exercises', limit=5, before=3),
+                                 serializers.url('exercises', limit=5, before=3))
+                self.assertEqual(url_for('solver-session', exerciseid=1, sessionid='a-b_c'),
+                                 serializers.url('solver-session', exerciseid=1, sessionid='a-b_c'))
+
+    def test_static_controls_per_url_root(self):
+        """Checks if the static controls are built once per url root"""
+        print('(' + self.test_static_controls_per_url_root.__name__ + ')',
+              self.test_static_controls_per_url_root.__doc__)
+        with resources.app.test_request_context('/'):
+            control = serializers.add_exercise_control()
+            self.assertIs(control, serializers.add_exercise_control())
+            self.assertEqual(url_for('exercises'), control['href'])
+            self.assertIs(serializers.ADD_EXERCISE_SCHEMA, control['schema'])
+        with resources.app.test_request_context('/', base_url='http://localhost/mounted'):
+            self.assertEqual(url_for('exercises'), serializers.add_exercise_control()['href'])
+            self.assertTrue(url_for('exercises').endswith('/mounted/api/exercises/'))
+
+    def test_templates_bounded(self):
+        """Checks if the templates of a bounded number of url roots are kept"""
+        print('(' + self.test_templates_bounded.__name__ + ')', self.test_templates_bounded.__doc__)
+        for host in range(2 * serializers.MAX_URL_ROOTS):
+            with resources.app.test_request_context('/', base_url='http://host%d.example' % host):
+                self.assertEqual(url_for('exercise', exerciseid=1), serializers.url('exercise', exerciseid=1))
+        self.assertEqual(serializers.MAX_URL_ROOTS, len(serializers._templates))
+
+    def test_items_same_as_chess_api_object(self):
+        """Checks if the list items are the same as the ones built with ChessApiObject"""
+        print('(' + self.test_items_same_as_chess_api_object.__name__ + ')',
+              self.test_items_same_as_chess_api_object.__doc__)
+        with resources.app.test_request_context('/'):
+            exercises = [{'exercise_id': 1, 'title': 'Mate in one', 'author': 'two words'}]
+            expected = resources.ChessApiObject(url_for('exercise', exerciseid=1), resources.EXERCISE_PROFILE, False)
+            expected['headline'] = 'Mate in one'
+            expected['author'] = 'two words'
+            self.assertEqual([expected], serializers.exercise_items(exercises))
+
+            users = [{'nickname': nickname, 'registrationdate': 1362015937} for nickname in NICKNAMES]
+            expected = [resources.ChessApiObject(url_for('user', nickname=user['nickname']), resources.USER_PROFILE,
+                                                 False, **user) for user in users]
+            items = serializers.user_items(users)
+            self.assertEqual(expected, items)
+            self.assertEqual([list(item) for item in expected], [list(item) for item in items])
+
+
+if __name__ == '__main__':
+    print('Start running serializer tests')
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import gzip
+import shutil
+import tempfile
+import unittest
+from flask import Flask
+from chessApi_site import assets
+
+
+class SiteAssetsTestCase(unittest.TestCase):
+    """Test cases for the fingerprinted static assets of the client site."""
+    @classmethod
+    def setUpClass(cls):
+        print("Testing ", cls.__name__)
+        cls.folder = tempfile.mkdtemp()
+        cls.manifest = assets.build(output=cls.folder)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Testing ENDED for ", cls.__name__)
+        shutil.rmtree(cls.folder)
+
+    def setUp(self):
+        app = Flask(__name__, static_folder=assets.STATIC_FOLDER, static_url_path='')
+        self.assertTrue(assets.init_app(app, self.folder))
+        self.client = app.test_client()
+
+    def test_references_rewritten(self):
+        """Checks if the pages refer to the fingerprinted scripts and stylesheets"""
+        print('(' + self.test_references_rewritten.__name__ + ')', self.test_references_rewritten.__doc__)
+        fingerprinted = self.manifest['assets']['js/solver.js']
+        self.assertRegex(fingerprinted, r'^js/solver\.[0-9a-f]{12}\.js$')
+        page = self.client.get('/solvepage.html').data.decode('utf-8')
+        self.assertIn('src="%s"' % fingerprinted, page)
+        self.assertIn('href="%s"' % self.manifest['assets']['css/chess.css'], page)
+        self.assertNotIn('src="js/solver.js"', page)
+        # the references to other sites are kept
+        self.assertIn('src="https://code.jquery.com/jquery-3.3.1.min.js"', page)
+
+    def test_immutable_caching(self):
+        """Checks if the fingerprinted assets are cached for long and the pages revalidated"""
+        print('(' + self.test_immutable_caching.__name__ + ')', self.test_immutable_caching.__doc__)
+        resp = self.client.get('/' + self.manifest['assets']['js/chess_board.js'])
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(assets.IMMUTABLE, resp.headers['Cache-Control'])
+        self.assertNotIn('Expires', resp.headers)
+        resp = self.client.get('/homepage.html')
+        self.assertEqual(assets.REVALIDATE, resp.headers['Cache-Control'])
+        self.assertEqual(assets.REVALIDATE, self.client.get('/js/chess_board.js').headers['Cache-Control'])
+        self.assertEqual(404, self.client.get('/js/missing.js').status_code)
+        self.assertEqual(404, self.client.get('/manifest.json').status_code)
+
+    def test_not_modified(self):
+        """Checks if a page the client has already is answered with 304"""
+        print('(' + self.test_not_modified.__name__ + ')', self.test_not_modified.__doc__)
+        etag = self.client.get('/homepage.html').headers['ETag']
+        resp = self.client.get('/homepage.html', headers={'If-None-Match': etag})
+        self.assertEqual(304, resp.status_code)
+        self.assertEqual(b'', resp.data)
+        self.assertEqual(200, self.client.get('/homepage.html', headers={'If-None-Match': '"other"'}).status_code)
+
+    def test_precompressed(self):
+        """Checks if the gzip-compressed copy is served to clients accepting gzip"""
+        print('(' + self.test_precompressed.__name__ + ')', self.test_precompressed.__doc__)
+        plain = self.client.get('/solvepage.html')
+        resp = self.client.get('/solvepage.html', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual('gzip', resp.headers['Content-Encoding'])
+        self.assertIn('Accept-Encoding', resp.headers['Vary'])
+        self.assertNotEqual(plain.headers['ETag'], resp.headers['ETag'])
+        self.assertEqual(plain.data, gzip.decompress(resp.data))
+        self.assertNotIn('Content-Encoding', self.client.get('/solvepage.html',
+                                                             headers={'Accept-Encoding': 'gzip;q=0'}).headers)
+
+
+if __name__ == '__main__':
+    print('Start running site asset tests')
+    unittest.main()
@@ -0,0 +1,254 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+from concurrent.futures.process import BrokenProcessPool
+import os
+import shutil
+import tempfile
+import unittest
+import chess
+from chessApi import chess_data
+from chessApi import database
+from chessApi import solver
+
+EXERCISE = {
+    'exercise_id': 1,
+    'initial_state': 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1',
+    'list_moves': 'e6,g4,Qh4#'
+}
+
+
+def _session(exercise, moves=()):
+    """
+    Starts a session of an exercise with its freshly compiled solution.
+    """
+    edges = chess_data.compile_solution(exercise['initial_state'], exercise['list_moves'])
+    return solver.SolverSession(exercise, chess_data.CompiledSolution(edges) if edges else None, moves)
+
+
+class SolverSessionTestCase(unittest.TestCase):
+    """Test cases for the solver sessions and their store."""
+    @classmethod
+    def setUpClass(cls):
+        print("Testing ", cls.__name__)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Testing ENDED for ", cls.__name__)
+
+    def test_play_solution(self):
+        """Checks if the solution is accepted move by move"""
+        print('(' + self.test_play_solution.__name__ + ')', self.test_play_solution.__doc__)
+        session = _session(EXERCISE)
+        self.assertEqual((solver.PARTIAL, 'g4'), session.play('e6'))
+        self.assertEqual(['e6', 'g4'], session.moves())
+        self.assertEqual((solver.SOLUTION, None), session.play('Qh4'))
+        self.assertTrue(session.finished)
+        self.assertTrue(session.board.is_checkmate())
+        self.assertRaises(ValueError, session.play, 'Ke7')
+
+    def test_play_wrong(self):
+        """Checks if a legal but wrong move leaves the board unchanged"""
+        print('(' + self.test_play_wrong.__name__ + ')', self.test_play_wrong.__doc__)
+        session = _session(EXERCISE)
+        fen = session.board.fen()
+        self.assertEqual((solver.WRONG, None), session.play('e5'))
+        self.assertEqual(fen, session.board.fen())
+        self.assertRaises(ValueError, session.play, 'Qh4')
+
+    def test_play_alternative(self):
+        """Checks if every alternative line of the solution is accepted, transpositions included"""
+        print('(' + self.test_play_alternative.__name__ + ')', self.test_play_alternative.__doc__)
+        exercise = dict(EXERCISE, initial_state=chess.STARTING_FEN, list_moves='f3,e5,g4,Qh4#;g4,e5,f3,Qh4#')
+        session = _session(exercise)
+        self.assertEqual((solver.PARTIAL, 'e5'), session.play('g4'))
+        self.assertEqual((solver.PARTIAL, 'Qh4#'), session.play('f3'))
+        self.assertTrue(session.finished)
+        self.assertEqual(['g4', 'e5', 'f3', 'Qh4#'], session.moves())
+        # the transposition is stored once
+        edges = chess_data.compile_solution(exercise['initial_state'], exercise['list_moves'])
+        self.assertEqual(1, len([edge for edge in edges if edge[1] == 'Qh4#']))
+        grade = solver.grade(1, exercise['initial_state'], exercise['list_moves'], edges,
+                             ['g4,e5,f3,Qh4', 'f3,e5,g4', 'f3,e5,f4'])
+        self.assertEqual([(solver.SOLUTION,), (solver.PARTIAL, 'Qh4#'), (solver.WRONG,)], grade)
+
+    def test_resume(self):
+        """Checks if a session resumed from its position continues like the original one"""
+        print('(' + self.test_resume.__name__ + ')', self.test_resume.__doc__)
+        session = _session(EXERCISE)
+        session.play('e6')
+        resumed = solver.SolverSession(EXERCISE, session.solution, session.moves(), session.position())
+        self.assertEqual(2, resumed.ply)
+        self.assertFalse(resumed.finished)
+        self.assertEqual((solver.SOLUTION, None), resumed.play('Qh4#'))
+        self.assertEqual(['e6', 'g4', 'Qh4#'], resumed.moves())
+        self.assertTrue(solver.SolverSession(EXERCISE, resumed.solution, resumed.moves(), resumed.position()).finished)
+
+    def test_invalid_exercise(self):
+        """Checks if a session cannot be started for invalid chess data"""
+        print('(' + self.test_invalid_exercise.__name__ + ')', self.test_invalid_exercise.__doc__)
+        exercise = dict(EXERCISE, list_moves='e6,g4,Qh5#')
+        self.assertRaises(ValueError, _session, exercise)
+        self.assertRaises(ValueError, _session, EXERCISE, ['e6', 'g3'])
+
+    def _connect(self):
+        """
+        Creates a populated database in a temporary folder.
+        :return: A connection to the database, closed when the test ends.
+        """
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        engine = database.Engine(os.path.join(folder, 'solver.db'))
+        engine.create_tables()
+        engine.populate_tables()
+        con = engine.connect()
+        self.addCleanup(con.close)
+        return con
+
+    def test_store_bounded(self):
+        """Checks if the store drops the least recently used session when full"""
+        print('(' + self.test_store_bounded.__name__ + ')', self.test_store_bounded.__doc__)
+        con = self._connect()
+        exercise = con.get_exercise(1)
+        store = solver.SessionStore(limit=2)
+        first, session = store.create(con, exercise)
+        second, _ = store.create(con, exercise)
+        store.save(con, first, session, 0)
+        third, _ = store.create(con, exercise)
+        self.assertIsNotNone(store.get(con, first))
+        self.assertIsNone(store.get(con, second))
+        self.assertIsNotNone(store.get(con, third))
+        store.delete(con, first)
+        self.assertIsNone(store.get(con, first))
+
+    def test_store_expiry(self):
+        """Checks if an idle session expires"""
+        print('(' + self.test_store_expiry.__name__ + ')', self.test_store_expiry.__doc__)
+        con = self._connect()
+        store = solver.SessionStore(ttl=-1)
+        session_id, _ = store.create(con, con.get_exercise(1))
+        self.assertIsNone(store.get(con, session_id))
+
+    def test_store_shared(self):
+        """Checks if a session is continued by another store from the stored moves"""
+        print('(' + self.test_store_shared.__name__ + ')', self.test_store_shared.__doc__)
+        con = self._connect()
+        store, other = solver.SessionStore(), solver.SessionStore()
+        self.assertIsNone(con.get_solution(1))
+        session_id, session = store.create(con, con.get_exercise(1))
+        # the solution is compiled and stored once for all the sessions
+        self.assertEqual(session.solution.edges, con.get_solution(1).edges)
+        session.play('e6')
+        self.assertTrue(store.save(con, session_id, session, 0))
+        continued = other.get(con, session_id)
+        self.assertEqual(session.board.fen(), continued.board.fen())
+        # resumed from the stored position, not replayed
+        self.assertEqual([], continued.board.move_stack)
+        self.assertEqual(['e6', 'g4'], continued.moves())
+        self.assertEqual((solver.SOLUTION, None), continued.play('Qh4#'))
+        self.assertTrue(other.save(con, session_id, continued, 2))
+        # the first store replays the moves played meanwhile
+        resumed = store.get(con, session_id)
+        self.assertIsNot(session, resumed)
+        self.assertTrue(resumed.finished)
+        # a move played on an outdated session is not stored
+        session.play('Qh4#')
+        self.assertFalse(store.save(con, session_id, session, 2))
+
+    def test_store_modified_exercise(self):
+        """Checks if a session ends when its exercise is modified"""
+        print('(' + self.test_store_modified_exercise.__name__ + ')', self.test_store_modified_exercise.__doc__)
+        con = self._connect()
+        exercise = con.get_exercise(1)
+        store = solver.SessionStore()
+        session_id, _ = store.create(con, exercise)
+        con.modify_exercise(1, exercise['title'], exercise['description'], exercise['initial_state'], 'e5,g4,Qh4#')
+        store.clear()
+        self.assertIsNone(store.get(con, session_id))
+
+    def test_board_cache_resume(self):
+        """Checks if a replay resumes from the longest cached prefix"""
+        print('(' + self.test_board_cache_resume.__name__ + ')', self.test_board_cache_resume.__doc__)
+        cache = solver.BoardCache()
+        board = cache.replay(1, EXERCISE['initial_state'], ['e6', 'g4'])
+        self.assertEqual(2, len(board.move_stack))
+        board = cache.replay(1, EXERCISE['initial_state'], ['e6', 'g4+', 'Qh4#'])
+        self.assertTrue(board.is_checkmate())
+        stats = cache.stats()
+        self.assertEqual(2, stats['replays'])
+        self.assertEqual(1, stats['resumed'])
+        self.assertEqual(2, stats['plies_skipped'])
+        self.assertEqual(3, stats['plies_replayed'])
+        self.assertEqual(0.5, stats['resume_ratio'])
+        self.assertEqual(3, stats['size'])
+        self.assertGreater(stats['bytes'], 0)
+        self.assertRaises(ValueError, cache.replay, 1, EXERCISE['initial_state'], ['e6', 'g4', 'Qh5'])
+
+    def test_board_cache_keyed_by_initial_state(self):
+        """Checks if the positions of a modified exercise are not reused"""
+        print('(' + self.test_board_cache_keyed_by_initial_state.__name__ + ')',
+              self.test_board_cache_keyed_by_initial_state.__doc__)
+        cache = solver.BoardCache()
+        cache.replay(1, EXERCISE['initial_state'], ['e6'])
+        board = cache.replay(1, chess.STARTING_FEN, ['e4'])
+        self.assertEqual(0, cache.stats()['resumed'])
+        self.assertEqual(chess.Board().fen(), cache.replay(1, chess.STARTING_FEN, []).fen())
+        self.assertEqual('e2e4', board.peek().uci())
+
+    def test_board_cache_depth(self):
+        """Checks if only the positions up to the maximum depth are cached"""
+        print('(' + self.test_board_cache_depth.__name__ + ')', self.test_board_cache_depth.__doc__)
+        cache = solver.BoardCache(max_plies=2)
+        board = cache.replay(1, chess.STARTING_FEN, ['Nf3', 'Nf6', 'Ng1', 'Ng8'] * 25)
+        self.assertEqual(100, len(board.move_stack))
+        self.assertEqual(2, cache.stats()['size'])
+        board = cache.replay(1, chess.STARTING_FEN, ['Nf3', 'Nf6', 'Ng1'])
+        self.assertEqual(chess.Board('rnbqkb1r/pppppppp/5n2/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 2 2').board_fen(),
+                         board.board_fen())
+        stats = cache.stats()
+        self.assertEqual(2, stats['plies_skipped'])
+        self.assertEqual(101, stats['plies_replayed'])
+        self.assertEqual(2, stats['size'])
+
+    def test_grade_batch(self):
+        """Checks if a batch graded by worker processes gives the same results as grading in process"""
+        print('(' + self.test_grade_batch.__name__ + ')', self.test_grade_batch.__doc__)
+        edges = chess_data.compile_solution(EXERCISE['initial_state'], EXERCISE['list_moves'])
+        proposals = ['e6,g4,Qh4#', 'e6', 'e5', 'e6,g4,Qh5', '', 'e7e6,g2g4']
+        tasks = [(1, EXERCISE['initial_state'], EXERCISE['list_moves'], edges, proposals),
+                 (2, EXERCISE['initial_state'], EXERCISE['list_moves'], None, proposals[:3])]
+        expected = [[(solver.SOLUTION,), (solver.PARTIAL, 'g4'), (solver.WRONG,), None, None,
+                     (solver.PARTIAL, 'Qh4#')],
+                    [(solver.SOLUTION,), (solver.PARTIAL, 'g4'), (solver.WRONG,)]]
+        self.assertEqual(expected, solver.grade_batch(tasks))
+        self.assertEqual(expected, solver.grade_batch(tasks, chunk_size=2))
+        grader = solver.Grader(workers=1, chunk_size=2)
+        try:
+            self.assertEqual(expected, grader.grade_batch(tasks))
+        finally:
+            grader.shutdown()
+
+    def test_grader_broken_pool(self):
+        """Checks if the grader replaces its pool when a worker process died"""
+        print('(' + self.test_grader_broken_pool.__name__ + ')', self.test_grader_broken_pool.__doc__)
+        tasks = [(1, EXERCISE['initial_state'], EXERCISE['list_moves'], None, ['e6', 'e5', 'e6,g4'])]
+        expected = [[(solver.PARTIAL, 'g4'), (solver.WRONG,), (solver.PARTIAL, 'Qh4#')]]
+        grader = solver.Grader(workers=1, chunk_size=1)
+        try:
+            pool = grader._get_pool()
+            pool.submit(os.getpid).result()
+            for process in list(pool._processes.values()):
+                process.kill()
+                process.join()
+            self.assertRaises(BrokenProcessPool, grader.grade_batch, tasks)
+            self.assertEqual(expected, grader.grade_batch(tasks))
+        finally:
+            grader.shutdown()
+
+
+if __name__ == '__main__':
+    print('Start running solver tests')
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Created on 18.10.2026
+@author: lorinc
+
+"""
+
+import unittest
+from chessApi import validation
+
+FOOLS_MATE_STATE = 'rnbqkbnr/pppppppp/8/8/8/5P2/PPPPP1PP/RNBQKBNR b KQkq - 0 1'
+FOOLS_MATE_MOVES = 'e6,g4,Qh4#'
+
+
+class ValidatorTestCase(unittest.TestCase):
+    """Test cases for the off-thread validation of chess data."""
+    @classmethod
+    def setUpClass(cls):
+        print("Testing ", cls.__name__)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Testing ENDED for ", cls.__name__)
+
+    def test_check_in_worker(self):
+        """Checks if chess data is validated in a worker process"""
+        print('(' + self.test_check_in_worker.__name__ + ')', self.test_check_in_worker.__doc__)
+        validator = validation.Validator(workers=1)
+        self.addCleanup(validator.shutdown)
+        self.assertTrue(validator.check(FOOLS_MATE_STATE, FOOLS_MATE_MOVES))
+        self.assertFalse(validator.check(FOOLS_MATE_STATE, 'e6,g4'))
+        self.assertFalse(validator.check(FOOLS_MATE_STATE, 'dksajakldjs'))
+        self.assertEqual(3, validator.stats()['validations'])
+
+    def test_too_many_moves(self):
+        """Checks if a submission with too many moves is rejected without parsing it"""
+        print('(' + self.test_too_many_moves.__name__ + ')', self.test_too_many_moves.__doc__)
+        validator = validation.Validator(workers=0, max_moves=3)
+        self.assertTrue(validator.check(FOOLS_MATE_STATE, FOOLS_MATE_MOVES))
+        self.assertRaises(validation.ValidationTimeoutError, validator.check, FOOLS_MATE_STATE, 'e6,g4,Qh4#,Ke7')
+        self.assertRaises(validation.ValidationTimeoutError, validator.check, FOOLS_MATE_STATE, 'e' * 100)
+        stats = validator.stats()
+        self.assertEqual(1, stats['validations'])
+        self.assertEqual(2, stats['rejected_size'])
+
+    def test_proposal_within_limits(self):
+        """Checks if a proposed solution is limited to the number of moves of a submission"""
+        print('(' + self.test_proposal_within_limits.__name__ + ')', self.test_proposal_within_limits.__doc__)
+        validator = validation.Validator(workers=0, max_moves=3)
+        self.assertTrue(validator.proposal_within_limits(FOOLS_MATE_MOVES))
+        self.assertTrue(validator.proposal_within_limits(None))
+        self.assertFalse(validator.proposal_within_limits('e6,g4,Qh4#,Ke7'))
+        self.assertFalse(validator.proposal_within_limits('e' * 100))
+
+    def test_cpu_budget(self):
+        """Checks if a validation gives up when it runs out of its CPU budget"""
+        print('(' + self.test_cpu_budget.__name__ + ')', self.test_cpu_budget.__doc__)
+        validator = validation.Validator(workers=0, cpu_budget=-1)
+        self.assertRaises(validation.ValidationTimeoutError, validator.check, FOOLS_MATE_STATE, FOOLS_MATE_MOVES)
+        self.assertEqual(1, validator.stats()['timeouts'])
+
+    def test_busy(self):
+        """Checks if a validation is rejected immediately when too many are pending"""
+        print('(' + self.test_busy.__name__ + ')', self.test_busy.__doc__)
+        validator = validation.Validator(workers=0, max_pending=1)
+        validator._slots.acquire()
+        self.assertRaises(validation.ValidationBusyError, validator.check, FOOLS_MATE_STATE, FOOLS_MATE_MOVES)
+        validator._slots.release()
+        self.assertTrue(validator.check(FOOLS_MATE_STATE, FOOLS_MATE_MOVES))
+        self.assertEqual(1, validator.stats()['rejected_busy'])
+
+
+if __name__ == '__main__':
+    print('Start running validation tests')
+    unittest.main()